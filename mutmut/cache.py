@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import hashlib
+import json
 import os
 from collections import defaultdict
 from difflib import SequenceMatcher, unified_diff
@@ -12,17 +13,18 @@ from typing import Tuple
 
 
 from junit_xml import TestSuite, TestCase, to_xml_report_string
-from pony.orm import Database, Required, db_session, Set, Optional, select, \
+from pony.orm import Database, Required, db_session, Set, Optional, select, count, \
     PrimaryKey, RowNotFound, ERDiagramError, OperationalError
 
-from mutmut.constants import MUTANT_STATUSES, BAD_TIMEOUT, OK_SUSPICIOUS, BAD_SURVIVED, SKIPPED, UNTESTED, OK_KILLED
+from mutmut.constants import MUTANT_STATUSES, BAD_TIMEOUT, OK_SUSPICIOUS, BAD_SURVIVED, SKIPPED, UNTESTED, OK_KILLED, \
+    EQUIVALENT
 from mutmut.helpers.relativemutationid import RelativeMutationID
 from mutmut.helpers.context import Context
 from mutmut.mutator.mutator import Mutator
 
 db = Database()
 
-current_db_version = 4
+current_db_version = 6
 
 
 NO_TESTS_FOUND = 'NO TESTS FOUND'
@@ -51,6 +53,14 @@ class Mutant(db.Entity):
     index = Required(int)
     tested_against_hash = Optional(str, autostrip=False)
     status = Required(str, autostrip=False)  # really an enum of mutant_statuses
+    mutation_type = Optional(str, autostrip=False)
+    time_elapsed = Optional(float)  # seconds it took to test the mutant the last time
+
+
+class TestKillCount(db.Entity):
+    test = PrimaryKey(str, autostrip=False)
+    killed = Required(int, default=0)  # mutants the test killed
+    run = Required(int, default=0)  # mutants the test was run against
 
 
 def init_db(f):
@@ -116,6 +126,28 @@ def hash_of_tests(tests_dirs):
     return m.hexdigest()
 
 
+def hash_of_sources(paths_to_mutate):
+    """
+    :return: hash of the names and contents of the python files in the given files and directories
+    """
+    m = hashlib.sha256()
+    for path in paths_to_mutate:
+        if os.path.isfile(path):
+            filenames = [path]
+        else:
+            filenames = sorted(
+                os.path.join(root, filename)
+                for root, _, files in os.walk(path)
+                for filename in files
+                if filename.endswith('.py')
+            )
+        for filename in filenames:
+            m.update(filename.encode('utf-8'))
+            with open(filename, 'rb') as f:
+                m.update(f.read())
+    return m.hexdigest()
+
+
 def get_apply_line(mutant):
     apply_line = 'mutmut apply {}'.format(mutant.id)
     return apply_line
@@ -186,6 +218,7 @@ def print_result_cache(show_diffs=False, dict_synonyms=None, only_this_file=None
     print_stuff('Suspicious 🤔', select(x for x in Mutant if x.status == OK_SUSPICIOUS))
     print_stuff('Survived 🙁', select(x for x in Mutant if x.status == BAD_SURVIVED))
     print_stuff('Untested/skipped', select(x for x in Mutant if x.status == UNTESTED or x.status == SKIPPED))
+    print_stuff('Equivalent 👯', select(x for x in Mutant if x.status == EQUIVALENT))
 
 
 @init_db
@@ -335,6 +368,11 @@ def create_html_report(dict_synonyms, directory):
                     f.write('Mutants that were skipped')
                     print_diffs(SKIPPED)
 
+                if mutants_by_status[EQUIVALENT]:
+                    f.write('<h2>Equivalent</h2>')
+                    f.write('Mutants that compile to the same code as the original, so no test can kill them')
+                    print_diffs(EQUIVALENT)
+
                 f.write('</body></html>')
 
         index_file.write('</table></body></html>')
@@ -429,12 +467,56 @@ def register_mutants(mutations_by_file):
 
 @init_db
 @db_session
-def update_mutant_status(file_to_mutate, mutation_id, status, tests_hash):
+def update_mutant_status(file_to_mutate, mutation_id, status, tests_hash, time_elapsed=None):
     sourcefile = SourceFile.get(filename=file_to_mutate)
     line = Line.get(sourcefile=sourcefile, line=mutation_id.line, line_number=mutation_id.line_number)
     mutant = Mutant.get(line=line, index=mutation_id.index)
     mutant.status = status
     mutant.tested_against_hash = tests_hash
+    if mutation_id.mutation_type is not None:
+        mutant.mutation_type = mutation_id.mutation_type
+    if time_elapsed is not None:
+        mutant.time_elapsed = time_elapsed
+
+
+@init_db
+@db_session
+def get_mutant_history(filename, mutations):
+    """
+    :return: status, hash of the tests and time it took of the last test of each mutant, by mutation id
+    """
+    sourcefile = SourceFile.get(filename=filename)
+    assert sourcefile
+
+    result = {}
+    for mutation_id in mutations:
+        line = Line.get(sourcefile=sourcefile, line=mutation_id.line, line_number=mutation_id.line_number)
+        mutant = line and Mutant.get(line=line, index=mutation_id.index)
+        if mutant is None:
+            result[mutation_id] = (UNTESTED, None, None)
+        else:
+            result[mutation_id] = (mutant.status, mutant.tested_against_hash, mutant.time_elapsed)
+    return result
+
+
+@init_db
+@db_session
+def get_survival_counts():
+    """
+    :return: number of survived and number of tested mutants, by mutation type and by filename
+    """
+    counts_by_type = defaultdict(lambda: [0, 0])
+    counts_by_filename = defaultdict(lambda: [0, 0])
+    tested_statuses = (OK_KILLED, OK_SUSPICIOUS, BAD_SURVIVED, BAD_TIMEOUT)
+    # one grouped query, instead of loading the line and source file of every mutant
+    for mutation_type, filename, status, n in select(
+            (x.mutation_type, x.line.sourcefile.filename, x.status, count())
+            for x in Mutant if x.status in tested_statuses):
+        survived = n if status == BAD_SURVIVED else 0
+        for counts in (counts_by_type[mutation_type], counts_by_filename[filename]):
+            counts[0] += survived
+            counts[1] += n
+    return dict(counts_by_type), dict(counts_by_filename)
 
 
 @init_db
@@ -472,30 +554,6 @@ def get_cached_mutation_statuses(filename, mutations, hash_of_tests):
     return result
 
 
-@init_db
-@db_session
-def cached_mutation_status(filename, mutation_id, hash_of_tests):
-    sourcefile = SourceFile.get(filename=filename)
-    assert sourcefile
-    line = Line.get(sourcefile=sourcefile, line=mutation_id.line, line_number=mutation_id.line_number)
-    assert line
-    mutant = Mutant.get(line=line, index=mutation_id.index)
-    if mutant is None:
-        mutant = get_or_create(Mutant, line=line, index=mutation_id.index, defaults=dict(status=UNTESTED))
-
-    if mutant.status == OK_KILLED:
-        # We assume that if a mutant was killed, a change to the test
-        # suite will mean it's still killed
-        return OK_KILLED
-
-    if mutant.tested_against_hash != hash_of_tests or \
-            mutant.tested_against_hash == NO_TESTS_FOUND or \
-            hash_of_tests == NO_TESTS_FOUND:
-        return UNTESTED
-
-    return mutant.status
-
-
 @init_db
 @db_session
 def mutation_id_from_pk(pk):
@@ -521,9 +579,111 @@ def cached_test_time():
 
 @init_db
 @db_session
-def set_cached_test_time(baseline_time_elapsed, current_hash_of_tests):
+def set_cached_test_time(baseline_time_elapsed, current_hash_of_tests, baseline_peak_memory=None,
+                         baseline_cpu_time=None, calibration_key=None):
     get_or_create(MiscData, key='baseline_time_elapsed').value = str(baseline_time_elapsed)
     get_or_create(MiscData, key='hash_of_tests').value = current_hash_of_tests
+    # the value can't be None, '' stands for unknown
+    get_or_create(MiscData, key='baseline_peak_memory').value = (
+        str(baseline_peak_memory) if baseline_peak_memory is not None else '')
+    get_or_create(MiscData, key='baseline_cpu_time').value = (
+        str(baseline_cpu_time) if baseline_cpu_time is not None else '')
+    get_or_create(MiscData, key='baseline_calibration_key').value = calibration_key or ''
+
+
+@init_db
+@db_session
+def cached_baseline_peak_memory():
+    d = MiscData.get(key='baseline_peak_memory')
+    return int(d.value) if d and d.value else None
+
+
+@init_db
+@db_session
+def cached_baseline_cpu_time():
+    d = MiscData.get(key='baseline_cpu_time')
+    return float(d.value) if d and d.value else None
+
+
+@init_db
+@db_session
+def cached_baseline_calibration_key():
+    d = MiscData.get(key='baseline_calibration_key')
+    return d.value if d and d.value else None
+
+
+@init_db
+@db_session
+def cached_coverage_index(key):
+    """
+    :return: list of [test id, duration] and the indices of the tests covering each line by filename,
+        or :obj:`None` if there is no index for the given key
+    """
+    d = MiscData.get(key='coverage_key')
+    if d is None or d.value != key:
+        return None
+    tests = json.loads(MiscData.get(key='coverage_tests').value)
+    lines = json.loads(MiscData.get(key='coverage_lines').value)
+    return tests, lines
+
+
+@init_db
+@db_session
+def set_cached_coverage_index(key, tests, lines):
+    get_or_create(MiscData, key='coverage_key').value = key
+    get_or_create(MiscData, key='coverage_tests').value = json.dumps(tests, separators=(',', ':'))
+    get_or_create(MiscData, key='coverage_lines').value = json.dumps(lines, separators=(',', ':'))
+
+
+@init_db
+@db_session
+def cached_import_graph():
+    """
+    :return: hash and imported module names by filename, of the files the import graph was built from
+    """
+    d = MiscData.get(key='import_graph')
+    return json.loads(d.value) if d and d.value else {}
+
+
+@init_db
+@db_session
+def set_cached_import_graph(imports_by_filename):
+    get_or_create(MiscData, key='import_graph').value = json.dumps(imports_by_filename, separators=(',', ':'))
+
+
+@init_db
+@db_session
+def cached_mutations_by_chunk(filename):
+    """
+    :return: the key of the settings the mutations were listed with, and the mutations of each top
+        level statement of the file by the hash of its source
+    """
+    d = MiscData.get(key='mutations_by_chunk:' + filename)
+    return json.loads(d.value) if d and d.value else {}
+
+
+@init_db
+@db_session
+def set_cached_mutations_by_chunk(filename, mutations_by_chunk):
+    get_or_create(MiscData, key='mutations_by_chunk:' + filename).value = json.dumps(mutations_by_chunk, separators=(',', ':'))
+
+
+@init_db
+@db_session
+def get_test_kill_counts():
+    """
+    :return: number of mutants each test killed and number of mutants it was run against, by test id
+    """
+    return {x.test: [x.killed, x.run] for x in TestKillCount.select()}
+
+
+@init_db
+@db_session
+def update_test_kill_counts(tests, killed_by):
+    for test in tests:
+        counts = get_or_create(TestKillCount, test=test)
+        counts.killed += test == killed_by
+        counts.run += 1
 
 
 @init_db
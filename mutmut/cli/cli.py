@@ -51,6 +51,9 @@ def version():
 @click.option('--paths-to-exclude', type=click.STRING)
 @click.option('--runner')
 @click.option('--use-coverage', is_flag=True, default=False)
+@click.option('--collect-coverage', is_flag=True, default=False,
+              help='Measure the coverage and duration of each test during the baseline run with pytest and '
+                   'only mutate covered lines, like --use-coverage without a .coverage file.')
 @click.option('--use-patch-file', help='Only mutate lines added/changed in the given patch file')
 @click.option('--rerun-all', is_flag=True, default=False,
               help='If you modified the test_command in the pre_mutation hook, '
@@ -59,7 +62,9 @@ def version():
 @click.option('--tests-dir')
 @click.option('-m', '--test-time-multiplier', default=2.0, type=float)
 @click.option('-b', '--test-time-base', default=0.0, type=float)
-@click.option('-p', '--test-processes', default=1, type=int)
+@click.option('-p', '--test-processes', default='1',
+              help='The number of worker processes testing mutants, or auto to choose it from the available cores '
+                   'and memory and the memory the baseline run of the tests took.')
 @click.option('-s', '--swallow-output', help='turn off output capture', is_flag=True)
 @click.option('--dict-synonyms')
 @click.option('--pre-mutation')
@@ -69,6 +74,56 @@ def version():
 @click.option('--no-progress', is_flag=True, default=False, help="Disable real-time progress indicator")
 @click.option('--CI', is_flag=True, default=False,
               help="Returns an exit code of 0 for all successful runs and an exit code of 1 for fatal errors.")
+@click.option('--detect-equivalent', is_flag=True, default=False,
+              help='Compile each mutant before testing it and mark it as equivalent '
+                   'if its code is identical to the code of the original module.')
+@click.option('--deduplicate-mutants', is_flag=True, default=False,
+              help='Only test one of the mutants that produce identical source code '
+                   'and give the others the same status.')
+@click.option('--sample', type=int,
+              help='Only test a random sample of this many mutants, stratified by file and mutation type, '
+                   'and estimate the mutation score of all mutants from it.')
+@click.option('--sample-fraction', type=float,
+              help='Like --sample, but the sample size is given as a fraction of all mutants, e.g. 0.1.')
+@click.option('--sample-seed', default=0, type=int,
+              help='Seed for drawing the sample. The same seed gives the same sample for the same code.')
+@click.option('--time-budget', type=float,
+              help='Stop starting new mutants after this many seconds, counted from the start of the run. '
+                   'The mutants that are expected to tell the most per second of testing go first.')
+@click.option('--group-mutants', type=int,
+              help='Test up to this many mutants from different functions together with one run of their covering '
+                   'tests. Requires --collect-coverage, or --use-coverage with pytest-cov test contexts, and pytest '
+                   'as runner.')
+@click.option('--select-tests', is_flag=True, default=False,
+              help='Only run the tests covering a mutant, the tests most likely to kill it per second first, and stop '
+                   'at the first failure. Requires --use-coverage or --collect-coverage and pytest as runner.')
+@click.option('--first-stage-budget', type=float,
+              help='With --select-tests, first run the best covering tests up to this many seconds and only run the '
+                   'other covering tests if they all pass.')
+@click.option('--use-import-graph', is_flag=True, default=False,
+              help='Only run the test files that import the mutated module, directly or through other modules, '
+                   'found by reading the imports of the code and the tests. Requires pytest as runner.')
+@click.option('--start-method', type=click.Choice(['spawn', 'forkserver', 'fork']), default='spawn',
+              help='How the worker processes are started. forkserver and fork start them much faster than spawn, '
+                   'but fork is unsafe on macOS and with code under test that starts threads on import.')
+@click.option('--max-worker-mutants', type=click.INT,
+              help='Replace a worker process by a new one after it tested this many mutants, 0 for never. '
+                   'Default 100.')
+@click.option('--max-worker-memory', type=click.FLOAT,
+              help='Replace a worker process by a new one once its resident set size exceeds this many megabytes.')
+@click.option('--max-worker-age', type=click.FLOAT,
+              help='Replace a worker process by a new one once it is running for this many seconds.')
+@click.option('--max-test-memory', type=click.FLOAT,
+              help='Limit the address space of every process of a test run of a mutant to this many megabytes.')
+@click.option('--max-test-cpu-time', type=click.FLOAT,
+              help='Stop every process of a test run of a mutant once it used this many seconds of CPU time, '
+                   'the mutant counts as timed out.')
+@click.option('--use-cpu-time', is_flag=True,
+              help='Judge whether the tests of a mutant time out or are suspiciously slow by the CPU time they '
+                   'use as well as by the wall time, so tests waiting for a CPU on a busy machine are not.')
+@click.option('--baseline-runs', type=click.INT,
+              help='Run the tests this many times without mutations and base the timeouts on the 90th percentile '
+                   'of the durations. The baseline is measured again when the tests or the code under test change.')
 @config_from_file(
     dict_synonyms='',
     paths_to_exclude='',
@@ -81,7 +136,10 @@ def version():
 def run(argument, paths_to_mutate, disable_mutation_types, enable_mutation_types, runner,
         tests_dir, test_time_multiplier, test_time_base, test_processes, swallow_output, use_coverage,
         dict_synonyms, pre_mutation, post_mutation, use_patch_file, paths_to_exclude,
-        simple_output, no_progress, ci, rerun_all):
+        simple_output, no_progress, ci, rerun_all, detect_equivalent, deduplicate_mutants, sample,
+        sample_fraction, sample_seed, time_budget, group_mutants, collect_coverage, select_tests,
+        first_stage_budget, use_import_graph, start_method, max_worker_mutants, max_worker_memory, max_worker_age,
+        max_test_memory, max_test_cpu_time, use_cpu_time, baseline_runs):
     """
     Runs mutmut. You probably want to start with just trying this. If you supply a mutation ID mutmut will check just this mutant.
 
@@ -117,7 +175,10 @@ def run(argument, paths_to_mutate, disable_mutation_types, enable_mutation_types
         argument, paths_to_mutate, disable_mutation_types, enable_mutation_types, runner,
         tests_dir, test_time_multiplier, test_time_base, test_processes, swallow_output, use_coverage,
         dict_synonyms, pre_mutation, post_mutation, use_patch_file, paths_to_exclude,
-        simple_output, no_progress, ci, rerun_all
+        simple_output, no_progress, ci, rerun_all, detect_equivalent, deduplicate_mutants, sample,
+        sample_fraction, sample_seed, time_budget, group_mutants, collect_coverage, select_tests, first_stage_budget,
+        use_import_graph, start_method, max_worker_mutants, max_worker_memory, max_worker_age, max_test_memory,
+        max_test_cpu_time, use_cpu_time, baseline_runs
     )
 
     sys.exit(cli_run.do_run())
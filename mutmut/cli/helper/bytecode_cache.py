@@ -0,0 +1,57 @@
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import List, Optional
+
+from mutmut.cli.helper.utils import stop_creating_pyc_files
+from mutmut.tester.tester_helper import PYCACHE_PREFIX_VARIABLE
+
+
+class BytecodeCache:
+    """A bytecode cache outside of the source tree that stays valid while files are mutated
+
+    The baseline run fills the cache, then the code to mutate is compiled again into pycs that are
+    checked against the hash of the source instead of its modification time, so a mutant that is
+    written in the same second and has the same size as the original is never mistaken for it. Each
+    worker copies this cache into its own directory, after which only the mutated module has to be
+    compiled again for each mutant.
+
+    Before Python 3.8 there is no ``PYTHONPYCACHEPREFIX``, and if writing bytecode is turned off with
+    ``-B`` or ``PYTHONDONTWRITEBYTECODE`` a cache would only be filled to be thrown away again, so in
+    both cases no bytecode is written at all instead.
+    """
+
+    def __init__(self, paths_to_mutate: List[str]):
+        self.paths_to_mutate = paths_to_mutate
+        self.directory: Optional[str] = None
+
+    def enable(self):
+        """Point test runs started from now on at the cache"""
+        if sys.version_info < (3, 8) or sys.flags.dont_write_bytecode:
+            stop_creating_pyc_files()
+            return
+        self.directory = tempfile.mkdtemp(prefix='mutmut-pycache-')
+        os.environ[PYCACHE_PREFIX_VARIABLE] = os.path.join(self.directory, 'template')
+        atexit.register(self.cleanup)
+
+    def warm(self):
+        """Compile the code to mutate into hash checked pycs, replacing those of the baseline run"""
+        if self.directory is None:
+            return
+        subprocess.run(
+            [sys.executable, '-m', 'compileall', '-q', '-f', '--invalidation-mode', 'checked-hash',
+             *self.paths_to_mutate],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def cleanup(self):
+        if self.directory is None:
+            return
+        if os.environ.get(PYCACHE_PREFIX_VARIABLE, '').startswith(self.directory):
+            del os.environ[PYCACHE_PREFIX_VARIABLE]
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = None
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from mutmut.cache import hash_of, cached_coverage_index, set_cached_coverage_index
+from mutmut.cli.helper.utils import python_source_files
+from mutmut.helpers.coverage_index import CoverageIndex
+from mutmut.tester.group_testing import PYTEST_PLUGIN
+from mutmut.tester.pytest_plugin import (COVERAGE_FILE_VARIABLE, COVERAGE_INCLUDE_VARIABLE,
+                                         TEST_DURATIONS_FILE_VARIABLE)
+
+
+class CoverageCollector:
+    """Measure the coverage of each test and its duration during the baseline run
+
+    The result is stored in the cache as a list of tests with their durations and, for each file,
+    the indices of the tests covering each line. It is only valid for the tests and sources it was
+    collected with.
+    """
+
+    def __init__(self, paths_to_mutate: List[str], tests_dirs: List[str]):
+        self.paths_to_mutate = paths_to_mutate
+        self.tests_dirs = tests_dirs
+        self._coverage_file = None
+        self._durations_file = None
+
+    def key(self, hash_of_tests: str) -> str:
+        m = hashlib.sha256()
+        m.update(hash_of_tests.encode())
+        for path in self.paths_to_mutate:
+            for filename in sorted(python_source_files(path, self.tests_dirs)):
+                m.update(filename.encode())
+                m.update(hash_of(filename).encode())
+        return m.hexdigest()
+
+    def has_cached_index(self, hash_of_tests: str) -> bool:
+        return cached_coverage_index(self.key(hash_of_tests)) is not None
+
+    def include_patterns(self) -> List[str]:
+        return [
+            os.path.join(os.path.abspath(path), '*') if os.path.isdir(path) else os.path.abspath(path)
+            for path in self.paths_to_mutate
+        ]
+
+    @staticmethod
+    def test_command(test_command: str) -> str:
+        return f'{test_command} -p {PYTEST_PLUGIN}'
+
+    @contextmanager
+    def collecting(self):
+        """Set up the environment for the pytest plugin to measure coverage and durations
+
+        :meth:`store` has to be called before leaving the ``with`` block.
+        """
+        directory = tempfile.mkdtemp(prefix='mutmut-coverage-')
+        self._coverage_file = os.path.join(directory, 'coverage')
+        self._durations_file = os.path.join(directory, 'durations.json')
+        variables = {
+            COVERAGE_FILE_VARIABLE: self._coverage_file,
+            COVERAGE_INCLUDE_VARIABLE: os.pathsep.join(self.include_patterns()),
+            TEST_DURATIONS_FILE_VARIABLE: self._durations_file,
+        }
+        os.environ.update(variables)
+        try:
+            yield
+        finally:
+            for name in variables:
+                del os.environ[name]
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def store(self, hash_of_tests: str):
+        """Read what the pytest plugin measured and store it in the cache"""
+        with open(self._durations_file) as f:
+            durations = json.load(f)
+        data = CoverageIndex(self._coverage_file)
+
+        test_ids = sorted(durations)
+        index_by_test_id = {test_id: i for i, test_id in enumerate(test_ids)}
+        lines = {}
+        for filepath, coverage_of_file in data.items():
+            lines[os.path.relpath(filepath)] = {
+                line_number: sorted(index_by_test_id[x] for x in contexts if x in index_by_test_id)
+                for line_number, contexts in coverage_of_file.items()
+            }
+        tests = [[test_id, durations[test_id]] for test_id in test_ids]
+        set_cached_coverage_index(self.key(hash_of_tests), tests, lines)
+
+    def load(self, hash_of_tests: str) -> Optional[tuple]:
+        """
+        :return: the coverage data by absolute filename and line number, in the format of
+            :func:`read_coverage_data`, and the duration of each test
+        """
+        index = cached_coverage_index(self.key(hash_of_tests))
+        if index is None:
+            return None
+        tests, lines = index
+        coverage_data: Dict[str, Dict[int, List[str]]] = {
+            os.path.abspath(filename): {
+                int(line_number): [tests[i][0] for i in test_indices]
+                for line_number, test_indices in lines_of_file.items()
+            }
+            for filename, lines_of_file in lines.items()
+        }
+        test_durations = {test_id: duration for test_id, duration in tests}
+        return coverage_data, test_durations
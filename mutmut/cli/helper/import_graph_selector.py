@@ -0,0 +1,81 @@
+import os
+from typing import Dict, List, Optional
+
+from mutmut.cache import hash_of, cached_import_graph, set_cached_import_graph
+from mutmut.cli.helper.utils import python_source_files
+from mutmut.helpers.import_graph import ImportGraph, imported_modules
+
+
+def is_test_file(filename: str) -> bool:
+    name = os.path.basename(filename)
+    return name.endswith('.py') and (name.startswith('test') or name.endswith('_test.py'))
+
+
+def is_inside(filename: str, directory: str) -> bool:
+    directory = os.path.abspath(directory)
+    return os.path.commonpath([directory, os.path.abspath(filename)]) == directory
+
+
+class ImportGraphSelector:
+    """Find the test files that import each file to mutate, directly or through other files
+
+    The imports of every file are stored in the cache with the hash of the file, so only files
+    that changed since the last run are parsed again.
+    """
+
+    def __init__(self, paths_to_mutate: List[str], tests_dirs: List[str], paths_to_exclude: Optional[List[str]] = None):
+        self.paths_to_mutate = paths_to_mutate
+        self.tests_dirs = tests_dirs
+        self.paths_to_exclude = paths_to_exclude
+
+    def source_files(self) -> List[str]:
+        result = []
+        for path in self.paths_to_mutate:
+            result.extend(python_source_files(path, self.tests_dirs, self.paths_to_exclude))
+        return result
+
+    def test_directory_files(self) -> List[str]:
+        result = []
+        for tests_dir in self.tests_dirs:
+            for root, dirs, files in os.walk(tests_dir):
+                result.extend(os.path.join(root, x) for x in files if x.endswith('.py'))
+        return result
+
+    def imports_by_filename(self, filenames: List[str]) -> Dict[str, List[str]]:
+        cached = cached_import_graph()
+        result = {}
+        changed = False
+        for filename in filenames:
+            file_hash = hash_of(filename)
+            if filename in cached and cached[filename][0] == file_hash:
+                result[filename] = cached[filename][1]
+                continue
+            with open(filename) as f:
+                result[filename] = imported_modules(f.read(), filename)
+            cached[filename] = [file_hash, result[filename]]
+            changed = True
+
+        if changed or len(cached) != len(result):
+            set_cached_import_graph({filename: cached[filename] for filename in filenames})
+        return result
+
+    def test_files_by_filename(self) -> Dict[str, List[str]]:
+        """
+        :return: the test files that depend on each source file to mutate, a ``conftest.py`` makes all
+            test files in its directory depend on what it imports
+        """
+        source_files = self.source_files()
+        test_directory_files = self.test_directory_files()
+        graph = ImportGraph(self.imports_by_filename(sorted(set(source_files + test_directory_files))))
+
+        result = {}
+        for filename in source_files:
+            test_files = set()
+            for importer in graph.importers([filename]):
+                if is_test_file(importer):
+                    test_files.add(importer)
+                elif os.path.basename(importer) == 'conftest.py':
+                    directory = os.path.dirname(importer)
+                    test_files.update(x for x in test_directory_files if is_test_file(x) and is_inside(x, directory))
+            result[filename] = sorted(test_files)
+        return result
@@ -0,0 +1,47 @@
+import atexit
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+import mutmut
+
+PYTHONPATH_VARIABLE = 'PYTHONPATH'
+
+
+class PluginPath:
+    """Make the pytest plugin of mutmut importable by the test runs
+
+    The test command is given ``-p mutmut.tester.pytest_plugin``, but the tests may run with an
+    interpreter that can't import mutmut, for example when mutmut is installed with pipx or into another
+    virtualenv. A directory holding nothing but the mutmut package is put in front of ``PYTHONPATH``,
+    so no other package of the environment of mutmut ends up in that of the tests.
+    """
+
+    def __init__(self):
+        self.directory: Optional[str] = None
+        self._previous_pythonpath: Optional[str] = None
+
+    def enable(self):
+        """Point test runs started from now on at the directory holding the mutmut package"""
+        self.directory = tempfile.mkdtemp(prefix='mutmut-plugin-')
+        package = os.path.dirname(os.path.abspath(mutmut.__file__))
+        try:
+            os.symlink(package, os.path.join(self.directory, 'mutmut'), target_is_directory=True)
+        except OSError:  # no permission to create symlinks on Windows
+            shutil.copytree(package, os.path.join(self.directory, 'mutmut'),
+                            ignore=shutil.ignore_patterns('__pycache__'))
+        self._previous_pythonpath = os.environ.get(PYTHONPATH_VARIABLE)
+        os.environ[PYTHONPATH_VARIABLE] = os.pathsep.join(
+            x for x in (self.directory, self._previous_pythonpath) if x)
+        atexit.register(self.cleanup)
+
+    def cleanup(self):
+        if self.directory is None:
+            return
+        if self._previous_pythonpath is None:
+            os.environ.pop(PYTHONPATH_VARIABLE, None)
+        else:
+            os.environ[PYTHONPATH_VARIABLE] = self._previous_pythonpath
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = None
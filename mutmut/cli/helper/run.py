@@ -1,5 +1,7 @@
+import multiprocessing
 import os
 import traceback
+from time import time
 from io import (open, )
 from os.path import exists, isdir
 
@@ -12,13 +14,22 @@ except ImportError:
     mutmut_config = None
 from mutmut.helpers.config import Config
 from mutmut.helpers.progress import Progress
-from mutmut.cache import hash_of_tests
+from mutmut.helpers.sampling import (group_by_stratum, stratified_sample, restrict_duplicates,
+                                     estimate_mutation_score)
+from mutmut.cache import hash_of_tests, hash_of_sources, get_cached_mutation_statuses, get_test_kill_counts
 from mutmut.cli.helper.run_argument_parser import RunArgumentParser
+from mutmut.cli.helper.bytecode_cache import BytecodeCache
+from mutmut.cli.helper.coverage_collector import CoverageCollector
+from mutmut.cli.helper.import_graph_selector import ImportGraphSelector
+from mutmut.cli.helper.plugin_path import PluginPath
 from mutmut.cli.helper.test_suite_timer import TestSuiteTimer
-from mutmut.cli.helper.utils import (split_paths, get_split_paths, copy_testmon_data, stop_creating_pyc_files,
-                                     read_coverage_data, read_patch_data)
+from mutmut.cli.helper.utils import (split_paths, get_split_paths, copy_testmon_data, read_coverage_data,
+                                     read_patch_data)
 from mutmut.mutator.mutator_helper import MutatorHelper
+from mutmut.tester.group_testing import can_group_mutants
 from mutmut.tester.tester import Tester
+from mutmut.tester.tester_helper import HASH_SEED_VARIABLE, MAX_WORKERS
+from mutmut.tester.worker_count import automatic_worker_count
 
 
 class Run:
@@ -28,7 +39,10 @@ class Run:
     def __init__(self, argument, paths_to_mutate, disable_mutation_types, enable_mutation_types, runner, tests_dir,
                  test_time_multiplier, test_time_base, test_processes, swallow_output, use_coverage, dict_synonyms,
                  pre_mutation, post_mutation, use_patch_file, paths_to_exclude, simple_output, no_progress, ci,
-                 rerun_all):
+                 rerun_all, detect_equivalent, deduplicate_mutants, sample, sample_fraction,
+                 sample_seed, time_budget, group_mutants, collect_coverage, select_tests, first_stage_budget,
+                 use_import_graph, start_method, max_worker_mutants, max_worker_memory, max_worker_age,
+                 max_test_memory, max_test_cpu_time, use_cpu_time, baseline_runs):
 
         self.argument = argument
         self.paths_to_mutate = paths_to_mutate
@@ -50,6 +64,26 @@ class Run:
         self.no_progress = no_progress
         self.ci = ci
         self.rerun_all = rerun_all
+        self.detect_equivalent = detect_equivalent
+        self.deduplicate_mutants = deduplicate_mutants
+        self.sample = sample
+        self.sample_fraction = sample_fraction
+        self.sample_seed = sample_seed or 0
+        self.time_budget = time_budget
+        self.group_mutants = group_mutants or 0
+        self.collect_coverage = collect_coverage
+        self.select_tests = select_tests
+        self.first_stage_budget = first_stage_budget
+        self.use_import_graph = use_import_graph
+        self.start_method = start_method or 'spawn'
+        self.max_worker_mutants = max_worker_mutants
+        self.max_worker_memory = max_worker_memory
+        self.max_worker_age = max_worker_age
+        self.max_test_memory = max_test_memory
+        self.max_test_cpu_time = max_test_cpu_time
+        self.use_cpu_time = use_cpu_time
+        self.baseline_runs = baseline_runs or 1
+        self.start_time = None
         self.mutation_types_to_apply = None
         self.tests_dirs = None
         self.using_testmon = None
@@ -77,12 +111,98 @@ class Run:
         Checks on bad arguments for the do_run function
         """
 
+        if self.test_processes != 'auto':
+            try:
+                self.test_processes = int(self.test_processes)
+            except ValueError:
+                self.test_processes = 0
+            if self.test_processes < 1:
+                raise click.BadOptionUsage('--test-processes',
+                                           'The number of test processes must be a positive number or auto.')
+            if self.test_processes > MAX_WORKERS:
+                raise click.BadOptionUsage('--test-processes',
+                                           f'At most {MAX_WORKERS} test processes are supported, '
+                                           'so that each gets ports of its own.')
+
         if self.use_coverage and self.use_patch_file:
             raise click.BadArgumentUsage("You can't combine --use-coverage and --use-patch")
 
         if self.disable_mutation_types and self.enable_mutation_types:
             raise click.BadArgumentUsage("You can't combine --disable-mutation-types and --enable-mutation-types")
 
+        if self.sample and self.sample_fraction:
+            raise click.BadArgumentUsage("You can't combine --sample and --sample-fraction")
+
+        if self.sample is not None and self.sample <= 0:
+            raise click.BadOptionUsage('--sample', 'The sample size must be a positive number of mutants.')
+
+        if self.sample_fraction is not None and not 0 < self.sample_fraction <= 1:
+            raise click.BadOptionUsage('--sample-fraction', 'The sample fraction must be larger than 0 and at most 1.')
+
+        if self.time_budget is not None and self.time_budget <= 0:
+            raise click.BadOptionUsage('--time-budget', 'The time budget must be a positive number of seconds.')
+
+        if self.collect_coverage and (self.use_coverage or self.use_patch_file):
+            raise click.BadArgumentUsage("You can't combine --collect-coverage with --use-coverage or --use-patch")
+
+        if self.collect_coverage and 'pytest' not in self.runner:
+            raise click.BadOptionUsage('--collect-coverage', '--collect-coverage only works with pytest as runner.')
+
+        if self.group_mutants and not (self.use_coverage or self.collect_coverage):
+            raise click.BadArgumentUsage(
+                "--group-mutants needs the coverage contexts of --use-coverage or --collect-coverage")
+
+        if self.group_mutants and 'pytest' not in self.runner:
+            raise click.BadOptionUsage('--group-mutants', '--group-mutants only works with pytest as runner.')
+
+        if self.select_tests and not (self.use_coverage or self.collect_coverage):
+            raise click.BadArgumentUsage(
+                "--select-tests needs the coverage contexts of --use-coverage or --collect-coverage")
+
+        if self.select_tests and 'pytest' not in self.runner:
+            raise click.BadOptionUsage('--select-tests', '--select-tests only works with pytest as runner.')
+
+        if self.first_stage_budget is not None and not self.select_tests:
+            raise click.BadOptionUsage('--first-stage-budget', '--first-stage-budget only works with --select-tests.')
+
+        if self.use_import_graph and 'pytest' not in self.runner:
+            raise click.BadOptionUsage('--use-import-graph', '--use-import-graph only works with pytest as runner.')
+
+        if self.first_stage_budget is not None and self.first_stage_budget <= 0:
+            raise click.BadOptionUsage('--first-stage-budget',
+                                       'The first stage budget must be a positive number of seconds.')
+
+        if self.max_worker_mutants is not None and self.max_worker_mutants < 0:
+            raise click.BadOptionUsage('--max-worker-mutants', 'The number of mutants must be 0 or more.')
+
+        if self.max_worker_memory is not None and self.max_worker_memory <= 0:
+            raise click.BadOptionUsage('--max-worker-memory', 'The memory limit must be a positive number of megabytes.')
+
+        if self.max_worker_age is not None and self.max_worker_age <= 0:
+            raise click.BadOptionUsage('--max-worker-age', 'The age limit must be a positive number of seconds.')
+
+        if self.max_test_memory is not None and self.max_test_memory <= 0:
+            raise click.BadOptionUsage('--max-test-memory', 'The memory limit must be a positive number of megabytes.')
+
+        if self.max_test_cpu_time is not None and self.max_test_cpu_time <= 0:
+            raise click.BadOptionUsage('--max-test-cpu-time', 'The CPU time limit must be a positive number of seconds.')
+
+        if os.name == 'nt' and (self.max_test_memory is not None or self.max_test_cpu_time is not None):
+            raise click.BadArgumentUsage("--max-test-memory and --max-test-cpu-time don't work on Windows")
+
+        if self.baseline_runs < 1:
+            raise click.BadOptionUsage('--baseline-runs', 'The number of baseline runs must be a positive number.')
+
+        if self.baseline_runs > 1 and '--testmon' in self.runner:
+            raise click.BadArgumentUsage("You can't combine --baseline-runs with --testmon, which only runs the tests "
+                                         "that changed after the first run")
+
+        if self.start_method not in multiprocessing.get_all_start_methods():
+            raise click.BadOptionUsage('--start-method', 'The start method {} is not available on this platform, '
+                                                         'use one of {}.'.format(
+                                                             self.start_method,
+                                                             ', '.join(multiprocessing.get_all_start_methods())))
+
     def set_mutation_types_to_apply(self):
         """
         Get mutation types to apply and raise an error if invalid types are provided
@@ -179,7 +299,8 @@ class Run:
         Get the output legend based on the simple_output flag
         """
 
-        output_legend = {"killed": "🎉", "timeout": "⏰", "suspicious": "🤔", "survived": "🙁", "skipped": "🔇", }
+        output_legend = {"killed": "🎉", "timeout": "⏰", "suspicious": "🤔", "survived": "🙁", "skipped": "🔇",
+                         "equivalent": "👯", }
 
         if self.simple_output:
             output_legend = {key: key.upper() for (key, value) in output_legend.items()}
@@ -205,6 +326,7 @@ class Run:
         {suspicious} Suspicious.       Tests took a long time, but not long enough to be fatal.
         {survived} Survived.         This means your tests need to be expanded.
         {skipped} Skipped.          Skipped.
+        {equivalent} Equivalent.       Compiles to the same code as the original, so it can't be killed.
         """.format(**self.get_output_legend()))
 
     def check_additional_imports(self):
@@ -231,17 +353,22 @@ class Run:
             self.paths_to_exclude = [path.strip() for path in self.paths_to_exclude.replace(',', '\n').split('\n')]
             self.paths_to_exclude = [x for x in self.paths_to_exclude if x]
 
-    def get_covered_data(self):
+    def get_covered_data(self, coverage_collector=None, current_hash_of_tests=None):
         """
-        Get the covered data based on the use_coverage and use_patch_file flags
+        Get the covered data based on the use_coverage, collect_coverage and use_patch_file flags
 
-        :return: covered lines by filename and coverage data
+        :return: covered lines by filename, coverage data and the duration of each test
         """
 
         covered_lines_by_filename = None
         coverage_data = None
+        test_durations = None
+
+        if coverage_collector is not None:
+            covered_lines_by_filename = {}
+            coverage_data, test_durations = coverage_collector.load(current_hash_of_tests)
 
-        if self.use_coverage:
+        elif self.use_coverage:
             covered_lines_by_filename = {}
             coverage_data = read_coverage_data()
             self.check_coverage_data_filepaths(coverage_data)
@@ -250,7 +377,7 @@ class Run:
             assert self.use_patch_file
             covered_lines_by_filename = read_patch_data(self.use_patch_file)
 
-        return covered_lines_by_filename, coverage_data
+        return covered_lines_by_filename, coverage_data, test_durations
 
     def prepare_test_directories(self):
         """
@@ -284,18 +411,30 @@ class Run:
         :param current_hash_of_tests: hash of the tests
         :return: configuration for the mutation testing
         """
+        coverage_collector = CoverageCollector(self.paths_to_mutate, self.tests_dirs) if self.collect_coverage else None
         test_suite_timer = TestSuiteTimer(swallow_output=not self.swallow_output, test_command=self.runner,
-                                        using_testmon=self.using_testmon, no_progress=self.no_progress, )
+                                          using_testmon=self.using_testmon, no_progress=self.no_progress,
+                                          coverage_collector=coverage_collector, baseline_runs=self.baseline_runs,
+                                          current_hash_of_sources=(hash_of_sources(self.paths_to_mutate)
+                                                                   if self.baseline_runs > 1 else None))
 
         baseline_time_elapsed = test_suite_timer.time_test_suite(current_hash_of_tests)
+        baseline_peak_memory = test_suite_timer.peak_memory
+        baseline_cpu_time = test_suite_timer.cpu_time
 
         copy_testmon_data(self.using_testmon)
 
         # if we're running in a mode with externally whitelisted lines
-        covered_lines_by_filename, coverage_data = self.get_covered_data()
+        covered_lines_by_filename, coverage_data, test_durations = self.get_covered_data(
+            coverage_collector, current_hash_of_tests)
 
         self.check_paths_to_exclude()
 
+        test_files_by_filename = None
+        if self.use_import_graph:
+            selector = ImportGraphSelector(self.paths_to_mutate, self.tests_dirs, self.paths_to_exclude)
+            test_files_by_filename = selector.test_files_by_filename()
+
         return Config(total=0,  # we'll fill this in later!
                       swallow_output=not self.swallow_output, test_command=self.runner,
                       covered_lines_by_filename=covered_lines_by_filename, coverage_data=coverage_data,
@@ -305,18 +444,81 @@ class Run:
                       pre_mutation=self.pre_mutation, post_mutation=self.post_mutation,
                       paths_to_mutate=self.paths_to_mutate,
                       mutation_types_to_apply=self.mutation_types_to_apply, no_progress=self.no_progress, ci=self.ci,
-                      rerun_all=self.rerun_all)
+                      rerun_all=self.rerun_all, detect_equivalent=self.detect_equivalent,
+                      deduplicate_mutants=self.deduplicate_mutants,
+                      deadline=self.start_time + self.time_budget if self.time_budget else None,
+                      group_mutants=self.group_mutants, test_durations=test_durations,
+                      select_tests=self.select_tests, first_stage_budget=self.first_stage_budget,
+                      test_kill_counts=get_test_kill_counts() if self.select_tests else None,
+                      test_files_by_filename=test_files_by_filename, start_method=self.start_method,
+                      max_worker_mutants=self.max_worker_mutants, max_worker_memory=self.max_worker_memory,
+                      max_worker_age=self.max_worker_age, baseline_peak_memory=baseline_peak_memory,
+                      automatic_test_processes=self.test_processes == 'auto', max_test_memory=self.max_test_memory,
+                      max_test_cpu_time=self.max_test_cpu_time, use_cpu_time=self.use_cpu_time,
+                      baseline_cpu_time=baseline_cpu_time)
+
+    def sample_mutations(self, mutations_by_file, duplicates_by_file):
+        """
+        Draw the sample of mutants to test if --sample or --sample-fraction is given
+
+        :return: mutations by file and duplicates by file, restricted to the sample
+        """
+
+        if not self.sample and not self.sample_fraction:
+            return mutations_by_file, duplicates_by_file
+
+        total = sum(len(mutations) for mutations in mutations_by_file.values())
+        sample_size = self.sample or max(1, round(total * self.sample_fraction))
+        sampled_mutations_by_file = stratified_sample(mutations_by_file, sample_size, self.sample_seed)
+        return sampled_mutations_by_file, restrict_duplicates(duplicates_by_file, sampled_mutations_by_file)
+
+    def print_mutation_score_estimate(self, mutations_by_file, sampled_mutations_by_file, hash_of_tests):
+        """
+        Print the mutation score of all mutants as estimated from the sampled mutants
+        """
+
+        population_sizes = {key: len(mutations) for key, mutations in group_by_stratum(mutations_by_file).items()}
+        statuses_by_stratum = {}
+        for filename, mutations in sampled_mutations_by_file.items():
+            statuses = get_cached_mutation_statuses(filename, mutations, hash_of_tests)
+            for mutation_id in mutations:
+                key = (filename, mutation_id.mutation_type)
+                statuses_by_stratum.setdefault(key, []).append(statuses[mutation_id])
+
+        estimate = estimate_mutation_score(population_sizes, statuses_by_stratum)
+        print()
+        print('Estimated mutation score: {:.1f}% ± {:.1f}% (95% confidence interval {:.1f}%-{:.1f}%, '
+              '{} of {} mutants sampled)'.format(estimate.score * 100, estimate.margin * 100, estimate.lower * 100,
+                                                 estimate.upper * 100, estimate.sampled, estimate.population))
+
+    def can_stream_mutations(self, config: Config) -> bool:
+        """Mutants can be tested while the mutations are still being listed, unless all of them are needed
+        first, to sample them, to schedule them for the time budget or to test them in groups
+        """
+        if self.argument is not None or self.sample or self.sample_fraction:
+            return False
+        return config.deadline is None and not can_group_mutants(config)
 
     def do_run(self):
         """
         Run the mutation testing
         """
 
+        self.start_time = time()
+
         self.prepare_test_directories()
 
         current_hash_of_tests = hash_of_tests(self.tests_dirs)
 
-        stop_creating_pyc_files()
+        bytecode_cache = BytecodeCache(self.paths_to_mutate)
+        bytecode_cache.enable()
+
+        # every run of the tests, the baseline included, iterates sets and dicts of strings in the same order
+        os.environ.setdefault(HASH_SEED_VARIABLE, '0')
+
+        plugin_path = PluginPath()
+        if self.collect_coverage or self.group_mutants or self.select_tests:
+            plugin_path.enable()
 
         self.set_using_testmon()
 
@@ -326,30 +528,58 @@ class Run:
 
         config = self.setup_config(current_hash_of_tests)
 
+        bytecode_cache.warm()
+
         run_argument_parser = RunArgumentParser(self.argument, config, self.dict_synonyms, {},
                                                 self.paths_to_exclude,
                                                 self.paths_to_mutate, self.tests_dirs)
 
-        run_argument_parser.parse_run_argument()
+        streamed_mutations = None
+        if self.can_stream_mutations(config):
+            # the mutants of each file are tested while the next files are still being mutated, the
+            # total is unknown until all files are done, and stays 0 in the config
+            streamed_mutations = run_argument_parser.stream_mutations()
+            all_mutations_by_file = mutations_by_file = run_argument_parser.mutations_by_file
+            duplicates_by_file = run_argument_parser.duplicates_by_file
+        else:
+            run_argument_parser.parse_run_argument()
 
-        mutations_by_file = run_argument_parser.mutations_by_file
+            all_mutations_by_file = run_argument_parser.mutations_by_file
+            mutations_by_file, duplicates_by_file = self.sample_mutations(all_mutations_by_file,
+                                                                          run_argument_parser.duplicates_by_file)
 
-        config.total = sum(len(mutations) for mutations in mutations_by_file.values())
+            config.total = sum(len(mutations) for mutations in mutations_by_file.values())
 
         print()
         print('2. Checking mutants')
         progress = Progress(total=config.total, output_legend=self.get_output_legend(), no_progress=self.no_progress)
         tester = Tester()
 
+        test_processes = self.test_processes
+        if config.automatic_test_processes:
+            test_processes = automatic_worker_count(config.test_command, config.baseline_peak_memory)
+            print('Using {} test processes'.format(test_processes))
+
         try:
-            tester.run_mutation_tests(config=config, progress=progress, test_processes=self.test_processes,
-                                      mutations_by_file=mutations_by_file)
+            tester.run_mutation_tests(config=config, progress=progress, test_processes=test_processes,
+                                      mutations_by_file=mutations_by_file,
+                                      duplicates_by_file=duplicates_by_file,
+                                      streamed_mutations=streamed_mutations)
         except Exception as e:
             traceback.print_exc()
             return progress.compute_exit_code(e)
         else:
+            if config.deadline is not None and progress.currently_tested < progress.total:
+                print()
+                print('The time budget of {:g} seconds is spent, {} mutants were not tested. '
+                      'Run mutmut again to continue.'.format(self.time_budget,
+                                                             progress.total - progress.currently_tested))
+            if mutations_by_file is not all_mutations_by_file:
+                self.print_mutation_score_estimate(all_mutations_by_file, mutations_by_file, current_hash_of_tests)
             return progress.compute_exit_code(ci=self.ci)
         finally:
             print()  # make sure we end the output with a newline
             # Close all active multiprocessing queues to avoid hanging up the main process
             tester.queue_manager.close_active_queues()
+            bytecode_cache.cleanup()
+            plugin_path.cleanup()
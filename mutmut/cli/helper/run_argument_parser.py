@@ -1,8 +1,9 @@
-from typing import Dict, List
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Tuple
 
 from mutmut.cache import filename_and_mutation_id_from_pk, update_line_numbers
 from mutmut.cli.helper.utils import check_file_exists, python_source_files
-from mutmut.mutator.mutator import Mutator
+from mutmut.mutator.incremental import IncrementalMutator
 from mutmut.helpers.context import Context
 from mutmut.helpers.relativemutationid import RelativeMutationID
 
@@ -19,6 +20,7 @@ class RunArgumentParser:
         self.paths_to_exclude = paths_to_exclude
         self.paths_to_mutate = paths_to_mutate
         self.tests_dirs = tests_dirs
+        self.duplicates_by_file: Dict[str, Dict[RelativeMutationID, List[RelativeMutationID]]] = {}
 
     def parse_run_argument(self):
         if self.argument is None:
@@ -39,19 +41,31 @@ class RunArgumentParser:
         self.mutations_by_file[filename] = [mutation_id]
 
     def iterate_over_paths_to_mutate(self):
+        for _ in self.stream_mutations():
+            pass
+
+    def stream_mutations(self) -> Iterator[Tuple[str, List[RelativeMutationID], Dict[RelativeMutationID, List[RelativeMutationID]]]]:
+        """List the mutations of the paths to mutate one file at a time, so testing can start right away
+
+        :return: iterator over the filename, the mutations and the duplicates of each file, which are
+            also added to ``mutations_by_file`` and ``duplicates_by_file``
+        """
         for path in self.paths_to_mutate:
-            self.iterate_over_python_source_files(path)
+            for filename in self.iterate_over_python_source_files(path):
+                yield filename, self.mutations_by_file[filename], self.duplicates_by_file.get(filename, {})
 
-    def iterate_over_python_source_files(self, path):
+    def iterate_over_python_source_files(self, path) -> Iterator[str]:
         for filename in python_source_files(path, self.tests_dirs, self.paths_to_exclude):
-            self.update_lines_and_mutations_by_file(filename)
+            if self.update_lines_and_mutations_by_file(filename):
+                yield filename
 
-    def update_lines_and_mutations_by_file(self, filename):
+    def update_lines_and_mutations_by_file(self, filename) -> bool:
         if filename.startswith('test_') or filename.endswith('__tests.py'):
-            return
+            return False
 
         update_line_numbers(filename)
         self.add_mutations_by_file(self.mutations_by_file, filename, self.dict_synonyms)
+        return True
 
     def add_mutations_by_file(
             self,
@@ -69,11 +83,18 @@ class RunArgumentParser:
         )
 
         try:
-            mutator = Mutator(context)
-            mutations_by_file[filename] = mutator.list_mutations()
+            mutator = IncrementalMutator(context)
+            if self.config.deduplicate_mutants:
+                mutations_with_hashes = mutator.list_mutations_with_source_hashes()
+                mutations_by_file[filename] = [mutation_id for mutation_id, _ in mutations_with_hashes]
+                duplicates = self.find_duplicates(mutations_with_hashes)
+                if duplicates:
+                    self.duplicates_by_file[filename] = duplicates
+            else:
+                mutations_by_file[filename] = mutator.list_mutations()
             from mutmut.cache import register_mutants
 
-            register_mutants(mutations_by_file)
+            register_mutants({filename: mutations_by_file[filename]})
         except Exception as e:
             raise RuntimeError(
                 'Failed while creating mutations for {}, for line "{}"'.format(
@@ -81,3 +102,22 @@ class RunArgumentParser:
                 )
             ) from e
 
+    @staticmethod
+    def find_duplicates(mutations_with_hashes: List[Tuple[RelativeMutationID, str]]) \
+            -> Dict[RelativeMutationID, List[RelativeMutationID]]:
+        """Group mutations that produce identical source code
+
+        :param mutations_with_hashes: mutation ids with the hash of the source they produce
+        :return: the first mutation of each group mapped to the other mutations of the group
+        """
+        occurrences = Counter(mutation_id for mutation_id, _ in mutations_with_hashes)
+        representative_by_hash = {}
+        duplicates = defaultdict(list)
+        for mutation_id, source_hash in mutations_with_hashes:
+            if occurrences[mutation_id] > 1:
+                # an id that is listed twice applies both mutations at once, so it has no single source
+                continue
+            representative = representative_by_hash.setdefault(source_hash, mutation_id)
+            if representative is not mutation_id:
+                duplicates[representative].append(mutation_id)
+        return dict(duplicates)
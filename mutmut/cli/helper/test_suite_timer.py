@@ -1,21 +1,53 @@
+import math
 from time import time
+from typing import List, Optional
 
 from mutmut.tester.tester import Tester
+from mutmut.tester.tester_helper import TesterHelper
 from mutmut.helpers.progress import Progress
 from mutmut.cache import (
     cached_hash_of_tests,
 )
-from mutmut.cache import cached_test_time, set_cached_test_time
+from mutmut.cache import cached_test_time, set_cached_test_time, cached_baseline_peak_memory, cached_baseline_cpu_time
+from mutmut.cache import cached_baseline_calibration_key
+from mutmut.cli.helper.coverage_collector import CoverageCollector
+
+
+# with --baseline-runs the baseline is this percentile of the durations of the runs
+BASELINE_PERCENTILE = 90
+
+
+def percentile(values: List[float], p: float) -> float:
+    """The p-th percentile of the values, interpolated linearly between the two closest values"""
+    values = sorted(values)
+    position = (len(values) - 1) * p / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
 
 
 class TestSuiteTimer:
 
-    def __init__(self, swallow_output: bool, test_command: str, using_testmon: bool, no_progress: bool):
+    def __init__(self, swallow_output: bool, test_command: str, using_testmon: bool, no_progress: bool,
+                 coverage_collector: Optional[CoverageCollector] = None, baseline_runs: int = 1,
+                 current_hash_of_sources: Optional[str] = None):
+        """
+        :param baseline_runs: the number of times the tests are run to calibrate the baseline
+        :param current_hash_of_sources: hash of the code under test, a calibrated baseline is only
+            used again for the same tests and code
+        """
 
         self.swallow_output = swallow_output
         self.test_command = test_command
         self.using_testmon = using_testmon
         self.no_progress = no_progress
+        self.coverage_collector = coverage_collector
+        self.baseline_runs = baseline_runs
+        self.current_hash_of_sources = current_hash_of_sources
+        # resident set size of the largest process of the baseline run in bytes, None if unknown
+        self.peak_memory: Optional[int] = None
+        # CPU time of the baseline run in seconds, None if unknown
+        self.cpu_time: Optional[float] = None
 
     def run_tests_without_mutations(self):
         """Execute a test suite specified by ``test_command`` and record
@@ -34,8 +66,15 @@ class TestSuiteTimer:
                 print_status('Running...')
             output.append(line)
 
+        test_command = self.test_command
+        if self.coverage_collector is not None:
+            test_command = self.coverage_collector.test_command(test_command)
+
         tester = Tester()
-        return_code = tester.popen_streaming_output(self.test_command, feedback)
+        start_cpu_time = TesterHelper.cpu_time()
+        return_code = tester.popen_streaming_output(test_command, feedback)
+        if start_cpu_time is not None:
+            self.cpu_time = TesterHelper.cpu_time() - start_cpu_time
 
         return return_code, output
 
@@ -70,6 +109,39 @@ class TestSuiteTimer:
 
         return baseline_time_elapsed
 
+    def calibration_key(self, current_hash_of_tests) -> Optional[str]:
+        """
+        :return: what a cached calibrated baseline must have been measured for, or :obj:`None` if the
+            baseline is run only once
+        """
+        if self.baseline_runs <= 1:
+            return None
+        return '{}:{}:{}'.format(self.baseline_runs, current_hash_of_tests, self.current_hash_of_sources)
+
+    def calibrate(self, first_time_elapsed: float) -> float:
+        """Run the tests again, until there are ``baseline_runs`` durations, and take a high percentile
+        of them as the baseline, so the timeouts hold up to the usual variation of the duration
+
+        :param first_time_elapsed: duration of the first run, not counted while measuring the coverage
+        :return: execution time of the test suite
+        """
+        times, cpu_times = [], []
+        if self.coverage_collector is None:
+            times.append(first_time_elapsed)
+            cpu_times.append(self.cpu_time)
+        while len(times) < self.baseline_runs:
+            start_time = time()
+            return_code, output = self.run_tests_without_mutations()
+            times.append(self.calculate_baseline_time(return_code, start_time, output))
+            cpu_times.append(self.cpu_time)
+
+        if None not in cpu_times:
+            self.cpu_time = percentile(cpu_times, BASELINE_PERCENTILE)
+        baseline_time_elapsed = percentile(times, BASELINE_PERCENTILE)
+        print('Baseline of {} runs: fastest {:.2f}s, median {:.2f}s, {}th percentile {:.2f}s'.format(
+            len(times), min(times), percentile(times, 50), BASELINE_PERCENTILE, baseline_time_elapsed))
+        return baseline_time_elapsed
+
     def time_test_suite(self, current_hash_of_tests) -> float:
         """Execute a test suite specified by ``test_command`` and record
         the time it took to execute the test suite as a floating point number
@@ -79,17 +151,34 @@ class TestSuiteTimer:
         """
 
         cached_time = cached_test_time()
-        if cached_time is not None and current_hash_of_tests == cached_hash_of_tests():
+        calibration_key = self.calibration_key(current_hash_of_tests)
+        if cached_time is not None and current_hash_of_tests == cached_hash_of_tests() and (
+                self.coverage_collector is None or self.coverage_collector.has_cached_index(current_hash_of_tests)) and (
+                calibration_key is None or calibration_key == cached_baseline_calibration_key()):
             print('1. Using cached time for baseline tests, to run baseline again delete the cache file')
+            self.peak_memory = cached_baseline_peak_memory()
+            self.cpu_time = cached_baseline_cpu_time()
             return cached_time
 
-        print('1. Running tests without mutations')
-        start_time = time()
-        return_code, output = self.run_tests_without_mutations()
-
-        baseline_time_elapsed = self.calculate_baseline_time(return_code, start_time, output)
+        if self.coverage_collector is None:
+            print('1. Running tests without mutations')
+            start_time = time()
+            return_code, output = self.run_tests_without_mutations()
+            baseline_time_elapsed = self.calculate_baseline_time(return_code, start_time, output)
+        else:
+            print('1. Running tests without mutations, measuring the coverage and duration of each test')
+            with self.coverage_collector.collecting():
+                start_time = time()
+                return_code, output = self.run_tests_without_mutations()
+                baseline_time_elapsed = self.calculate_baseline_time(return_code, start_time, output)
+                self.coverage_collector.store(current_hash_of_tests)
+        if self.baseline_runs > 1:
+            baseline_time_elapsed = self.calibrate(baseline_time_elapsed)
         print('Done')
 
-        set_cached_test_time(baseline_time_elapsed, current_hash_of_tests)
+        # no child process started before the baseline run comes close to the tests in size
+        self.peak_memory = TesterHelper.peak_memory_of_child_processes()
+        set_cached_test_time(baseline_time_elapsed, current_hash_of_tests, self.peak_memory, self.cpu_time,
+                             calibration_key)
 
         return baseline_time_elapsed
@@ -3,13 +3,15 @@ import os
 from os.path import isdir
 from pathlib import Path
 from shutil import copy
-from typing import Iterator, List, Optional, Dict
+from typing import Iterator, List, Optional, Mapping
 from functools import wraps
 from configparser import ConfigParser
 import toml
 import click
 from glob2 import glob
 
+from mutmut.helpers.coverage_index import CoverageIndex
+
 
 def split_paths(paths):
     # This method is used to split paths that are separated by commas or colons
@@ -90,20 +92,13 @@ def read_patch_data(patch_file_path: str):
     }
 
 
-def read_coverage_data() -> Dict[str, Dict[int, List[str]]]:
+def read_coverage_data() -> Mapping[str, Mapping[int, List[str]]]:
     """
-    Reads the coverage database and returns a dictionary which maps the filenames to the covered lines and their contexts.
+    Reads the coverage database and returns a mapping of the filenames to the covered lines and their contexts.
+
+    The database is read directly and lazily, a file is only read when it is looked up.
     """
-    try:
-        # noinspection PyPackageRequirements,PyUnresolvedReferences
-        from coverage import Coverage
-    except ImportError as e:
-        raise ImportError(
-            'The --use-coverage feature requires the coverage library. Run "pip install --force-reinstall mutmut[coverage]"') from e
-    cov = Coverage('.coverage')
-    cov.load()
-    data = cov.get_data()
-    return {filepath: data.contexts_by_lineno(filepath) for filepath in data.measured_files()}
+    return CoverageIndex('.coverage')
 
 
 def config_from_file(**defaults):
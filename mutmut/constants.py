@@ -8,6 +8,7 @@ OK_SUSPICIOUS = 'ok_suspicious'
 BAD_TIMEOUT = 'bad_timeout'
 BAD_SURVIVED = 'bad_survived'
 SKIPPED = 'skipped'
+EQUIVALENT = 'equivalent'
 
 MUTANT_STATUSES = {
     "killed": OK_KILLED,
@@ -16,6 +17,7 @@ MUTANT_STATUSES = {
     "survived": BAD_SURVIVED,
     "skipped": SKIPPED,
     "untested": UNTESTED,
+    "equivalent": EQUIVALENT,
 }
 
 
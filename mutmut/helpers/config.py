@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Set
+from typing import Optional, Dict, List, Mapping, Set
 
 
 @dataclass
@@ -18,12 +18,48 @@ class Config:
     hash_of_tests: str
     post_mutation: str
     pre_mutation: str
-    coverage_data: Dict[str, Dict[int, List[str]]]
+    coverage_data: Mapping[str, Mapping[int, List[str]]]
     paths_to_mutate: List[str]
     mutation_types_to_apply: Set[str]
     no_progress: bool
     ci: bool
     rerun_all: bool
+    detect_equivalent: bool = False
+    deduplicate_mutants: bool = False
+    # time.time() at which --time-budget runs out, no new mutants are started after it
+    deadline: Optional[float] = None
+    # the maximum number of mutants that are tested together, 0 to test all mutants on their own
+    group_mutants: int = 0
+    # duration of each test in seconds, from --collect-coverage
+    test_durations: Optional[Dict[str, float]] = None
+    # run only the tests covering a mutant, the most promising first, see mutmut.tester.test_selection
+    select_tests: bool = False
+    # seconds of tests in the first stage of --select-tests, None to run all covering tests at once
+    first_stage_budget: Optional[float] = None
+    # number of mutants each test killed and number of mutants it was run against, by test id
+    test_kill_counts: Optional[Dict[str, List[int]]] = None
+    # the test files that import each file to mutate, from --use-import-graph
+    test_files_by_filename: Optional[Dict[str, List[str]]] = None
+    # how the worker processes are started, one of multiprocessing.get_all_start_methods()
+    start_method: str = 'spawn'
+    # a worker is replaced after this many mutants, 0 for never, None for mutmut.tester.tester.CYCLE_PROCESS_AFTER
+    max_worker_mutants: Optional[int] = None
+    # a worker is replaced once its resident set size exceeds this many megabytes
+    max_worker_memory: Optional[float] = None
+    # a worker is replaced once it is running for this many seconds
+    max_worker_age: Optional[float] = None
+    # resident set size of the largest process of the baseline run in bytes, None if unknown
+    baseline_peak_memory: Optional[int] = None
+    # the number of workers is chosen by mutmut and lowered while mutants time out or memory runs low
+    automatic_test_processes: bool = False
+    # limit of the address space of every process of a test run of a mutant in megabytes
+    max_test_memory: Optional[float] = None
+    # limit of the CPU time of every process of a test run of a mutant in seconds
+    max_test_cpu_time: Optional[float] = None
+    # judge whether the tests of a mutant are too slow by their CPU time as well as by the wall time
+    use_cpu_time: bool = False
+    # CPU time of the baseline run in seconds, None if unknown
+    baseline_cpu_time: Optional[float] = None
 
     def __post_init__(self):
         self._default_test_command = self.test_command
@@ -22,6 +22,7 @@ class Context:
         self._set_source(source)
         self.mutation_id = mutation_id
         self.performed_mutation_ids = []
+        self.mutated_source = None
         assert isinstance(mutation_id, RelativeMutationID)
         self.current_line_index = 0
         self.filename = filename
@@ -0,0 +1,128 @@
+import os
+import sqlite3
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Yield the positions of the bits that are set, lowest first"""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+class FileCoverage(Mapping):
+    """The contexts that covered each line of one file, like ``CoverageData.contexts_by_lineno``
+
+    Every context that covered the file is stored as one integer, used as a bitmap of line numbers.
+    The list of contexts of a line is only built when it is asked for.
+    """
+
+    def __init__(self, contexts: List[str], lines_by_context: Dict[int, int]):
+        self._contexts = contexts
+        self._lines_by_context = lines_by_context
+        self._all_lines = 0
+        for lines in lines_by_context.values():
+            self._all_lines |= lines
+
+    def __getitem__(self, line_number: int) -> List[str]:
+        if not isinstance(line_number, int) or line_number < 0 or not self._all_lines >> line_number & 1:
+            raise KeyError(line_number)
+        return [
+            self._contexts[context_id]
+            for context_id, lines in self._lines_by_context.items()
+            if lines >> line_number & 1
+        ]
+
+    def __contains__(self, line_number) -> bool:
+        return isinstance(line_number, int) and line_number >= 0 and bool(self._all_lines >> line_number & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter_bits(self._all_lines)
+
+    def __len__(self) -> int:
+        return bin(self._all_lines).count('1')
+
+
+class CoverageIndex(Mapping):
+    """Coverage data read straight from the SQLite database of coverage.py (``.coverage``)
+
+    It maps the absolute path of each measured file to its :class:`FileCoverage`. Only the list of
+    files is read up front, the lines and contexts of a file are read when the file is first looked up.
+    """
+
+    def __init__(self, data_file: str = '.coverage'):
+        self.data_file = os.path.abspath(data_file)
+        self._connection: Optional[sqlite3.Connection] = None
+        # the process that opened the connection, a connection must not be used after a fork
+        self._connection_pid: Optional[int] = None
+        self._contexts: Optional[List[str]] = None
+        self._has_arcs = False
+        self._file_ids: Dict[str, int] = {}
+        self._files: Dict[str, FileCoverage] = {}
+
+        if not os.path.exists(self.data_file):
+            # like coverage.py, a missing data file is the same as no coverage at all
+            return
+
+        connection = self.connection()
+        try:
+            self._file_ids = {path: file_id for file_id, path in connection.execute('select id, path from file')}
+            meta = dict(connection.execute('select key, value from meta'))
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f'{data_file} is not a coverage.py data file of version 5 or later') from e
+        self._has_arcs = meta.get('has_arcs') in ('1', 'True', 'true')
+
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None or self._connection_pid != os.getpid():
+            # read only, so it can be shared with the thread that lists the mutations while testing starts
+            self._connection = sqlite3.connect(f'file:{self.data_file}?mode=ro', uri=True, check_same_thread=False)
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def contexts(self) -> List[str]:
+        if self._contexts is None:
+            rows = list(self.connection().execute('select id, context from context'))
+            contexts = [''] * (max((context_id for context_id, _ in rows), default=0) + 1)
+            for context_id, context in rows:
+                contexts[context_id] = context
+            self._contexts = contexts
+        return self._contexts
+
+    def _read_file(self, file_id: int) -> FileCoverage:
+        lines_by_context = {}
+        if self._has_arcs:
+            rows = self.connection().execute(
+                'select context_id, fromno, tono from arc where file_id = ?', (file_id,))
+            for context_id, fromno, tono in rows:
+                for line_number in (fromno, tono):
+                    if line_number > 0:
+                        lines_by_context[context_id] = lines_by_context.get(context_id, 0) | (1 << line_number)
+        else:
+            rows = self.connection().execute(
+                'select context_id, numbits from line_bits where file_id = ?', (file_id,))
+            for context_id, numbits in rows:
+                # numbits have the bit for line n in bit n % 8 of byte n // 8, which is a little endian integer
+                lines_by_context[context_id] = int.from_bytes(numbits, 'little')
+        return FileCoverage(self.contexts(), lines_by_context)
+
+    def __getitem__(self, path: str) -> FileCoverage:
+        if path not in self._files:
+            self._files[path] = self._read_file(self._file_ids[path])
+        return self._files[path]
+
+    def __contains__(self, path) -> bool:
+        return path in self._file_ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._file_ids)
+
+    def __len__(self) -> int:
+        return len(self._file_ids)
+
+    def __getstate__(self):
+        # the connection can't be pickled, it is opened again when needed
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        return state
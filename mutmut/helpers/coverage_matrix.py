@@ -0,0 +1,66 @@
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from mutmut.helpers.coverage_index import iter_bits
+
+
+def count_bits(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+class CoverageMatrix:
+    """Which tests cover which lines, with the tests as bit columns and the lines as rows
+
+    Every test id is interned as a column number, and a set of tests is a Python int with the
+    bits of those columns set. Union, intersection and size of sets of tests are then ``|``,
+    ``&`` and :func:`count_bits` on plain integers, which stays fast and small for suites with
+    tens of thousands of tests.
+    """
+
+    def __init__(self):
+        self.test_ids: List[str] = []
+        self._columns: Dict[str, int] = {}
+        self._rows: Dict[Tuple[str, int], int] = {}
+
+    @classmethod
+    def from_coverage_data(cls, coverage_data: Mapping[str, Mapping[int, List[str]]], filenames: Iterable[str],
+                           test_id_from_context: Callable[[str], Optional[str]] = lambda x: x or None):
+        """Build the matrix for the given files out of coverage data like ``config.coverage_data``
+
+        :param coverage_data: contexts by line number by absolute filename
+        :param filenames: absolute filenames of the files to put in the matrix
+        :param test_id_from_context: turns a context into a test id, or :obj:`None` to leave it out
+        """
+        matrix = cls()
+        for filename in filenames:
+            contexts_by_line = coverage_data.get(filename) or {}
+            for line_number, contexts in contexts_by_line.items():
+                test_ids = [test_id_from_context(x) for x in contexts]
+                matrix.add(filename, line_number, [x for x in test_ids if x is not None])
+        return matrix
+
+    def column(self, test_id: str) -> int:
+        if test_id not in self._columns:
+            self._columns[test_id] = len(self.test_ids)
+            self.test_ids.append(test_id)
+        return self._columns[test_id]
+
+    def add(self, filename: str, line_number: int, test_ids: Iterable[str]):
+        self._rows[(filename, line_number)] = self.tests_covering(filename, line_number) | self.bits(test_ids)
+
+    def bits(self, test_ids: Iterable[str]) -> int:
+        result = 0
+        for test_id in test_ids:
+            result |= 1 << self.column(test_id)
+        return result
+
+    def test_ids_in(self, bits: int) -> List[str]:
+        return [self.test_ids[column] for column in iter_bits(bits)]
+
+    def tests_covering(self, filename: str, line_number: int) -> int:
+        return self._rows.get((filename, line_number), 0)
+
+    def tests_covering_lines(self, filename: str, line_numbers: Iterable[int]) -> int:
+        result = 0
+        for line_number in line_numbers:
+            result |= self.tests_covering(filename, line_number)
+        return result
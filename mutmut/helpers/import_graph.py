@@ -0,0 +1,85 @@
+import ast
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+
+def module_names(filename: str) -> List[str]:
+    """All dotted names a file could be imported as, depending on which of its parent directories is on ``sys.path``
+
+    ``src/foo/bar.py`` can be ``src.foo.bar``, ``foo.bar`` or ``bar``, and ``src/foo/__init__.py`` can be
+    ``src.foo`` or ``foo``.
+    """
+    parts = os.path.normpath(filename)[:-len('.py')].split(os.sep)
+    if parts[-1] == '__init__':
+        parts = parts[:-1]
+    parts = [x for x in parts if x not in ('', '.')]
+    return ['.'.join(parts[i:]) for i in range(len(parts))]
+
+
+def imported_modules(source: str, filename: str) -> List[str]:
+    """The absolute names of the modules a source file imports, anywhere in the file
+
+    For ``from foo import bar`` both ``foo`` and ``foo.bar`` are returned, as ``bar`` may be a module.
+    Relative imports are resolved against the longest module name of the file.
+    """
+    try:
+        tree = ast.parse(source, filename=filename)
+    except SyntaxError:
+        return []
+
+    names = module_names(filename)
+    package = names[0].split('.') if names else []
+    if not filename.endswith('__init__.py'):
+        package = package[:-1]
+
+    result = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            result.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package[:max(len(package) - node.level + 1, 0)]
+                module = '.'.join(base + ([node.module] if node.module else []))
+            else:
+                module = node.module or ''
+            if module:
+                result.add(module)
+            result.update('.'.join(x for x in (module, alias.name) if x) for alias in node.names if alias.name != '*')
+    return sorted(result)
+
+
+class ImportGraph:
+    """Which files import which other files, found without running any code
+
+    A module name is matched with every file it could be, so the graph has more edges than the real
+    imports rather than less. Importing ``foo.bar`` also imports ``foo``.
+    """
+
+    def __init__(self, imports_by_filename: Dict[str, List[str]]):
+        filenames_by_module = defaultdict(set)
+        for filename in imports_by_filename:
+            for name in module_names(filename):
+                filenames_by_module[name].add(filename)
+
+        self.importers_by_filename = defaultdict(set)
+        for filename, imports in imports_by_filename.items():
+            for name in imports:
+                parts = name.split('.')
+                for i in range(1, len(parts) + 1):
+                    for imported in filenames_by_module.get('.'.join(parts[:i]), ()):
+                        if imported != filename:
+                            self.importers_by_filename[imported].add(filename)
+
+    def importers(self, filenames: Iterable[str]) -> Set[str]:
+        """
+        :return: the files that import one of the given files directly or through other files, and the files themselves
+        """
+        result = set(filenames)
+        stack = list(result)
+        while stack:
+            for importer in self.importers_by_filename.get(stack.pop(), ()):
+                if importer not in result:
+                    result.add(importer)
+                    stack.append(importer)
+        return result
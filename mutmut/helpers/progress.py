@@ -1,7 +1,7 @@
 import itertools
 import sys
 from typing import Optional
-from mutmut.constants import BAD_SURVIVED, BAD_TIMEOUT, OK_KILLED, OK_SUSPICIOUS, SKIPPED
+from mutmut.constants import BAD_SURVIVED, BAD_TIMEOUT, OK_KILLED, OK_SUSPICIOUS, SKIPPED, EQUIVALENT
 
 
 class Progress:
@@ -14,13 +14,14 @@ class Progress:
         self.surviving_mutants = 0
         self.surviving_mutants_timeout = 0
         self.suspicious_mutants = 0
+        self.equivalent_mutants = 0
         self.no_progress = no_progress
 
     def print(self):
         if self.no_progress:
             return
         print_status = self.status_printer()
-        print_status('{}/{}  {} {}  {} {}  {} {}  {} {}  {} {}'.format(
+        print_status('{}/{}  {} {}  {} {}  {} {}  {} {}  {} {}  {} {}'.format(
             self.currently_tested,
             self.total,
             self.output_legend["killed"],
@@ -32,7 +33,9 @@ class Progress:
             self.output_legend["survived"],
             self.surviving_mutants,
             self.output_legend["skipped"],
-            self.skipped)
+            self.skipped,
+            self.output_legend["equivalent"],
+            self.equivalent_mutants)
         )
 
     def register(self, status):
@@ -46,6 +49,8 @@ class Progress:
             self.suspicious_mutants += 1
         elif status == SKIPPED:
             self.skipped += 1
+        elif status == EQUIVALENT:
+            self.equivalent_mutants += 1
         else:
             raise ValueError('Unknown status returned from run_mutation: {}'.format(status))
         self.currently_tested += 1
@@ -8,4 +8,6 @@ class RelativeMutationID:
     index: int
     line_number: int
     filename: Optional[str] = field(default=None, compare=False, hash=False)
+    # the type of the mutated node, one of the keys of MutatorHelper.mutations_by_type
+    mutation_type: Optional[str] = field(default=None, compare=False, hash=False)
 
@@ -0,0 +1,148 @@
+import math
+import random
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from mutmut.constants import OK_KILLED, OK_SUSPICIOUS, BAD_SURVIVED, BAD_TIMEOUT
+from mutmut.helpers.relativemutationid import RelativeMutationID
+
+# a stratum is the combination of filename and mutation type
+Stratum = Tuple[str, Optional[str]]
+
+# z-score of the two sided 95% confidence interval
+Z_95 = 1.96
+
+
+@dataclass
+class MutationScoreEstimate:
+    score: float
+    margin: float
+    sampled: int
+    population: int
+
+    @property
+    def lower(self) -> float:
+        return max(0.0, self.score - self.margin)
+
+    @property
+    def upper(self) -> float:
+        return min(1.0, self.score + self.margin)
+
+
+def group_by_stratum(mutations_by_file: Dict[str, List[RelativeMutationID]]) \
+        -> Dict[Stratum, List[RelativeMutationID]]:
+    strata = defaultdict(list)
+    for filename, mutations in mutations_by_file.items():
+        for mutation_id in mutations:
+            strata[(filename, mutation_id.mutation_type)].append(mutation_id)
+    return dict(strata)
+
+
+def allocate_sample(sizes: Dict[Hashable, int], sample_size: int) -> Dict[Hashable, int]:
+    """Divide the sample size over the strata proportionally to their size
+
+    The remaining units after rounding down go to the strata with the largest remainders.
+    """
+    total = sum(sizes.values())
+    sample_size = min(sample_size, total)
+    if not total:
+        return {key: 0 for key in sizes}
+
+    quotas = {key: sample_size * size / total for key, size in sizes.items()}
+    allocation = {key: int(quota) for key, quota in quotas.items()}
+    remaining = sample_size - sum(allocation.values())
+    by_remainder = sorted(quotas, key=lambda key: quotas[key] - allocation[key], reverse=True)
+    for key in by_remainder[:remaining]:
+        allocation[key] += 1
+    return allocation
+
+
+def stratified_sample(mutations_by_file: Dict[str, List[RelativeMutationID]], sample_size: int, seed: int) \
+        -> Dict[str, List[RelativeMutationID]]:
+    """Draw a random sample of mutants, stratified by file and mutation type
+
+    :param mutations_by_file: all mutants to draw from
+    :param sample_size: the number of mutants to draw
+    :param seed: seed for the random number generator, the same seed gives the same sample
+    :return: the sampled mutants by file, in the order they appear in ``mutations_by_file``
+    """
+    strata = group_by_stratum(mutations_by_file)
+    keys = sorted(strata, key=lambda key: (key[0], key[1] or ''))
+    allocation = allocate_sample({key: len(strata[key]) for key in keys}, sample_size)
+
+    rng = random.Random(seed)
+    sampled = set()
+    for key in keys:
+        sampled.update(rng.sample(strata[key], allocation[key]))
+
+    return {
+        filename: [x for x in mutations if x in sampled]
+        for filename, mutations in mutations_by_file.items()
+        if any(x in sampled for x in mutations)
+    }
+
+
+def estimate_mutation_score(population_sizes: Dict[Hashable, int], statuses_by_stratum: Dict[Hashable, List[str]],
+                            z: float = Z_95) -> MutationScoreEstimate:
+    """Estimate the mutation score of the whole population from the statuses of a stratified sample
+
+    Killed and suspicious mutants count as killed, survived and timed out mutants as not killed.
+    Other statuses don't count. Strata without any counted mutant are left out and the weights of
+    the other strata are scaled up accordingly.
+
+    :param population_sizes: number of mutants in each stratum
+    :param statuses_by_stratum: statuses of the sampled mutants in each stratum
+    :param z: z-score of the confidence level, 1.96 for 95%
+    """
+    proportions = {}
+    for key, statuses in statuses_by_stratum.items():
+        killed = sum(1 for x in statuses if x in (OK_KILLED, OK_SUSPICIOUS))
+        tested = killed + sum(1 for x in statuses if x in (BAD_SURVIVED, BAD_TIMEOUT))
+        if tested:
+            proportions[key] = (killed, tested)
+
+    population = sum(population_sizes.values())
+    sampled = sum(tested for _, tested in proportions.values())
+    if not proportions:
+        return MutationScoreEstimate(score=0.0, margin=1.0, sampled=0, population=population)
+
+    weight_total = sum(population_sizes[key] for key in proportions)
+    overall = sum(killed for killed, _ in proportions.values()) / sampled
+
+    score = 0.0
+    variance = 0.0
+    for key, (killed, tested) in proportions.items():
+        size = population_sizes[key]
+        weight = size / weight_total
+        p = killed / tested
+        score += weight * p
+        if tested > 1:
+            sample_variance = p * (1 - p) * tested / (tested - 1)
+        else:
+            # a single mutant says nothing about the spread, so use the spread of the whole sample
+            sample_variance = overall * (1 - overall)
+        finite_population_correction = max(0.0, 1 - tested / size)
+        variance += weight ** 2 * finite_population_correction * sample_variance / tested
+
+    return MutationScoreEstimate(score=score, margin=z * math.sqrt(variance), sampled=sampled, population=population)
+
+
+def restrict_duplicates(duplicates_by_file: Dict[str, Dict[RelativeMutationID, List[RelativeMutationID]]],
+                        mutations_by_file: Dict[str, List[RelativeMutationID]]) \
+        -> Dict[str, Dict[RelativeMutationID, List[RelativeMutationID]]]:
+    """Keep only the groups of identical mutants that are part of the sample
+
+    When the representative of a group was not sampled, the first sampled duplicate takes its place.
+    """
+    result = {}
+    for filename, duplicates in duplicates_by_file.items():
+        sampled = set(mutations_by_file.get(filename, []))
+        restricted = {}
+        for representative, others in duplicates.items():
+            group = [x for x in [representative] + others if x in sampled]
+            if len(group) > 1:
+                restricted[group[0]] = group[1:]
+        if restricted:
+            result[filename] = restricted
+    return result
@@ -0,0 +1,87 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+from mutmut.constants import UNTESTED, BAD_SURVIVED
+from mutmut.helpers.relativemutationid import RelativeMutationID
+
+# a mutant with an outdated result still tells us something, so it is worth less than one never tested
+STALE_RESULT_WEIGHT = 0.5
+
+# the shortest predicted duration, so mutants that were very fast before don't get an infinite priority
+MINIMUM_COST = 0.001
+
+# (status, hash of the tests, time elapsed) of the last test of a mutant
+History = Tuple[str, Optional[str], Optional[float]]
+
+
+def survival_probability(counts: Optional[List[int]]) -> float:
+    """Estimate the chance that a mutant survives from the number of survived and tested mutants
+
+    With no history at all this is 0.5, every tested mutant moves the estimate towards the observed rate.
+    """
+    survived, tested = counts or (0, 0)
+    return (survived + 1) / (tested + 2)
+
+
+def entropy(p: float) -> float:
+    """The information in bits we gain by learning the outcome of an event that happens with probability p"""
+    if p <= 0 or p >= 1:
+        return 0.0
+    return -p * math.log2(p) - (1 - p) * math.log2(1 - p)
+
+
+class Scheduler:
+    """Order mutants by the information we expect to get out of testing them per second
+
+    The information is the uncertainty whether the mutant survives, based on how often mutants of the
+    same mutation type and of the same file survived before. A mutant that was tested against an older
+    version of the tests is worth less than one that was never tested. The cost is the time it took to
+    test the mutant before, or else the average time of the tested mutants of its file, or else the time
+    of the baseline run of the test suite.
+    """
+
+    def __init__(self, baseline_time_elapsed: float, counts_by_type: Dict[Optional[str], List[int]],
+                 counts_by_filename: Dict[str, List[int]]):
+        self.baseline_time_elapsed = baseline_time_elapsed
+        self.counts_by_type = counts_by_type
+        self.counts_by_filename = counts_by_filename
+
+    def expected_information(self, filename: str, mutation_id: RelativeMutationID, history: History) -> float:
+        p_type = survival_probability(self.counts_by_type.get(mutation_id.mutation_type))
+        p_file = survival_probability(self.counts_by_filename.get(filename))
+        p = (p_type + p_file) / 2
+        status, tested_against_hash, _ = history
+        if status == UNTESTED or tested_against_hash is None:
+            return entropy(p)
+
+        # the old result is the best guess for the new one
+        p = (p + (1.0 if status == BAD_SURVIVED else 0.0)) / 2
+        return STALE_RESULT_WEIGHT * entropy(p)
+
+    def predicted_cost(self, history: History, file_average: Optional[float]) -> float:
+        _, _, time_elapsed = history
+        if time_elapsed is None:
+            time_elapsed = file_average if file_average is not None else self.baseline_time_elapsed
+        return max(time_elapsed, MINIMUM_COST)
+
+    def order(self, mutants: List[Tuple[str, RelativeMutationID]],
+              history: Dict[Tuple[str, RelativeMutationID], History]) -> List[Tuple[str, RelativeMutationID]]:
+        """Sort the mutants with the highest expected information per second first
+
+        :param mutants: (filename, mutation id) of the mutants to test
+        :param history: the last test of each of the mutants, by (filename, mutation id)
+        """
+        times_by_filename = {}
+        for (filename, _), (_, _, time_elapsed) in history.items():
+            if time_elapsed is not None:
+                times_by_filename.setdefault(filename, []).append(time_elapsed)
+        file_averages = {filename: sum(times) / len(times) for filename, times in times_by_filename.items()}
+
+        def priority(mutant):
+            filename, mutation_id = mutant
+            mutant_history = history.get(mutant, (UNTESTED, None, None))
+            information = self.expected_information(filename, mutation_id, mutant_history)
+            return information / self.predicted_cost(mutant_history, file_averages.get(filename))
+
+        # sorted is stable, so mutants of equal priority keep their order
+        return sorted(mutants, key=priority, reverse=True)
@@ -0,0 +1,61 @@
+import dis
+import types
+from functools import lru_cache
+
+
+def normalized_constant(value):
+    if isinstance(value, types.CodeType):
+        return normalized_code(value)
+    if isinstance(value, tuple):
+        return tuple, tuple(normalized_constant(x) for x in value)
+    if isinstance(value, frozenset):
+        # iteration order of a frozenset is not stable between compilations
+        return frozenset, frozenset(normalized_constant(x) for x in value)
+    # repr keeps apart values that compare equal, like 1, 1.0 and True or 0.0 and -0.0
+    return type(value), repr(value)
+
+
+def normalized_code(code: types.CodeType):
+    """Turn a code object into a comparable tuple without any line number information.
+
+    Only the constants that are actually loaded by an instruction are taken
+    into account, so constants of branches removed by the compiler don't matter.
+    """
+    instructions = tuple(
+        (
+            instruction.opname,
+            # the constant itself, argval of KW_NAMES on Python 3.11 is only the index of the keyword names
+            normalized_constant(code.co_consts[instruction.arg]) if instruction.opcode in dis.hasconst
+            else instruction.argval,
+        )
+        for instruction in dis.get_instructions(code)
+    )
+    return (
+        code.co_argcount,
+        code.co_posonlyargcount,
+        code.co_kwonlyargcount,
+        code.co_flags,
+        code.co_name,
+        code.co_varnames,
+        code.co_freevars,
+        code.co_cellvars,
+        # function docstrings live in the first constant without being loaded by an instruction
+        normalized_constant(code.co_consts[0]) if code.co_consts else None,
+        instructions,
+        getattr(code, 'co_exceptiontable', None),
+    )
+
+
+@lru_cache(maxsize=16)
+def normalized_module(source: str, filename: str):
+    return normalized_code(compile(source, filename, 'exec', dont_inherit=True))
+
+
+def is_equivalent_mutant(source: str, mutated_source: str, filename: str) -> bool:
+    """
+    :return: :obj:`True` if the mutated source compiles to the same code as the original source
+    """
+    try:
+        return normalized_module(source, filename) == normalized_module(mutated_source, filename)
+    except (SyntaxError, ValueError):
+        return False
@@ -0,0 +1,146 @@
+import ast
+import hashlib
+from dataclasses import replace
+from typing import List, Optional, Tuple
+
+from mutmut import __version__
+from mutmut.cache import cached_mutations_by_chunk, set_cached_mutations_by_chunk
+from mutmut.helpers.context import Context
+from mutmut.helpers.relativemutationid import RelativeMutationID
+from mutmut.mutator.mutator import Mutator
+
+try:
+    import mutmut_config
+except ImportError:
+    mutmut_config = None
+
+
+def top_level_chunks(source: str) -> Optional[List[Tuple[int, str]]]:
+    """Split the source into consecutive runs of lines, one for each top level statement
+
+    Comments and blank lines belong to the statement above them, decorators to the definition below
+    them. Every chunk can be parsed on its own and yields the same mutations, relative to its first
+    line, as it does as part of the whole file.
+
+    :return: the 0-based number of the first line and the source of each chunk, or :obj:`None` if the
+        source can't be split reliably
+    """
+    if '\r' in source.replace('\r\n', ''):
+        # ast counts a lone carriage return as a line break, Context doesn't
+        return None
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    starts = [0]
+    for node in tree.body[1:]:
+        start = min([node.lineno] + [x.lineno for x in getattr(node, 'decorator_list', [])]) - 1
+        if start > starts[-1]:
+            starts.append(start)
+
+    lines = source.split('\n')
+    ends = starts[1:] + [len(lines)]
+    return [
+        (start, '\n'.join(lines[start:end]) + ('\n' if end < len(lines) else ''))
+        for start, end in zip(starts, ends)
+    ]
+
+
+class IncrementalMutator:
+    """List the mutations of a file, enumerating only the top level statements that changed
+
+    The mutations of every top level statement are stored in the cache under the hash of its source,
+    so when one function of a large module is edited only that function is parsed and mutated again,
+    and the mutations of all other statements are taken from the cache, moved to their new lines.
+    Coverage is applied afterwards, so a change of coverage doesn't invalidate the cache. Files that
+    can't be split, and all files if ``mutmut_config`` has a ``pre_mutation_ast`` hook that expects
+    to see the whole file, are enumerated with :class:`Mutator` as a whole.
+    """
+
+    def __init__(self, context: Context):
+        self.context = context
+
+    def list_mutations(self) -> List[RelativeMutationID]:
+        mutations = self._mutations(with_hashes=False)
+        if mutations is None:
+            return Mutator(self.context).list_mutations()
+        return [mutation_id for mutation_id, _ in mutations]
+
+    def list_mutations_with_source_hashes(self) -> List[Tuple[RelativeMutationID, str]]:
+        """Like :meth:`Mutator.list_mutations_with_source_hashes`, but the hashes are of the mutated
+        top level statement and its position, which tell mutants apart just as well"""
+        mutations = self._mutations(with_hashes=True)
+        if mutations is None:
+            return Mutator(self.context).list_mutations_with_source_hashes()
+        return mutations
+
+    def cache_key(self, with_hashes: bool) -> str:
+        config = self.context.config
+        mutation_types = sorted(config.mutation_types_to_apply) if config else None
+        return repr((__version__, mutation_types, sorted(self.context.dict_synonyms), with_hashes))
+
+    def _mutations(self, with_hashes: bool) -> Optional[List[Tuple[RelativeMutationID, Optional[str]]]]:
+        if hasattr(mutmut_config, 'pre_mutation_ast'):
+            return None
+        chunks = top_level_chunks(self.context.source)
+        if chunks is None:
+            return None
+
+        key = self.cache_key(with_hashes)
+        cached = cached_mutations_by_chunk(self.context.filename)
+        cached_chunks = cached['chunks'] if cached.get('key') == key else {}
+        mutations_by_chunk = {}
+        result = []
+        for position, (start, chunk_source) in enumerate(chunks):
+            chunk_hash = hashlib.sha256(chunk_source.encode('utf-8')).hexdigest()
+            if chunk_hash not in mutations_by_chunk:
+                mutations_by_chunk[chunk_hash] = cached_chunks.get(chunk_hash)
+            if mutations_by_chunk[chunk_hash] is None:
+                mutations_by_chunk[chunk_hash] = self.mutations_of_chunk(start, chunk_source, with_hashes)
+
+            for line_number, index, mutation_type, source_hash in mutations_by_chunk[chunk_hash]:
+                mutation_id = RelativeMutationID(
+                    line=self.context.source_by_line_number[start + line_number],
+                    index=index,
+                    line_number=start + line_number,
+                    filename=self.context.filename,
+                    mutation_type=mutation_type,
+                )
+                if not self.is_excluded(mutation_id):
+                    result.append((mutation_id, source_hash and f'{position}:{source_hash}'))
+
+        if mutations_by_chunk != cached_chunks:
+            set_cached_mutations_by_chunk(self.context.filename, dict(key=key, chunks=mutations_by_chunk))
+        return result
+
+    def mutations_of_chunk(self, start: int, chunk_source: str, with_hashes: bool) -> List[list]:
+        """
+        :return: line number relative to the chunk, index, mutation type and hash of the mutated chunk,
+            if asked for, of every mutation of the chunk, ignoring coverage
+        """
+        config = self.context.config
+        context = Context(
+            source=chunk_source,
+            filename=self.context.filename,
+            config=replace(config, covered_lines_by_filename=None) if config else None,
+            dict_synonyms=self.context.dict_synonyms[:-1],  # Context adds 'dict' again
+        )
+        mutator = Mutator(context)
+        try:
+            if with_hashes:
+                mutations = mutator.list_mutations_with_source_hashes()
+            else:
+                mutations = [(mutation_id, None) for mutation_id in mutator.list_mutations()]
+        except Exception:
+            # point error messages about the whole file at the right line
+            self.context.current_line_index = start + context.current_line_index
+            raise
+        return [
+            [mutation_id.line_number, mutation_id.index, mutation_id.mutation_type, source_hash]
+            for mutation_id, source_hash in mutations
+        ]
+
+    def is_excluded(self, mutation_id: RelativeMutationID) -> bool:
+        self.context.current_line_index = mutation_id.line_number
+        return self.context.should_exclude()
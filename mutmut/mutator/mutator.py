@@ -1,11 +1,14 @@
+import hashlib
 import multiprocessing
 import os.path
+from dataclasses import replace
 from io import open
-from typing import Tuple
+from typing import List, Tuple
 
 from parso import parse
 
 from mutmut.helpers.context import Context
+from mutmut.helpers.relativemutationid import RelativeMutationID
 from mutmut.constants import ALL
 from mutmut.mutator.mutator_helper import MutatorHelper
 
@@ -22,27 +25,36 @@ class Mutator:
     def __init__(self, context: Context):
         self.context = context
         self.helper = MutatorHelper()
+        # called with (node, node_attribute, old) right after a mutation has been applied to the tree
+        self.on_mutation_applied = None
 
-    def mutate(self) -> Tuple[str, int]:
-        """
-        :return: tuple of mutated source code and number of mutations performed
-        """
+    def parse_source(self):
         try:
-            result = parse(self.context.source, error_recovery=False)
+            return parse(self.context.source, error_recovery=False)
         except Exception:
             print('Failed to parse {}. Internal error from parso follows.'.format(self.context.filename))
             print('----------------------------------')
             raise
 
+    def mutated_source_from_code(self, code: str) -> str:
+        mutated_source = code.replace(' not not ', ' ')
+        if self.context.remove_newline_at_end:
+            assert mutated_source[-1] == '\n'
+            mutated_source = mutated_source[:-1]
+        return mutated_source
+
+    def mutate(self) -> Tuple[str, int]:
+        """
+        :return: tuple of mutated source code and number of mutations performed
+        """
+        result = self.parse_source()
+
         mutator_iterator = PostOrderIterator(result, self.context)
 
         for node in mutator_iterator:
             self.mutate_node(node)
 
-        mutated_source = result.get_code().replace(' not not ', ' ')
-        if self.context.remove_newline_at_end:
-            assert mutated_source[-1] == '\n'
-            mutated_source = mutated_source[:-1]
+        mutated_source = self.mutated_source_from_code(result.get_code())
 
         # If we said we mutated the code, check that it has actually changed
         if self.context.performed_mutation_ids:
@@ -111,8 +123,11 @@ class Mutator:
             mutmut_config.pre_mutation_ast(context=self.context)
 
         if self.context.should_mutate(node):
-            self.context.performed_mutation_ids.append(self.context.mutation_id_of_current_index)
+            self.context.performed_mutation_ids.append(
+                replace(self.context.mutation_id_of_current_index, mutation_type=node.type))
             setattr(node, node_attribute, new)
+            if self.on_mutation_applied is not None:
+                self.on_mutation_applied(node, node_attribute, old)
 
         self.context.index += 1
 
@@ -124,6 +139,31 @@ class Mutator:
         self.mutate()
         return self.context.performed_mutation_ids
 
+    def list_mutations_with_source_hashes(self) -> List[Tuple[RelativeMutationID, str]]:
+        """List all mutations together with a hash of the source code each single one of them produces.
+
+        The source is parsed only once: every mutation is applied to the tree, hashed and reverted again.
+
+        :return: list of tuples of mutation id and hash of the mutated source code
+        """
+        assert self.context.mutation_id == ALL
+        tree = self.parse_source()
+        source_hashes = []
+
+        def hash_and_revert(node, node_attribute, old):
+            mutated_source = self.mutated_source_from_code(tree.get_code())
+            source_hashes.append(hashlib.sha256(mutated_source.encode('utf-8')).hexdigest())
+            setattr(node, node_attribute, old)
+
+        self.on_mutation_applied = hash_and_revert
+        try:
+            for node in PostOrderIterator(tree, self.context):
+                self.mutate_node(node)
+        finally:
+            self.on_mutation_applied = None
+
+        return list(zip(self.context.performed_mutation_ids, source_hashes))
+
     def mutate_file(self, backup: bool, test_lock: multiprocessing.Lock) -> Tuple[str, str]:
         original = (f'{self.context.filename}.bak' if os.path.isfile(f'{self.context.filename}.bak')
                     else self.context.filename)
@@ -132,7 +172,9 @@ class Mutator:
         if backup and not os.path.isfile(f'{self.context.filename}.bak'):
             with open(f'{self.context.filename}.bak', 'w') as f:
                 f.write(original_content)
-        mutated, _ = self.mutate()
+        if self.context.mutated_source is None:
+            self.mutate()
+        mutated = self.context.mutated_source
         test_lock.acquire()
         with open(f'{self.context.filename}', 'w') as f:
             f.write(mutated)
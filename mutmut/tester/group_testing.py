@@ -0,0 +1,129 @@
+import ast
+import os
+import shlex
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from mutmut.helpers.config import Config
+from mutmut.helpers.coverage_matrix import CoverageMatrix
+from mutmut.helpers.relativemutationid import RelativeMutationID
+
+try:
+    import mutmut_config
+except ImportError:
+    mutmut_config = None
+
+PYTEST_PLUGIN = 'mutmut.tester.pytest_plugin'
+
+
+def node_id_from_context(context: str, tests_dirs: List[str]) -> Optional[str]:
+    """Turn a coverage context of a test into a pytest node id
+
+    Both the contexts of pytest-cov (``--cov-context=test``, like ``tests/test_foo.py::test_bar|run``)
+    and of coverage.py's ``dynamic_context = test_function`` (like ``tests.test_foo.test_bar``) are understood.
+
+    :return: the node id, or :obj:`None` if the context doesn't belong to a test
+    """
+    if '|' in context:
+        context = context.rpartition('|')[0]
+    if '::' in context:
+        return context
+
+    # the module name is relative to the current directory or to one of the test directories
+    parts = context.split('.')
+    for i in range(len(parts) - 1, 0, -1):
+        for root in ['.'] + list(tests_dirs or []):
+            module_path = os.path.normpath(os.path.join(root, *parts[:i]) + '.py')
+            if os.path.isfile(module_path):
+                return '::'.join([module_path.replace(os.sep, '/')] + parts[i:])
+    return None
+
+
+def can_group_mutants(config: Config) -> bool:
+    """Mutants can only be tested in groups if no hook needs to see them one at a time"""
+    if config.group_mutants < 2 or config.coverage_data is None:
+        return False
+    return not config.pre_mutation and not config.post_mutation and not hasattr(mutmut_config, 'pre_mutation')
+
+
+def coverage_matrix(config: Config, filenames: List[str]) -> CoverageMatrix:
+    """The tests that cover each line of the given files, with pytest node ids as test ids"""
+    node_ids = {}
+
+    def node_id(context):
+        if context not in node_ids:
+            node_ids[context] = node_id_from_context(context, config.tests_dirs) if context else None
+        return node_ids[context]
+
+    return CoverageMatrix.from_coverage_data(
+        config.coverage_data or {}, {os.path.abspath(x) for x in filenames}, node_id)
+
+
+def covering_tests(config: Config, filename: str, mutation_id: RelativeMutationID) -> FrozenSet[str]:
+    """
+    :return: node ids of the tests that execute the line of the mutant
+    """
+    contexts_by_line = (config.coverage_data or {}).get(os.path.abspath(filename)) or {}
+    contexts = contexts_by_line.get(mutation_id.line_number + 1) or []
+    return frozenset(filter(None, (node_id_from_context(x, config.tests_dirs) for x in contexts)))
+
+
+@lru_cache(maxsize=128)
+def function_starts_by_line(source: str) -> Dict[int, int]:
+    """
+    :return: the first line of the innermost function around each line that is inside a function, 0-based
+    """
+    result = {}
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return result
+    functions = [x for x in ast.walk(tree) if isinstance(x, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    # outer functions first, so inner functions overwrite the lines they share
+    for function in sorted(functions, key=lambda x: (x.lineno, -x.end_lineno)):
+        for line_number in range(function.lineno - 1, function.end_lineno):
+            result[line_number] = function.lineno - 1
+    return result
+
+
+def form_groups(config: Config, mutants: List[Tuple[str, RelativeMutationID]], source_by_filename: Dict[str, str]) \
+        -> List[List[Tuple[str, RelativeMutationID]]]:
+    """Divide the mutants over groups that can be tested with a single test run
+
+    The mutants of a group are all in different functions and the sets of tests that cover them
+    don't overlap, so a failing test can only be caused by one of the mutants of the group.
+    Mutants outside of functions or without covering tests end up in a group of their own.
+    The groups are in the order of their first mutant.
+    """
+    matrix = coverage_matrix(config, list(source_by_filename))
+    groups = []
+    # [mutants, functions, bits of the covering tests] of the groups that can take more mutants
+    open_groups = []
+    for filename, mutation_id in mutants:
+        function_start = function_starts_by_line(source_by_filename[filename]).get(mutation_id.line_number)
+        tests = matrix.tests_covering(os.path.abspath(filename), mutation_id.line_number + 1)
+        if function_start is None or not tests:
+            groups.append([(filename, mutation_id)])
+            continue
+
+        function = (filename, function_start)
+        for open_group in open_groups:
+            if function not in open_group[1] and not open_group[2] & tests:
+                break
+        else:
+            open_group = [[], set(), 0]
+            groups.append(open_group[0])
+            open_groups.append(open_group)
+
+        open_group[0].append((filename, mutation_id))
+        open_group[1].add(function)
+        open_group[2] |= tests
+        if len(open_group[0]) >= config.group_mutants:
+            open_groups.remove(open_group)
+    return groups
+
+
+def group_test_command(config: Config, tests: FrozenSet[str]) -> str:
+    """The default test command, limited to the given tests, without stopping at the first failure"""
+    return '{} -p {} --maxfail=0 {}'.format(
+        config._default_test_command, PYTEST_PLUGIN, ' '.join(shlex.quote(x) for x in sorted(tests)))
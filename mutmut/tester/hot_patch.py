@@ -0,0 +1,169 @@
+import ast
+import importlib
+import importlib.util
+import os
+import sys
+import types
+from typing import List, Optional, Tuple
+
+
+def end_of_signature(node) -> int:
+    """The last line of the signature of a function, with its default arguments and annotations"""
+    arguments = node.args
+    parts = arguments.posonlyargs + arguments.args + arguments.kwonlyargs + [arguments.vararg, arguments.kwarg]
+    parts += arguments.defaults + arguments.kw_defaults + [node.returns]
+    return max([node.lineno] + [x.end_lineno for x in parts if x is not None])
+
+
+def enclosing_function_path(source: str, line_number: int) -> Optional[List[str]]:
+    """Find the outermost function whose body contains the given line, 1-based
+
+    :return: the names of the classes around the function and of the function itself, or :obj:`None`
+        if the line is not inside the body of a function defined at module level or in a class body,
+        like a decorator, a default argument or a class attribute
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+
+    path = []
+    body = tree.body
+    while True:
+        for node in body:
+            if not node.lineno <= line_number <= node.end_lineno:
+                continue
+            if isinstance(node, ast.ClassDef):
+                path.append(node.name)
+                body = node.body
+                break
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if line_number >= node.body[0].lineno and line_number > end_of_signature(node):
+                    return path + [node.name]
+            return None
+        else:
+            return None
+
+
+def find_code(code: types.CodeType, name: str, first_line_number: int) -> Optional[types.CodeType]:
+    """Find the code object of a function by name and first line among the constants of a module's code"""
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            if const.co_name == name and const.co_firstlineno == first_line_number:
+                return const
+            found = find_code(const, name, first_line_number)
+            if found is not None:
+                return found
+    return None
+
+
+def loaded_module(filename: str) -> Optional[types.ModuleType]:
+    filename = os.path.abspath(filename)
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, '__file__', None)
+        if module_file and os.path.abspath(module_file) == filename:
+            return module
+    return None
+
+
+def module_name_on_sys_path(filename: str) -> Optional[str]:
+    filename = os.path.abspath(filename)
+    for entry in sys.path:
+        directory = os.path.abspath(entry or os.curdir)
+        if os.path.commonpath([directory, filename]) != directory:
+            continue
+        parts = os.path.relpath(filename, directory)[:-len('.py')].split(os.sep)
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        if parts and all(x.isidentifier() for x in parts):
+            return '.'.join(parts)
+    return None
+
+
+class HotPatch:
+    """Apply a mutant to an already imported module by replacing the code of the function around it
+
+    This is much cheaper than importing the module, and everything that imports it, again. If the
+    module isn't imported yet it is imported from the source without the mutant first, so it can be
+    patched for this and all later mutants. Only mutants inside the body of a function can be applied
+    this way. For other mutants, or if the function can't be found, :meth:`apply` returns :obj:`False`
+    and the module has to be imported again from the mutated file.
+    """
+
+    def __init__(self, filename: str, source: str, mutated_source: str, line_number: int):
+        """
+        :param line_number: the line of the mutant, 1-based
+        """
+        self.filename = filename
+        self.source = source
+        self.mutated_source = mutated_source
+        self.line_number = line_number
+        self.enabled = True
+        self._patched: Optional[Tuple[types.FunctionType, types.CodeType]] = None
+
+    def import_original(self) -> Optional[types.ModuleType]:
+        """Import the module from the source without the mutant, the file itself may be mutated already"""
+        module_name = module_name_on_sys_path(self.filename)
+        if module_name is None:
+            return None
+        package, _, name = module_name.rpartition('.')
+        spec = importlib.util.spec_from_file_location(module_name, os.path.abspath(self.filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            if package:
+                setattr(importlib.import_module(package), name, module)
+            exec(compile(self.source, spec.origin, 'exec'), vars(module))
+        except Exception:
+            # the tests will import the module, and report the error, if it matters
+            del sys.modules[module_name]
+            return None
+        return module
+
+    def live_function(self) -> Optional[types.FunctionType]:
+        path = enclosing_function_path(self.source, self.line_number)
+        if path is None:
+            return None
+        module = loaded_module(self.filename) or self.import_original()
+        if module is None:
+            return None
+
+        obj = module
+        for name in path:
+            obj = vars(obj).get(name)
+            if obj is None:
+                return None
+        obj = getattr(obj, '__func__', obj)  # staticmethod and classmethod
+        # follow decorators made with functools.wraps to the function that was defined
+        while not (isinstance(obj, types.FunctionType) and obj.__code__.co_name == path[-1]):
+            obj = getattr(obj, '__wrapped__', None)
+            if obj is None:
+                return None
+        return obj
+
+    def apply(self) -> bool:
+        """
+        :return: :obj:`True` if the mutant was applied to the imported module
+        """
+        if not self.enabled:
+            return False
+        function = self.live_function()
+        if function is None:
+            return False
+        try:
+            module_code = compile(self.mutated_source, os.path.abspath(self.filename), 'exec')
+        except SyntaxError:
+            return False
+        original = function.__code__
+        mutated = find_code(module_code, original.co_name, original.co_firstlineno)
+        if mutated is None or mutated.co_freevars != original.co_freevars:
+            return False
+        function.__code__ = mutated
+        self._patched = function, original
+        return True
+
+    def revert(self):
+        if self._patched is not None:
+            function, original = self._patched
+            function.__code__ = original
+            self._patched = None
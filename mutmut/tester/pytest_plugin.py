@@ -0,0 +1,62 @@
+"""pytest plugin mutmut loads with ``-p mutmut.tester.pytest_plugin``
+
+What it does depends on the environment variables that are set:
+
+* ``MUTMUT_FAILED_TESTS_FILE``: the node ids of the failed tests are appended to this file,
+  used when a group of mutants is tested at once.
+* ``MUTMUT_COVERAGE_FILE`` and ``MUTMUT_COVERAGE_INCLUDE``: coverage of the files matching the
+  include patterns (separated by ``os.pathsep``) is measured with the node id of each test as
+  context and saved to this file.
+* ``MUTMUT_TEST_DURATIONS_FILE``: the duration of each test is written to this file as JSON.
+"""
+import json
+import os
+from collections import defaultdict
+
+FAILED_TESTS_FILE_VARIABLE = 'MUTMUT_FAILED_TESTS_FILE'
+COVERAGE_FILE_VARIABLE = 'MUTMUT_COVERAGE_FILE'
+COVERAGE_INCLUDE_VARIABLE = 'MUTMUT_COVERAGE_INCLUDE'
+TEST_DURATIONS_FILE_VARIABLE = 'MUTMUT_TEST_DURATIONS_FILE'
+
+_coverage = None
+_durations = defaultdict(float)
+
+
+def pytest_configure(config):
+    global _coverage
+    data_file = os.environ.get(COVERAGE_FILE_VARIABLE)
+    if data_file:
+        from coverage import Coverage
+        include = os.environ.get(COVERAGE_INCLUDE_VARIABLE, '').split(os.pathsep)
+        _coverage = Coverage(data_file=data_file, include=[x for x in include if x], config_file=False)
+        _coverage.start()
+
+
+def pytest_runtest_logstart(nodeid, location):
+    if _coverage is not None:
+        _coverage.switch_context(nodeid)
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    if _coverage is not None:
+        # code that runs between tests, like imports during collection, gets the empty context
+        _coverage.switch_context('')
+
+
+def pytest_runtest_logreport(report):
+    filename = os.environ.get(FAILED_TESTS_FILE_VARIABLE)
+    if report.failed and filename:
+        with open(filename, 'a') as f:
+            f.write(report.nodeid + '\n')
+    _durations[report.nodeid] += report.duration
+
+
+def pytest_unconfigure(config):
+    if _coverage is not None:
+        _coverage.stop()
+        _coverage.save()
+
+    filename = os.environ.get(TEST_DURATIONS_FILE_VARIABLE)
+    if filename:
+        with open(filename, 'w') as f:
+            json.dump(_durations, f)
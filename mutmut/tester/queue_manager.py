@@ -1,8 +1,9 @@
-from copy import copy as copy_obj
-from typing import Dict, List
+from time import time
+from typing import Dict, Iterable, List, Optional, Tuple
 from mutmut.helpers.config import Config
-from mutmut.helpers.context import Context
 from mutmut.helpers.progress import Progress
+from mutmut.helpers.scheduler import Scheduler
+from mutmut.tester.group_testing import can_group_mutants, form_groups
 from mutmut.constants import UNTESTED
 from mutmut.helpers.relativemutationid import RelativeMutationID
 
@@ -25,29 +26,121 @@ class QueueManager:
                       config: Config,
                       mutants_queue,
                       mutations_by_file: Dict[str, List[RelativeMutationID]],
+                      duplicates_by_file: Optional[Dict[str, Dict[RelativeMutationID, List[RelativeMutationID]]]] = None,
+                      pending_duplicates: Optional[Dict[Tuple[str, RelativeMutationID], List[RelativeMutationID]]] = None,
+                      streamed_mutations: Optional[Iterable[Tuple[str, List[RelativeMutationID],
+                                                                  Dict[RelativeMutationID, List[RelativeMutationID]]]]] = None,
                       ):
-        from mutmut.cache import get_cached_mutation_statuses
+        """Put the untested mutants on the queue
+
+        Duplicates of another mutant are not queued. If the status of their representative is
+        already known it is copied right away, otherwise they are added to ``pending_duplicates``
+        so the status can be copied once the representative has been tested.
+
+        With a time budget the mutants are ordered by the :class:`Scheduler` and queueing
+        stops once the deadline has passed. With ``config.group_mutants`` mutants that can be
+        tested together are put on the queue as one group.
+
+        With ``streamed_mutations``, the filename, mutations and duplicates of one file after the
+        other as they are listed, the mutants of each file are queued as soon as the file is done
+        and ``progress.total`` grows with every file. ``mutations_by_file`` and
+        ``duplicates_by_file`` are not used then, and neither scheduling nor grouping is possible.
+        """
+        if pending_duplicates is None:
+            pending_duplicates = {}
 
         try:
-            index = 0
+            if streamed_mutations is not None:
+                for filename, mutations, duplicates in streamed_mutations:
+                    progress.total += len(mutations)
+                    untested_mutants = QueueManager.untested_mutants(progress, config, filename, mutations, duplicates,
+                                                                     pending_duplicates)
+                    QueueManager.put_groups(mutants_queue, config, [[x] for x in untested_mutants])
+                return
+
+            duplicates_by_file = duplicates_by_file or {}
+            untested_mutants = []
             for filename, mutations in mutations_by_file.items():
-                cached_mutation_statuses = get_cached_mutation_statuses(filename, mutations, config.hash_of_tests)
-                with open(filename) as f:
-                    source = f.read()
-                for mutation_id in mutations:
-                    cached_status = cached_mutation_statuses.get(mutation_id)
-                    if cached_status != UNTESTED:
-                        progress.register(cached_status)
-                        continue
-                    context = Context(
-                        mutation_id=mutation_id,
-                        filename=filename,
-                        dict_synonyms=config.dict_synonyms,
-                        config=copy_obj(config),
-                        source=source,
-                        index=index,
-                    )
-                    mutants_queue.put(('mutant', context))
-                    index += 1
+                untested_mutants.extend(QueueManager.untested_mutants(
+                    progress, config, filename, mutations, duplicates_by_file.get(filename, {}), pending_duplicates))
+
+            if config.deadline is not None:
+                untested_mutants = QueueManager.schedule(config, untested_mutants)
+
+            if can_group_mutants(config):
+                source_by_filename = {}
+                for filename, _ in untested_mutants:
+                    if filename not in source_by_filename:
+                        with open(filename) as f:
+                            source_by_filename[filename] = f.read()
+                groups = form_groups(config, untested_mutants, source_by_filename)
+            else:
+                groups = [[mutant] for mutant in untested_mutants]
+
+            QueueManager.put_groups(mutants_queue, config, groups)
         finally:
             mutants_queue.put(('end', None))
+
+    @staticmethod
+    def untested_mutants(progress: Progress, config: Config, filename: str, mutations: List[RelativeMutationID],
+                         duplicates: Dict[RelativeMutationID, List[RelativeMutationID]],
+                         pending_duplicates: Dict[Tuple[str, RelativeMutationID], List[RelativeMutationID]]) \
+            -> List[Tuple[str, RelativeMutationID]]:
+        """Register the cached statuses of the mutants of a file
+
+        :return: the mutants of the file that have to be tested
+        """
+        from mutmut.cache import get_cached_mutation_statuses, update_mutant_status
+
+        cached_mutation_statuses = get_cached_mutation_statuses(filename, mutations, config.hash_of_tests)
+        duplicate_ids = {x for mutation_ids in duplicates.values() for x in mutation_ids}
+        result = []
+        for mutation_id in mutations:
+            cached_status = cached_mutation_statuses.get(mutation_id)
+            untested_duplicates = [x for x in duplicates.get(mutation_id, [])
+                                   if cached_mutation_statuses.get(x) == UNTESTED]
+            if cached_status != UNTESTED:
+                progress.register(cached_status)
+                for duplicate in untested_duplicates:
+                    update_mutant_status(file_to_mutate=filename, mutation_id=duplicate, status=cached_status,
+                                         tests_hash=config.hash_of_tests)
+                    progress.register(cached_status)
+                continue
+            if mutation_id in duplicate_ids:
+                # the status is copied from the representative of the duplicates
+                continue
+            if untested_duplicates:
+                pending_duplicates[(filename, mutation_id)] = untested_duplicates
+            result.append((filename, mutation_id))
+        return result
+
+    @staticmethod
+    def put_groups(mutants_queue, config: Config, groups: List[List[Tuple[str, RelativeMutationID]]]):
+        """Put the groups of mutants on the queue, single mutants as ``'mutant'``, until the deadline
+
+        Only the filename and the id of each mutant are sent, the workers get the config when they
+        start and read the source of each file once.
+        """
+        for group in groups:
+            if config.deadline is not None and time() >= config.deadline:
+                break
+            if len(group) == 1:
+                mutants_queue.put(('mutant', group[0]))
+            else:
+                mutants_queue.put(('group', group))
+
+    @staticmethod
+    def schedule(config: Config, mutants: List[Tuple[str, RelativeMutationID]]) \
+            -> List[Tuple[str, RelativeMutationID]]:
+        from mutmut.cache import get_mutant_history, get_survival_counts
+
+        mutations_by_file = {}
+        for filename, mutation_id in mutants:
+            mutations_by_file.setdefault(filename, []).append(mutation_id)
+        history = {}
+        for filename, mutations in mutations_by_file.items():
+            for mutation_id, mutant_history in get_mutant_history(filename, mutations).items():
+                history[(filename, mutation_id)] = mutant_history
+
+        scheduler = Scheduler(config.baseline_time_elapsed, *get_survival_counts())
+        return scheduler.order(mutants, history)
@@ -0,0 +1,67 @@
+import shlex
+from typing import Dict, Iterable, List, Optional
+
+from mutmut.helpers.config import Config
+from mutmut.tester.group_testing import PYTEST_PLUGIN
+
+
+def kill_probability(counts: Optional[List[int]]) -> float:
+    """Estimate the chance that a test kills a mutant it covers from the mutants it killed and was run against
+
+    With no history at all this is 0.5, every run moves the estimate towards the observed rate.
+    """
+    killed, tested = counts or (0, 0)
+    return (killed + 1) / (tested + 2)
+
+
+def durations_of_tests(config: Config, tests: Iterable[str]) -> Dict[str, float]:
+    """The measured duration of each test, tests without one get the average duration of the measured tests"""
+    durations = config.test_durations or {}
+    default = sum(durations.values()) / len(durations) if durations else 1.0
+    return {test: durations.get(test, default) for test in tests}
+
+
+def order_tests(config: Config, tests: Iterable[str]) -> List[str]:
+    """Sort the tests with the highest chance to kill a mutant per second first"""
+    durations = durations_of_tests(config, tests)
+    kill_counts = config.test_kill_counts or {}
+
+    def priority(test):
+        return kill_probability(kill_counts.get(test)) / max(durations[test], 1e-6)
+
+    # sort the ids first, so tests of equal priority are always in the same order
+    return sorted(sorted(durations), key=priority, reverse=True)
+
+
+def stages_of_tests(config: Config, tests: Iterable[str]) -> List[List[str]]:
+    """Split the ordered covering tests in the stages they are run in
+
+    Without a first stage budget all tests are run in one stage. Otherwise the first stage gets the
+    best tests up to that many seconds, at least one, and the rest of the tests are only run if all
+    tests of the first stage passed.
+    """
+    ordered = order_tests(config, tests)
+    if config.first_stage_budget is None:
+        return [ordered]
+
+    durations = durations_of_tests(config, ordered)
+    first_stage = ordered[:1]
+    total = durations[ordered[0]] if ordered else 0.0
+    for test in ordered[1:]:
+        total += durations[test]
+        if total > config.first_stage_budget:
+            break
+        first_stage.append(test)
+    rest = ordered[len(first_stage):]
+    return [first_stage, rest] if rest else [first_stage]
+
+
+def selected_tests_command(config: Config, tests: List[str]) -> str:
+    """The default test command, limited to the given tests in the given order, stopping at the first failure"""
+    return '{} -p {} --maxfail=1 {}'.format(
+        config._default_test_command, PYTEST_PLUGIN, ' '.join(shlex.quote(x) for x in tests))
+
+
+def command_for_test_files(config: Config, test_files: List[str]) -> str:
+    """The default test command, limited to the given test files"""
+    return '{} {}'.format(config._default_test_command, ' '.join(shlex.quote(x) for x in test_files))
@@ -1,15 +1,19 @@
 import multiprocessing
 import os
+import signal
 import sys
+import tempfile
+from copy import copy as copy_obj
 from shutil import (
     copy,
+    rmtree,
 )
 from threading import (
     Timer,
     Thread,
 )
 from time import time
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 
 from mutmut.helpers.config import Config
@@ -17,12 +21,20 @@ from mutmut.helpers.context import Context
 from mutmut.helpers.progress import Progress
 from mutmut.helpers.relativemutationid import RelativeMutationID
 from mutmut.mutator.mutator import Mutator
-from mutmut.constants import UNTESTED, SKIPPED, BAD_TIMEOUT
+from mutmut.mutator.equivalence import is_equivalent_mutant
+from mutmut.constants import SKIPPED, BAD_TIMEOUT, EQUIVALENT, OK_KILLED
 
+from mutmut.tester.group_testing import covering_tests, group_test_command
+from mutmut.tester.hot_patch import HotPatch
+from mutmut.tester.pytest_plugin import FAILED_TESTS_FILE_VARIABLE
 from mutmut.tester.queue_manager import QueueManager
-from mutmut.tester.tester_helper import TesterHelper, SkipException
+from mutmut.tester.test_selection import selected_tests_command, stages_of_tests, command_for_test_files
+from mutmut.tester.tester_helper import MAX_WALL_TIME_FACTOR, TesterHelper, SkipException
+from mutmut.tester.worker_count import WorkerCount
 
 CYCLE_PROCESS_AFTER = 100
+# modules the forkserver imports before it forks the workers, missing modules are skipped
+FORKSERVER_PRELOAD = ['mutmut.tester.tester', 'mutmut.cache', 'parso', 'hammett']
 
 
 class Tester:
@@ -31,15 +43,29 @@ class Tester:
         self.tester_helper = TesterHelper()
 
     def run_mutation_tests(self, config: Config, progress: Progress, test_processes: int,
-                           mutations_by_file: Dict[str, List[RelativeMutationID]]):
-        # Need to explicitly use the spawn method for python < 3.8 on macOS
-        multiprocessing.set_start_method('spawn', force=True)
-        mp_ctx = multiprocessing.get_context()
+                           mutations_by_file: Dict[str, List[RelativeMutationID]],
+                           duplicates_by_file: Optional[Dict[str, Dict[RelativeMutationID,
+                                                                       List[RelativeMutationID]]]] = None,
+                           streamed_mutations: Optional[Iterable[Tuple[str, List[RelativeMutationID],
+                                                                       Dict[RelativeMutationID,
+                                                                            List[RelativeMutationID]]]]] = None):
+        """
+        :param streamed_mutations: the mutations of one file after the other while they are listed, see
+            :meth:`QueueManager.queue_mutants`, ``mutations_by_file`` is only used to remove the backups then
+        """
+        mp_ctx = multiprocessing.get_context(config.start_method)
+        if config.start_method == 'forkserver':
+            # the server imports these once, and every worker is forked from it with them already imported
+            mp_ctx.set_forkserver_preload(FORKSERVER_PRELOAD)
+
+        # duplicates waiting for the status of their representative, by (filename, representative)
+        pending_duplicates = {}
 
         mutants_queue = mp_ctx.Queue(maxsize=100)
         self.queue_manager.add_to_active_queues(mutants_queue)
+        queue_errors = []
         queue_mutants_thread = Thread(
-            target=self.queue_manager.queue_mutants,
+            target=self.queue_mutants,
             name='queue_mutants',
             daemon=True,
             kwargs=dict(
@@ -47,35 +73,54 @@ class Tester:
                 config=config,
                 mutants_queue=mutants_queue,
                 mutations_by_file=mutations_by_file,
+                duplicates_by_file=duplicates_by_file,
+                pending_duplicates=pending_duplicates,
+                streamed_mutations=streamed_mutations,
+                errors=queue_errors,
             )
         )
         queue_mutants_thread.start()
 
-        test_lock = multiprocessing.Lock()
-        threads = []
-        thread_range = range(test_processes)
-        for _ in thread_range:
-            results_queue = mp_ctx.Queue(maxsize=100)
-            self.queue_manager.add_to_active_queues(results_queue)
-            threads.append((self.create_worker(mp_ctx, test_lock, mutants_queue, results_queue), results_queue))
-
-        while True:
-            thread_status = [False] * len(threads)
-            for i, (thread, results_queue) in enumerate(threads):
-                thread_result = self.command_results_is_end(mp_ctx, test_lock, mutants_queue, results_queue, thread,
-                                                            config, progress)
-                thread_status[i] = thread_result
-            if all(thread_status):
-                break
-            for i, status in enumerate(reversed(thread_status)):
-                if status:
-                    threads.pop(len(thread_status) - 1 - i)
+        test_lock = mp_ctx.Lock()
+        # all workers report on one queue, so results are handled in the order they come in, no matter
+        # which worker is still busy with a slow mutant
+        results_queue = mp_ctx.Queue(maxsize=100 * test_processes)
+        self.queue_manager.add_to_active_queues(results_queue)
+        # with --test-processes auto there are fewer workers while mutants time out or memory runs low
+        worker_count = WorkerCount(mp_ctx, test_processes) if config.automatic_test_processes else None
+        workers = {}
+        for worker_id in range(test_processes):
+            worker = self.create_worker(mp_ctx, test_lock, mutants_queue, results_queue, config,
+                                        worker_count and worker_count.retirements, worker_id)
+            workers[worker.pid] = worker
+
+        retired_workers = []
+        while workers:
+            self.handle_result(mp_ctx, test_lock, mutants_queue, results_queue, workers, retired_workers, config,
+                               progress, pending_duplicates, worker_count)
+        for worker in retired_workers:
+            worker.join()
 
         # Cleanup Backup files
         if mutations_by_file:
             self.tester_helper.cleanup_backups(mutations_by_file.keys())
 
-    def create_worker(self, mp_ctx, test_lock, mutants_queue, results_queue):
+        if queue_errors:
+            # like a failure to list the mutations of a file while streaming
+            raise queue_errors[0]
+
+    def queue_mutants(self, errors: list, **kwargs):
+        try:
+            self.queue_manager.queue_mutants(**kwargs)
+        except Exception as e:
+            errors.append(e)
+
+    def create_worker(self, mp_ctx, test_lock, mutants_queue, results_queue, config: Config, retirements=None,
+                      worker_id=0):
+        """
+        :param worker_id: the number of the worker, from 0 up, a worker that replaces another one takes its number
+        """
+        # the config is sent once to every worker, the queue only carries the filename and id of each mutant
         t = mp_ctx.Process(
             target=self.check_mutants,
             name='check_mutants',
@@ -84,85 +129,261 @@ class Tester:
                 mutants_queue=mutants_queue,
                 results_queue=results_queue,
                 test_lock=test_lock,
-                cycle_process_after=CYCLE_PROCESS_AFTER,
+                cycle_process_after=(CYCLE_PROCESS_AFTER if config.max_worker_mutants is None
+                                     else config.max_worker_mutants),
+                config=config,
+                retirements=retirements,
+                worker_id=worker_id,
             )
         )
+        t.worker_id = worker_id
         t.start()
         return t
 
-    def command_results_is_end(self, mp_ctx, test_lock, mutants_queue, results_queue, t, config: Config,
-                               progress: Progress):
-        from mutmut.cache import update_mutant_status
+    def handle_result(self, mp_ctx, test_lock, mutants_queue, results_queue, workers, retired_workers,
+                      config: Config, progress: Progress, pending_duplicates=None,
+                      worker_count: Optional[WorkerCount] = None):
+        """Handle the next message of any worker
+
+        :param workers: the running workers by process id, a worker is removed when it ends, and
+            replaced by a new one when it cycles
+        :param retired_workers: workers that cycled, they exit on their own and are joined at the end
+        :param worker_count: lowers the number of workers when memory runs low, if it isn't fixed
+        """
+        from mutmut.cache import update_mutant_status, update_test_kill_counts
 
-        command, status, filename, mutation_id = results_queue.get()
+        command, status, filename, mutation_id, time_elapsed = results_queue.get()
         if command == 'end':
-            t.join()
-            return True
+            workers.pop(status).join()
 
         elif command == 'cycle':
-            self.create_worker(mp_ctx, test_lock, mutants_queue, results_queue)
-            return False
+            retired_worker = workers.pop(status)
+            retired_workers.append(retired_worker)
+            worker = self.create_worker(mp_ctx, test_lock, mutants_queue, results_queue, config,
+                                        worker_count and worker_count.retirements, retired_worker.worker_id)
+            workers[worker.pid] = worker
 
         elif command == 'progress':
             self.tester_helper.handle_progress(status, config, progress)
-            return False
+
+        elif command == 'tests_run':
+            tests, killed_by = status
+            update_test_kill_counts(tests, killed_by)
 
         else:
             assert command == 'status'
             progress.register(status)
             update_mutant_status(file_to_mutate=filename, mutation_id=mutation_id, status=status,
-                                 tests_hash=config.hash_of_tests)
-            return False
-
-    def check_mutants(self, mutants_queue, results_queue, test_lock, cycle_process_after):
+                                 tests_hash=config.hash_of_tests, time_elapsed=time_elapsed)
+            if worker_count is not None:
+                worker_count.register()
+            for duplicate in (pending_duplicates or {}).pop((filename, mutation_id), []):
+                progress.register(status)
+                update_mutant_status(file_to_mutate=filename, mutation_id=duplicate, status=status,
+                                     tests_hash=config.hash_of_tests)
+
+    def check_mutants(self, mutants_queue, results_queue, test_lock, cycle_process_after, config: Config,
+                      retirements=None, worker_id=0):
+        """
+        :param retirements: the number of workers asked to stop, the worker stops between mutants
+            if it can claim one, see :meth:`WorkerCount.should_retire`
+        :param worker_id: the number of the worker, see :meth:`TesterHelper.isolate_worker`
+        """
         def feedback(line):
-            results_queue.put(('progress', line, None, None))
+            results_queue.put(('progress', line, None, None, None))
+
+        def tests_run(tests, killed_by):
+            results_queue.put(('tests_run', (tests, killed_by), None, None, None))
 
         did_cycle = False
+        bytecode_cache = self.tester_helper.use_private_bytecode_cache()
+        temporary_directory = self.tester_helper.isolate_worker(worker_id)
+        source_by_filename = {}
 
         try:
             count = 0
+            start_time = time()
             while True:
-                command, context = mutants_queue.get()
+                command, mutants = mutants_queue.get()
                 if command == 'end':
                     mutants_queue.put(('end', None))
                     break
 
-                status = self.run_mutation(context, feedback, test_lock)
+                if config.deadline is not None and time() >= config.deadline:
+                    # the time budget is spent, leave the rest of the mutants untested
+                    mutants_queue.put(('end', None))
+                    break
+
+                contexts = [
+                    self.context_of(config, filename, mutation_id, source_by_filename, test_lock)
+                    for filename, mutation_id in (mutants if command == 'group' else [mutants])
+                ]
+
+                start = time()
+                if command == 'group':
+                    statuses = self.run_mutation_group(contexts, feedback, test_lock)
+                else:
+                    statuses = [(contexts[0], None)]
+                group_time_elapsed = (time() - start) / len(contexts)
+
+                for context, status in statuses:
+                    time_elapsed = group_time_elapsed
+                    if status is None:
+                        start = time()
+                        status = self.run_mutation(context, feedback, test_lock, tests_run)
+                        time_elapsed += time() - start
+                    results_queue.put(('status', status, context.filename, context.mutation_id, time_elapsed))
+                    count += 1
+
+                if WorkerCount.should_retire(retirements):
+                    break
 
-                results_queue.put(('status', status, context.filename, context.mutation_id))
-                count += 1
-                if count == cycle_process_after:
-                    results_queue.put(('cycle', None, None, None))
+                if self.tester_helper.should_recycle_worker(config, count, cycle_process_after, start_time):
+                    results_queue.put(('cycle', os.getpid(), None, None, None))
                     did_cycle = True
                     break
         finally:
+            if bytecode_cache is not None:
+                rmtree(bytecode_cache, ignore_errors=True)
+            rmtree(temporary_directory, ignore_errors=True)
             if not did_cycle:
-                results_queue.put(('end', None, None, None))
+                results_queue.put(('end', os.getpid(), None, None, None))
+
+    @staticmethod
+    def context_of(config: Config, filename: str, mutation_id: RelativeMutationID, source_by_filename: Dict[str, str],
+                   test_lock) -> Context:
+        """The context to test a mutant in, with a copy of the config hooks may change"""
+        if filename not in source_by_filename:
+            # while the lock is held by nobody else no file is mutated
+            with test_lock:
+                with open(filename) as f:
+                    source_by_filename[filename] = f.read()
+        return Context(
+            mutation_id=mutation_id,
+            filename=filename,
+            dict_synonyms=config.dict_synonyms,
+            config=copy_obj(config),
+            source=source_by_filename[filename],
+        )
+
+    def run_mutation_group(self, contexts: List[Context], callback, test_lock) -> List[Tuple[Context, Optional[str]]]:
+        """Test a group of mutants with a single run of the tests that cover them
+
+        A mutant is killed if one of its covering tests failed. If the outcome can't be
+        attributed to the single mutants, the group is split in two and both halves are tested.
 
-    def run_mutation(self, context: Context, callback, test_lock) -> str:
+        :return: each context with the status of its mutant, or :obj:`None` if it has to be tested on its own
         """
-        :return: (computed or cached) status of the tested mutant, one of mutant_statuses
+        if len(contexts) == 1:
+            return [(contexts[0], None)]
+
+        config = contexts[0].config
+        mutated_source_by_filename = {}
+        for context in contexts:
+            # mutants in the same file are applied on top of each other
+            mutator = Mutator(Context(
+                source=mutated_source_by_filename.get(context.filename, context.source),
+                mutation_id=context.mutation_id,
+                filename=context.filename,
+                dict_synonyms=context.dict_synonyms,
+                config=config,
+            ))
+            mutated_source, number_of_mutations_performed = mutator.mutate()
+            if not number_of_mutations_performed:
+                return [(x, None) for x in contexts]
+            mutated_source_by_filename[context.filename] = mutated_source
+
+        tests_by_context = [(x, covering_tests(config, x.filename, x.mutation_id)) for x in contexts]
+        all_tests = frozenset().union(*(tests for _, tests in tests_by_context))
+        failed_tests = self.failed_group_tests(config, mutated_source_by_filename, all_tests, callback, test_lock)
+
+        if failed_tests is None or not failed_tests <= all_tests:
+            middle = len(contexts) // 2
+            first_half = self.run_mutation_group(contexts[:middle], callback, test_lock)
+            return first_half + self.run_mutation_group(contexts[middle:], callback, test_lock)
+
+        # mutants whose tests all passed are tested on their own, with the full test command
+        return [(context, OK_KILLED if tests & failed_tests else None) for context, tests in tests_by_context]
+
+    def failed_group_tests(self, config: Config, mutated_source_by_filename: Dict[str, str], tests, callback,
+                           test_lock) -> Optional[Set[str]]:
+        """Write all mutated files and run the given tests
+
+        :return: node ids of the failed tests, or :obj:`None` if the run failed in some other way
+        """
+        for filename in mutated_source_by_filename:
+            if not os.path.isfile(f'{filename}.bak'):
+                copy(filename, f'{filename}.bak')
+
+        test_lock.acquire()
+        try:
+            for filename, mutated_source in mutated_source_by_filename.items():
+                with open(filename, 'w') as f:
+                    f.write(mutated_source)
+            try:
+                return self.failed_tests(config, group_test_command(config, tests), callback)
+            except TimeoutError:
+                return None
+        finally:
+            for filename in mutated_source_by_filename:
+                copy(f'{filename}.bak', filename)
+            test_lock.release()
+
+    def failed_tests(self, config: Config, command: str, callback) -> Optional[Set[str]]:
+        """Run a pytest command that loads mutmut's pytest plugin
+
+        :return: node ids of the failed tests, or :obj:`None` if the run failed in some other way
+        :raises TimeoutError: if the tests take longer than ten times the baseline
         """
-        from mutmut.cache import cached_mutation_status
-        cached_status = cached_mutation_status(context.filename, context.mutation_id, context.config.hash_of_tests)
+        fd, failed_tests_file = tempfile.mkstemp(prefix='mutmut-failed-tests-')
+        os.close(fd)
+        os.environ[FAILED_TESTS_FILE_VARIABLE] = failed_tests_file
+        try:
+            returncode = self.popen_streaming_output(command, callback, timeout=config.baseline_time_elapsed * 10,
+                                                     max_memory=config.max_test_memory,
+                                                     max_cpu_time=config.max_test_cpu_time,
+                                                     cpu_timeout=self.tester_helper.cpu_timeout(config))
+            with open(failed_tests_file) as f:
+                failed_tests = {x for x in f.read().splitlines() if x}
+            if returncode not in (0, 1) or (returncode == 1) != bool(failed_tests):
+                return None
+            return failed_tests
+        finally:
+            del os.environ[FAILED_TESTS_FILE_VARIABLE]
+            os.remove(failed_tests_file)
 
-        if cached_status != UNTESTED and context.config.total != 1:
-            return cached_status
+    def run_mutation(self, context: Context, callback, test_lock, tests_run_callback=None) -> str:
+        """
+        Cached statuses are looked up by :meth:`QueueManager.queue_mutants` before a mutant is queued,
+        so workers never open the cache.
 
+        :return: status of the tested mutant, one of mutant_statuses
+        """
         config = context.config
         # Pre Mutation
         status = self.tester_helper.execute_pre_mutation(context)
         if status is not None:
             return status
-        self.tester_helper.execute_config_pre_mutation(config, callback)
 
         mutator = Mutator(context)
 
+        if config.detect_equivalent:
+            mutated_source, number_of_mutations_performed = mutator.mutate()
+            if number_of_mutations_performed and is_equivalent_mutant(context.source, mutated_source,
+                                                                      context.filename):
+                return EQUIVALENT
+
+        self.tester_helper.execute_config_pre_mutation(config, callback)
+
         try:
-            mutator.mutate_file(backup=True, test_lock=test_lock)
+            original_source, mutated_source = mutator.mutate_file(backup=True, test_lock=test_lock)
+            hot_patch = HotPatch(context.filename, original_source, mutated_source, context.mutation_id.line_number + 1)
             # Execute Tests
-            return self.execute_tests_on_mutation(config, callback)
+            tests = covering_tests(config, context.filename, context.mutation_id) if config.select_tests else None
+            test_files = (config.test_files_by_filename or {}).get(context.filename)
+            if not tests and test_files and config.test_command == config._default_test_command:
+                config.test_command = command_for_test_files(config, test_files)
+            return self.execute_tests_on_mutation(config, callback, tests, tests_run_callback, hot_patch)
 
         except SkipException:
             return SKIPPED
@@ -174,22 +395,62 @@ class Tester:
             # Post Mutation
             self.tester_helper.execute_config_post_mutation(config, callback)
 
-    def execute_tests_on_mutation(self, config: Config, callback):
+    def execute_tests_on_mutation(self, config: Config, callback, tests=None, tests_run_callback=None,
+                                  hot_patch=None):
         start = time()
+        start_cpu_time = self.tester_helper.cpu_time()
         try:
-            survived = self.tests_pass(config=config, callback=callback)
-            if self.tester_helper.should_rerun_tests(config, survived):
+            if tests and config.test_command == config._default_test_command:
+                survived = self.selected_tests_pass(config, tests, callback, tests_run_callback)
+                # only the covering tests were run
+                rerun = survived and config.rerun_all
+            else:
+                survived = self.tests_pass(config=config, callback=callback, hot_patch=hot_patch)
+                rerun = self.tester_helper.should_rerun_tests(config, survived)
+            if rerun:
                 # rerun the whole test suite to be sure the mutant can not be killed by other tests
                 config.test_command = config._default_test_command
-                survived = self.tests_pass(config=config, callback=callback)
+                survived = self.tests_pass(config=config, callback=callback, hot_patch=hot_patch)
         except TimeoutError:
             return BAD_TIMEOUT
 
-        return self.tester_helper.determine_tests_result(config, start, survived)
+        return self.tester_helper.determine_tests_result(config, start, survived, start_cpu_time)
+
+    def selected_tests_pass(self, config: Config, tests, callback, tests_run_callback=None) -> bool:
+        """Run the covering tests of a mutant in stages, the tests most likely to kill it per second first
+
+        :param tests_run_callback: called with the tests that were run and the test that killed the mutant, if any
+        :return: :obj:`True` if the tests pass, otherwise :obj:`False`
+        """
+        tests_run = []
+        for stage in stages_of_tests(config, tests):
+            failed_tests = self.failed_tests(config, selected_tests_command(config, stage), callback)
+            if failed_tests is None:
+                # the tests could not be run on their own, fall back to the full test command
+                return self.tests_pass(config=config, callback=callback)
+
+            if not failed_tests:
+                tests_run.extend(stage)
+                continue
+
+            # with --maxfail=1 the tests run in order up to the first failure
+            killed_by = min(failed_tests, key=lambda x: stage.index(x) if x in stage else len(stage))
+            tests_run.extend(stage[:stage.index(killed_by) + 1] if killed_by in stage else stage)
+            if tests_run_callback is not None:
+                tests_run_callback(tests_run, killed_by)
+            return False
+
+        if tests_run_callback is not None:
+            tests_run_callback(tests_run, None)
+        return True
 
-    def hammett_tests_pass(self, config: Config, callback) -> bool:
+    def hammett_tests_pass(self, config: Config, callback, hot_patch: Optional[HotPatch] = None) -> bool:
         # noinspection PyUnresolvedReferences
         from hammett import main_cli
+        patched = hot_patch is not None and hot_patch.apply()
+        if hot_patch is not None and not patched:
+            # modules loaded by earlier runs that depend on the mutated file still have its original code
+            self.tester_helper.unload_modules(sys.modules.keys(), config, hot_patch.filename)
         modules_before = set(sys.modules.keys())
 
         # set up timeout
@@ -217,46 +478,81 @@ class Tester:
             returncode = self.tester_helper.run_hammett_tests(callback, main_cli, timer, config)
         except KeyboardInterrupt:
             self.tester_helper.handle_keyboard_interrupt(timer, timed_out)
+        finally:
+            if patched:
+                hot_patch.revert()
+            self.tester_helper.unload_modules(modules_before, config, hot_patch and hot_patch.filename,
+                                              only_new=patched)
 
-        self.tester_helper.unload_modules(modules_before, config)
+        if patched and returncode == 0:
+            # code that ran when the module was imported, like a constant computed with the mutated function,
+            # doesn't see a hot patched mutant, so a surviving mutant is tested again with a fresh import
+            hot_patch.enabled = False
+            return self.hammett_tests_pass(config, callback, hot_patch)
 
         return returncode == 0
 
-    def popen_streaming_output(self, cmd: str, callback: Callable[[str], None], timeout: Optional[float] = None
-                               ) -> int:
+    def popen_streaming_output(self, cmd: str, callback: Callable[[str], None], timeout: Optional[float] = None,
+                               max_memory: Optional[float] = None, max_cpu_time: Optional[float] = None,
+                               cpu_timeout: Optional[float] = None) -> int:
         """Open a subprocess and stream its output without hard-blocking.
 
         :param cmd: the command to execute within the subprocess
         :param callback: function that intakes the subprocess' stdout line by line.
             It is called for each line received from the subprocess' stdout stream.
         :param timeout: the timeout time of the subprocess
+        :param max_memory: limit of the address space of the subprocess and the processes it starts in
+            megabytes, not supported on Windows
+        :param max_cpu_time: limit of the CPU time of the subprocess and the processes it starts in
+            seconds, not supported on Windows
+        :param cpu_timeout: past the timeout, the subprocess is only killed once it and the processes
+            it starts used this many seconds of CPU time, or after :data:`MAX_WALL_TIME_FACTOR` times
+            the timeout. So tests that were waiting for a CPU on a busy machine don't time out.
         :raises TimeoutError: if the subprocess' execution time exceeds
-            the timeout time
+            the timeout time, or the subprocess is ended by SIGXCPU for exceeding the CPU time limit
         :return: the return code of the executed subprocess
         """
         if os.name == 'nt':  # pragma: no cover
             process, stdout = self.tester_helper.start_windows_process(cmd)
         else:
-            process, stdout = self.tester_helper.start_other_os_process(cmd)
+            process, stdout = self.tester_helper.start_other_os_process(cmd, max_memory, max_cpu_time)
 
         # python 2-3 agnostic process timer
-        timer = Timer(timeout, self.tester_helper.kill, [process])
+        if cpu_timeout is None:
+            timer = Timer(timeout, self.tester_helper.kill, [process])
+        else:
+            timer = Timer(timeout, self.tester_helper.kill_after_cpu_time,
+                          [process, cpu_timeout, timeout * (MAX_WALL_TIME_FACTOR - 1)])
         timer.daemon = True
         timer.start()
 
-        while process.returncode is None:
-            self.tester_helper.stream_output(stdout, callback)
-            if not timer.is_alive():
-                raise TimeoutError("subprocess running command '{}' timed out after {} seconds".format(cmd, timeout))
-            process.poll()
+        try:
+            while process.returncode is None:
+                self.tester_helper.stream_output(stdout, callback)
+                if not timer.is_alive():
+                    raise TimeoutError(
+                        "subprocess running command '{}' timed out after {} seconds".format(cmd, timeout))
+                process.poll()
+        except BaseException:
+            # the subprocess runs in a session of its own, a Ctrl-C in the terminal doesn't reach it
+            timer.cancel()
+            self.tester_helper.kill(process)
+            raise
 
         # we have returned from the subprocess cancel the timer if it is running
         timer.cancel()
 
+        # a SIGKILL can also come from the OOM killer, it counts as a failing test run like any other signal
+        if max_cpu_time is not None and process.returncode == -signal.SIGXCPU:
+            raise TimeoutError("subprocess running command '{}' used more than {} seconds of CPU time".format(
+                cmd, max_cpu_time))
+
         return process.returncode
 
-    def tests_pass(self, config: Config, callback) -> bool:
+    def tests_pass(self, config: Config, callback, hot_patch: Optional[HotPatch] = None) -> bool:
         """
+        :param hot_patch: the mutant, so the in-process runner can patch it into the imported code or
+            only has to import what depends on it again
         :return: :obj:`True` if the tests pass, otherwise :obj:`False`
         """
         if config.using_testmon:
@@ -266,8 +562,11 @@ class Tester:
 
         # Special case for hammett! We can do in-process test running which is much faster
         if use_special_case and config.test_command.startswith(self.tester_helper.hammett_prefix):
-            return self.hammett_tests_pass(config, callback)
+            return self.hammett_tests_pass(config, callback, hot_patch)
 
         returncode = self.popen_streaming_output(config.test_command, callback,
-                                                 timeout=config.baseline_time_elapsed * 10)
+                                                 timeout=config.baseline_time_elapsed * 10,
+                                                 max_memory=config.max_test_memory,
+                                                 max_cpu_time=config.max_test_cpu_time,
+                                                 cpu_timeout=self.tester_helper.cpu_timeout(config))
         return returncode not in (1, 2)
@@ -1,15 +1,26 @@
+import math
 import os
 import shlex
+import shutil
+import signal
 import subprocess
 import sys
+import tempfile
 from io import (
     TextIOBase,
 )
 
-from time import time
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from time import sleep, time
+from typing import Dict, List, Optional, Set, Tuple
 
 from mutmut.helpers.config import Config
 from mutmut.helpers.context import Context
+from mutmut.helpers.import_graph import ImportGraph, imported_modules
 from mutmut.constants import SKIPPED, OK_SUSPICIOUS, BAD_SURVIVED, OK_KILLED
 
 if os.getcwd() not in sys.path:
@@ -19,6 +30,19 @@ try:
 except ImportError:
     mutmut_config = None
 
+PYCACHE_PREFIX_VARIABLE = 'PYTHONPYCACHEPREFIX'
+WORKER_ID_VARIABLE = 'MUTMUT_WORKER_ID'
+PORT_RANGE_VARIABLE = 'MUTMUT_PORT_RANGE'
+HASH_SEED_VARIABLE = 'PYTHONHASHSEED'
+# worker n may use the ports from FIRST_WORKER_PORT + n * PORTS_PER_WORKER on, up to the ephemeral ports of Linux
+FIRST_WORKER_PORT = 20000
+PORTS_PER_WORKER = 100
+FIRST_EPHEMERAL_PORT = 32768
+MAX_WORKERS = (FIRST_EPHEMERAL_PORT - FIRST_WORKER_PORT) // PORTS_PER_WORKER
+# with --use-cpu-time the tests of a mutant are killed after this many times the usual timeout, whatever their CPU time
+MAX_WALL_TIME_FACTOR = 4
+CPU_TIME_POLL_INTERVAL = 0.5
+
 
 class SkipException(Exception):
     pass
@@ -36,6 +60,8 @@ class StdOutRedirect(TextIOBase):
 class TesterHelper:
     def __init__(self):
         self.hammett_prefix = 'python -m hammett '
+        # modification time and imported module names, by filename
+        self._imports_by_filename: Dict[str, Tuple[int, List[str]]] = {}
 
     @staticmethod
     def handle_progress(status, config, progress):
@@ -69,11 +95,18 @@ class TesterHelper:
         return survived and config.test_command != config._default_test_command and config.rerun_all
 
     @staticmethod
-    def determine_tests_result(config: Config, start, survived):
+    def determine_tests_result(config: Config, start, survived, start_cpu_time=None):
+        """
+        :param start_cpu_time: :meth:`cpu_time` when the tests started, with ``config.use_cpu_time`` the
+            tests are only suspiciously slow if they took too much CPU time as well
+        """
         time_elapsed = time() - start
-        if not survived and time_elapsed > config.test_time_base + (
-                config.baseline_time_elapsed * config.test_time_multiplier
-        ):
+        too_slow = time_elapsed > config.test_time_base + config.baseline_time_elapsed * config.test_time_multiplier
+        if too_slow and start_cpu_time is not None and TesterHelper.cpu_timeout(config) is not None:
+            # slow tests that didn't do more work than usual were waiting for a CPU
+            cpu_time_elapsed = TesterHelper.cpu_time() - start_cpu_time
+            too_slow = cpu_time_elapsed > config.test_time_base + config.baseline_cpu_time * config.test_time_multiplier
+        if not survived and too_slow:
             return OK_SUSPICIOUS
 
         if survived:
@@ -105,12 +138,187 @@ class TesterHelper:
             raise TimeoutError('In process tests timed out')
         raise KeyboardInterrupt()
 
-    def unload_modules(self, modules_before, config: Config):
+    def unload_modules(self, modules_before, config: Config, mutated_filename=None, only_new=False):
+        """Remove the modules of the code under test from :data:`sys.modules`, so they are imported again
+
+        Without a mutated file every such module imported since ``modules_before`` is removed. With
+        one, only the modules that import the mutated file, directly or through other modules, are
+        removed and all others stay loaded for the next run. With ``only_new`` those modules are only
+        removed if they were imported since ``modules_before``, after the mutant was hot patched.
+        """
         modules_to_force_unload = {x.partition(os.sep)[0].replace('.py', '') for x in config.paths_to_mutate}
+        new_modules = set(sys.modules.keys()) - set(modules_before)
+
+        if mutated_filename is None:
+            module_names = {x for x in new_modules if self.should_unload(x, modules_to_force_unload)}
+        else:
+            module_names = self.modules_depending_on(mutated_filename, modules_to_force_unload)
+            if only_new:
+                module_names &= new_modules
+            # django keeps global state, like the app registry, in modules that don't import the code under test
+            module_names.update(x for x in new_modules if x.startswith('django'))
+
+        for module_name in sorted(module_names, reverse=True):
+            del sys.modules[module_name]
+
+    def modules_depending_on(self, filename, modules_to_force_unload) -> Set[str]:
+        """
+        :return: names of the loaded modules of the given file and of the loaded modules that import it
+        """
+        module_name_by_filename = {}
+        for module_name, module in list(sys.modules.items()):
+            module_file = getattr(module, '__file__', None)
+            if module_file and module_file.endswith('.py') and self.should_unload(module_name, modules_to_force_unload):
+                module_name_by_filename[os.path.abspath(module_file)] = module_name
+
+        graph = ImportGraph({x: self.imported_modules(x) for x in module_name_by_filename})
+        return {
+            module_name_by_filename[x]
+            for x in graph.importers([os.path.abspath(filename)])
+            if x in module_name_by_filename
+        }
+
+    def imported_modules(self, filename) -> List[str]:
+        try:
+            mtime = os.stat(filename).st_mtime_ns
+        except OSError:
+            return []
+        if self._imports_by_filename.get(filename, (None,))[0] != mtime:
+            with open(filename) as f:
+                self._imports_by_filename[filename] = (mtime, imported_modules(f.read(), filename))
+        return self._imports_by_filename[filename][1]
+
+    @staticmethod
+    def use_private_bytecode_cache() -> Optional[str]:
+        """Copy the bytecode cache the worker was started with to a directory of its own and use that
+
+        :return: the directory, or :obj:`None` if there is no bytecode cache
+        """
+        template = os.environ.get(PYCACHE_PREFIX_VARIABLE)
+        if not template or sys.version_info < (3, 8):
+            return None
+        directory = os.path.join(os.path.dirname(template), f'worker-{os.getpid()}')
+        if os.path.isdir(template):
+            shutil.copytree(template, directory)
+        else:
+            os.makedirs(directory)
+        # for the tests run in this process and the test processes it starts
+        sys.pycache_prefix = directory
+        os.environ[PYCACHE_PREFIX_VARIABLE] = directory
+        return directory
+
+    @staticmethod
+    def isolate_worker(worker_id: int) -> str:
+        """Give the tests run by this worker resources no other worker uses at the same time
+
+        Sets ``MUTMUT_WORKER_ID``, a temporary directory of its own as ``TMPDIR`` and the ports it
+        may use as ``MUTMUT_PORT_RANGE``, like ``20100-20199``.
+
+        :param worker_id: below :data:`MAX_WORKERS`, so the ports stay out of the ephemeral range
+        :return: the temporary directory, to be removed when the worker ends
+        """
+        assert 0 <= worker_id < MAX_WORKERS
+        directory = tempfile.mkdtemp(prefix=f'mutmut-worker-{worker_id}-')
+        first_port = FIRST_WORKER_PORT + worker_id * PORTS_PER_WORKER
+        os.environ[WORKER_ID_VARIABLE] = str(worker_id)
+        os.environ['TMPDIR'] = directory
+        os.environ[PORT_RANGE_VARIABLE] = f'{first_port}-{first_port + PORTS_PER_WORKER - 1}'
+        # for the tests run in this process
+        tempfile.tempdir = directory
+        return directory
+
+    @staticmethod
+    def resident_set_size() -> Optional[int]:
+        """
+        :return: the resident set size of this process in bytes, the peak where the current size is
+            unknown, or :obj:`None` if it can't be measured at all
+        """
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            pass
+        if resource is None:  # Windows
+            return None
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macOS, kilobytes elsewhere
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
 
-        for module_name in sorted(set(sys.modules.keys()) - set(modules_before), reverse=True):
-            if self.should_unload(module_name, modules_to_force_unload):
-                del sys.modules[module_name]
+    @staticmethod
+    def peak_memory_of_child_processes() -> Optional[int]:
+        """
+        :return: the largest resident set size of any finished child process of this process in
+            bytes, or :obj:`None` if there is none or it can't be measured
+        """
+        if resource is None:  # Windows
+            return None
+        max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        if not max_rss:
+            return None
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+    @staticmethod
+    def cpu_time() -> Optional[float]:
+        """
+        :return: the CPU time used by this process and the child processes it waited for, in seconds,
+            or :obj:`None` if it can't be measured
+        """
+        if resource is None:  # Windows
+            return None
+        return sum(
+            usage.ru_utime + usage.ru_stime
+            for usage in (resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN))
+        )
+
+    @staticmethod
+    def cpu_timeout(config: Config) -> Optional[float]:
+        """
+        :return: the CPU time after which the tests of a mutant time out, or :obj:`None` if only the
+            wall time counts
+        """
+        if not config.use_cpu_time or config.baseline_cpu_time is None:
+            return None
+        return config.baseline_cpu_time * 10
+
+    @staticmethod
+    def cpu_time_of_process_group(process_group) -> Optional[float]:
+        """
+        :return: the CPU time used by the running processes of the group and the processes they waited
+            for, in seconds, or :obj:`None` where there is no /proc
+        """
+        try:
+            pids = [x for x in os.listdir('/proc') if x.isdigit()]
+        except OSError:
+            return None
+        ticks = 0
+        for pid in pids:
+            try:
+                with open(f'/proc/{pid}/stat') as f:
+                    # the fields after the command name, which is in parentheses, from the state on
+                    fields = f.read().rpartition(')')[2].split()
+            except OSError:
+                continue  # ended in the meantime
+            if int(fields[2]) == process_group:
+                # utime, stime, cutime and cstime
+                ticks += sum(int(x) for x in fields[11:15])
+        return ticks / os.sysconf('SC_CLK_TCK')
+
+    @staticmethod
+    def should_recycle_worker(config: Config, count, cycle_process_after, start_time) -> bool:
+        """A worker is replaced by a fresh one once it tested enough mutants, runs long enough or uses too much memory
+
+        :param count: the number of mutants the worker tested
+        :param cycle_process_after: the number of mutants after which it is replaced, 0 for never
+        :param start_time: :func:`time.time` when the worker started
+        """
+        if cycle_process_after and count >= cycle_process_after:
+            return True
+        if config.max_worker_age is not None and time() - start_time >= config.max_worker_age:
+            return True
+        if config.max_worker_memory is not None:
+            resident_set_size = TesterHelper.resident_set_size()
+            return resident_set_size is not None and resident_set_size >= config.max_worker_memory * 1024 * 1024
+        return False
 
     @staticmethod
     def should_unload(module_name, modules_to_force_unload):
@@ -129,25 +337,79 @@ class TesterHelper:
         return process, stdout
 
     @staticmethod
-    def start_other_os_process(cmd):
+    def start_other_os_process(cmd, max_memory: Optional[float] = None, max_cpu_time: Optional[float] = None):
+        """
+        The process is started in a session of its own, so :meth:`kill` can kill it together with
+        every process it started.
+
+        :param max_memory: limit of the address space of each process in megabytes
+        :param max_cpu_time: limit of the CPU time of each process in seconds
+        """
         master, slave = os.openpty()
         process = subprocess.Popen(
             shlex.split(cmd, posix=True),
             stdout=slave,
-            stderr=slave
+            stderr=slave,
+            start_new_session=True,
+            preexec_fn=TesterHelper.resource_limiter(max_memory, max_cpu_time),
         )
         stdout = os.fdopen(master)
         os.close(slave)
         return process, stdout
 
+    @staticmethod
+    def resource_limiter(max_memory: Optional[float], max_cpu_time: Optional[float]):
+        """
+        :return: a function that sets the given limits of the process it runs in, to run in the child
+            process before the command, or :obj:`None` if there are no limits
+        """
+        if max_memory is None and max_cpu_time is None:
+            return None
+
+        # resource is imported at module level, importing it in the forked child could deadlock on an
+        # import lock held by another thread
+        def limit_resources():
+            def set_limit(limit, soft, hard):
+                _, current_hard = resource.getrlimit(limit)
+                if current_hard != resource.RLIM_INFINITY:
+                    soft, hard = min(soft, current_hard), min(hard, current_hard)
+                resource.setrlimit(limit, (soft, hard))
+
+            if max_memory is not None:
+                size = int(max_memory * 1024 * 1024)
+                set_limit(resource.RLIMIT_AS, size, size)
+            if max_cpu_time is not None:
+                # SIGXCPU at the soft limit, which ends a Python process, SIGKILL a second later if
+                # the process handles SIGXCPU and keeps running
+                seconds = math.ceil(max_cpu_time)
+                set_limit(resource.RLIMIT_CPU, seconds, seconds + 1)
+
+        return limit_resources
+
     @staticmethod
     def kill(process_):
-        """Kill the specified process on Timer completion"""
+        """Kill the specified process, and every process it started, on Timer completion"""
         try:
-            process_.kill()
+            if os.name == 'nt':  # pragma: no cover
+                process_.kill()
+            elif process_.returncode is None:
+                # like pytest-xdist workers or servers started by the tests, which otherwise keep running
+                os.killpg(process_.pid, signal.SIGKILL)
         except OSError:
             pass
 
+    @staticmethod
+    def kill_after_cpu_time(process_, cpu_timeout, grace_period):
+        """Kill the specified process, like :meth:`kill`, once its process group used ``cpu_timeout``
+        seconds of CPU time, or at the latest after ``grace_period`` seconds"""
+        deadline = time() + grace_period
+        while process_.returncode is None and time() < deadline:
+            cpu_time = TesterHelper.cpu_time_of_process_group(process_.pid)
+            if cpu_time is None or cpu_time >= cpu_timeout:
+                break
+            sleep(max(0.01, min(cpu_timeout - cpu_time, deadline - time(), CPU_TIME_POLL_INTERVAL)))
+        TesterHelper.kill(process_)
+
     def stream_output(self, stdout, callback):
         try:
             if os.name == 'nt':  # pragma: no cover
@@ -0,0 +1,130 @@
+import os
+import shlex
+from typing import Optional
+
+from mutmut.tester.tester_helper import TesterHelper
+
+# the share of the available memory the workers may use together
+MEMORY_SHARE = 0.8
+# one worker less once less memory than this share is left
+LOW_MEMORY_SHARE = 0.1
+# a test run at a time, and a worker preparing the next mutant meanwhile
+OVERLAPPING_WORKERS = 2
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS and Windows
+        return os.cpu_count() or 1
+
+
+def memory_info() -> Optional[dict]:
+    """
+    :return: the fields of /proc/meminfo in bytes, or :obj:`None` where there is no /proc/meminfo
+    """
+    try:
+        with open('/proc/meminfo') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    result = {}
+    for line in lines:
+        name, _, value = line.partition(':')
+        parts = value.split()
+        if parts and parts[0].isdigit():
+            result[name] = int(parts[0]) * (1024 if parts[1:] == ['kB'] else 1)
+    return result
+
+
+def available_memory() -> Optional[int]:
+    return (memory_info() or {}).get('MemAvailable')
+
+
+def memory_is_low() -> bool:
+    info = memory_info() or {}
+    if 'MemAvailable' not in info or not info.get('MemTotal'):
+        return False
+    return info['MemAvailable'] < info['MemTotal'] * LOW_MEMORY_SHARE
+
+
+def processes_per_test_run(test_command: str, cores: int) -> int:
+    """The number of processes pytest-xdist runs the tests in, as given by ``-n`` or ``--numprocesses``
+
+    :return: 1 if the test command doesn't run the tests in parallel
+    """
+    try:
+        args = shlex.split(test_command)
+    except ValueError:
+        return 1
+    value = None
+    for i, arg in enumerate(args):
+        if arg in ('-n', '--numprocesses'):
+            value = args[i + 1] if i + 1 < len(args) else None
+        elif arg.startswith('--numprocesses='):
+            value = arg[len('--numprocesses='):]
+        elif arg.startswith('-n') and not arg.startswith('--'):
+            value = arg[len('-n'):]
+    if value in ('auto', 'logical'):
+        return cores
+    if value is not None and value.isdigit():
+        return max(1, int(value))
+    return 1
+
+
+def automatic_worker_count(test_command: str, baseline_peak_memory: Optional[int]) -> int:
+    """Choose the number of workers for ``--test-processes auto``
+
+    The mutants are written into the source tree, so the test runs of the workers take turns under
+    the test lock, and all that overlaps with a test run is another worker preparing its next mutant.
+    That takes two workers, or one if the test command runs the tests in parallel on every core the
+    process may use, or if the available memory only fits one test run, with each of its processes
+    taking as much as the largest process of the baseline run, on top of the workers themselves.
+
+    :param baseline_peak_memory: the resident set size of the largest process of the baseline run in
+        bytes, or :obj:`None` if it's unknown
+    """
+    cores = available_cores()
+    per_test_run = processes_per_test_run(test_command, cores)
+    if per_test_run >= cores:
+        return 1
+
+    memory = available_memory()
+    if memory is not None and baseline_peak_memory:
+        needed = baseline_peak_memory * per_test_run + OVERLAPPING_WORKERS * (TesterHelper.resident_set_size() or 0)
+        if needed > memory * MEMORY_SHARE:
+            return 1
+    return OVERLAPPING_WORKERS
+
+
+class WorkerCount:
+    """The number of workers to keep running, lowered by one whenever memory runs low
+
+    The workers are asked to stop through a counter they share, the first worker to finish its
+    mutant stops, see :meth:`should_retire`.
+    """
+
+    def __init__(self, mp_ctx, count: int):
+        self.target = count
+        # the number of workers that should stop
+        self.retirements = mp_ctx.Value('i', 0)
+
+    def register(self):
+        """Called for each tested mutant"""
+        if self.target <= 1:
+            return
+        if memory_is_low():
+            self.target -= 1
+            with self.retirements.get_lock():
+                self.retirements.value += 1
+
+    @staticmethod
+    def should_retire(retirements) -> bool:
+        """Called by a worker between mutants, it claims one of the requested retirements if there is any"""
+        if retirements is None:
+            return False
+        with retirements.get_lock():
+            if retirements.value <= 0:
+                return False
+            retirements.value -= 1
+            return True
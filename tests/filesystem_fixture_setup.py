@@ -81,6 +81,46 @@ def test_nothing(): assert True
     mutmut.cache.db.schema = None
 
 
+@pytest.fixture
+def equivalent_mutant_filesystem(tmpdir):
+    foo_py = """
+def foo():
+    if False:
+        return 1
+    return 2
+"""
+
+    test_py = """
+from foo import *
+
+def test_foo():
+    assert foo() == 2
+"""
+
+    create_filesystem(tmpdir, foo_py, test_py)
+
+    yield tmpdir
+
+    # This is a hack to get pony to forget about the old db file
+    # otherwise Pony thinks we've already created the tables
+    import mutmut.cache
+    mutmut.cache.db.provider = None
+    mutmut.cache.db.schema = None
+
+
+@pytest.fixture
+def duplicate_mutants_filesystem(tmpdir):
+    create_filesystem(tmpdir, "x = ~~1\n", "from foo import *\ndef test_foo():\n    assert x == 1")
+
+    yield tmpdir
+
+    # This is a hack to get pony to forget about the old db file
+    # otherwise Pony thinks we've already created the tables
+    import mutmut.cache
+    mutmut.cache.db.provider = None
+    mutmut.cache.db.schema = None
+
+
 def create_filesystem(tmpdir, file_to_mutate, test_file):
     test_dir = str(tmpdir)
     os.chdir(test_dir)
@@ -99,3 +139,19 @@ runner=python -m hammett -x
 
     with open(join(test_dir, "tests", "test_foo.py"), 'w') as f:
         f.write(test_file)
+
+
+@pytest.fixture
+def group_mutants_filesystem(tmpdir):
+    foo_py = "def inc(x):\n    return x + 1\n\n\ndef dec(x):\n    return x - 1\n"
+    test_py = ("from foo import *\n\n\ndef test_inc():\n    assert inc(1) == 2\n\n\n"
+               "def test_dec():\n    assert dec(1) == 0\n")
+    create_filesystem(tmpdir, foo_py, test_py)
+
+    yield tmpdir
+
+    # This is a hack to get pony to forget about the old db file
+    # otherwise Pony thinks we've already created the tables
+    import mutmut.cache
+    mutmut.cache.db.provider = None
+    mutmut.cache.db.schema = None
@@ -0,0 +1,35 @@
+import importlib.util
+import os
+import sys
+
+from mutmut.cli.helper.bytecode_cache import BytecodeCache, PYCACHE_PREFIX_VARIABLE
+from mutmut.tester import tester_helper
+
+
+def test_bytecode_cache(tmpdir, monkeypatch):
+    source = tmpdir.join('foo.py')
+    source.write('x = 1\n')
+    template = tmpdir.join('cache', 'template')
+    monkeypatch.setenv(PYCACHE_PREFIX_VARIABLE, str(template))
+    monkeypatch.setattr(sys, 'pycache_prefix', sys.pycache_prefix)
+
+    bytecode_cache = BytecodeCache([str(source)])
+    bytecode_cache.directory = str(tmpdir.join('cache'))
+    bytecode_cache.warm()
+
+    pyc = os.path.join(str(template), str(tmpdir).lstrip(os.sep),
+                       os.path.basename(importlib.util.cache_from_source(str(source))))
+    with open(pyc, 'rb') as f:
+        header = f.read(8)
+    # the flags of a pyc checked against the hash of its source
+    assert int.from_bytes(header[4:8], 'little') == 0b11
+
+    directory = tester_helper.TesterHelper.use_private_bytecode_cache()
+    assert directory == str(tmpdir.join('cache', f'worker-{os.getpid()}'))
+    assert os.environ[PYCACHE_PREFIX_VARIABLE] == directory
+    assert sys.pycache_prefix == directory
+    assert os.path.isfile(pyc.replace(str(template), directory))
+
+    bytecode_cache.cleanup()
+    assert PYCACHE_PREFIX_VARIABLE not in os.environ
+    assert not tmpdir.join('cache').exists()
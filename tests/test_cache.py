@@ -1,4 +1,7 @@
-from mutmut.cache import sequence_ops
+from mutmut.cache import sequence_ops, register_mutants, update_line_numbers, update_mutant_status, get_survival_counts
+from mutmut.constants import BAD_SURVIVED, OK_KILLED, UNTESTED
+from mutmut.helpers.relativemutationid import RelativeMutationID
+from tests.filesystem_fixture_setup import filesystem  # noqa: F401
 
 
 def test_sequence_ops():
@@ -38,3 +41,21 @@ def test_sequence_ops():
         ('equal', 'f', 5, 'f', 6),
         ('delete', 'g', 6, None, None),
     ]
+
+
+def test_get_survival_counts(filesystem):  # noqa: F811
+    with open('bar.py', 'w') as f:
+        f.write('y = 1\n')
+    foo = [RelativeMutationID('def foo(a, b):', 0, 0, 'foo.py', 'operator'),
+           RelativeMutationID('    return a < b', 0, 1, 'foo.py', 'operator'),
+           RelativeMutationID('    return a < b', 1, 1, 'foo.py', 'number')]
+    bar = [RelativeMutationID('y = 1', 0, 0, 'bar.py', 'number')]
+    update_line_numbers('foo.py')
+    update_line_numbers('bar.py')
+    register_mutants({'foo.py': foo, 'bar.py': bar})
+    for mutation_id, status in zip(foo + bar, [BAD_SURVIVED, OK_KILLED, BAD_SURVIVED, UNTESTED]):
+        update_mutant_status('foo.py' if mutation_id in foo else 'bar.py', mutation_id, status, 'hash')
+
+    counts_by_type, counts_by_filename = get_survival_counts()
+    assert counts_by_type == {'operator': [1, 2], 'number': [1, 1]}
+    assert counts_by_filename == {'foo.py': [2, 3]}
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import multiprocessing
 import os
 import subprocess
 import sys
@@ -13,6 +14,9 @@ from tests.filesystem_fixture_setup import (
     filesystem,
     surviving_mutants_filesystem,
     single_mutant_filesystem,
+    equivalent_mutant_filesystem,
+    duplicate_mutants_filesystem,
+    group_mutants_filesystem,
     file_to_mutate_contents,
     test_file_contents,
     EXPECTED_MUTANTS)
@@ -62,7 +66,76 @@ def test_specify_processes(filesystem, monkeypatch):
     CliRunner().invoke(climain, ['run', '-s', '--paths-to-mutate=foo.py', "--test-time-base=15.0",
                                  "--test-processes=4"], catch_exceptions=False)
 
-    tester_run_mock.assert_called_with(test_processes=4, config=ANY, progress=ANY, mutations_by_file=ANY)
+    tester_run_mock.assert_called_with(test_processes=4, config=ANY, progress=ANY, mutations_by_file=ANY,
+                                       duplicates_by_file=ANY, streamed_mutations=ANY)
+
+
+def test_automatic_test_processes(filesystem, monkeypatch):
+    tester_run_mock = MagicMock()
+    monkeypatch.setattr(Tester, 'run_mutation_tests', tester_run_mock)
+    monkeypatch.setattr('mutmut.cli.helper.run.automatic_worker_count', lambda *_: 3)
+
+    result = CliRunner().invoke(climain, ['run', '-s', '--paths-to-mutate=foo.py', "--test-time-base=15.0",
+                                          "--test-processes=auto"], catch_exceptions=False)
+
+    assert 'Using 3 test processes' in result.output
+    tester_run_mock.assert_called_with(test_processes=3, config=ANY, progress=ANY, mutations_by_file=ANY,
+                                       duplicates_by_file=ANY, streamed_mutations=ANY)
+    assert tester_run_mock.call_args.kwargs['config'].automatic_test_processes
+
+
+def test_baseline_gets_a_fixed_hash_seed(filesystem, monkeypatch):
+    monkeypatch.delenv('PYTHONHASHSEED', raising=False)
+    monkeypatch.setattr(Tester, 'run_mutation_tests', MagicMock())
+    with open(os.path.join('tests', 'test_seed.py'), 'w') as f:
+        f.write('import os\n\n\ndef test_seed():\n    with open("seed.txt", "w") as f:\n'
+                '        f.write(os.environ.get("PYTHONHASHSEED", "unset"))\n')
+
+    CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--runner=python -m pytest -x"],
+                       catch_exceptions=False)
+
+    with open('seed.txt') as f:
+        assert f.read() == '0'
+
+
+@pytest.mark.parametrize('test_processes', ['0', 'many'])
+def test_bad_test_processes(filesystem, test_processes):
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', f'--test-processes={test_processes}'])
+    assert result.exit_code == 2
+    assert 'The number of test processes must be a positive number or auto.' in result.output
+
+
+def test_too_many_test_processes(filesystem):
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', '--test-processes=128'])
+    assert result.exit_code == 2
+    assert 'At most 127 test processes are supported' in result.output
+
+
+@pytest.mark.parametrize('option, message', [
+    ('--max-test-memory=-1', 'The memory limit must be a positive number of megabytes.'),
+    ('--max-test-cpu-time=-1', 'The CPU time limit must be a positive number of seconds.'),
+])
+def test_bad_test_limits(filesystem, option, message):
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', option])
+    assert result.exit_code == 2
+    assert message in result.output
+
+
+def test_baseline_runs(filesystem, monkeypatch):
+    monkeypatch.setattr(Tester, 'run_mutation_tests', MagicMock())
+
+    def run(*args):
+        result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', *args], catch_exceptions=False)
+        assert result.exit_code == 0
+        return result.output
+
+    assert 'Baseline of 3 runs' in run('--baseline-runs=3')
+    assert 'Using cached time for baseline tests' in run('--baseline-runs=3')
+    assert 'Using cached time for baseline tests' in run()
+    # measured again for other code under test
+    with open('foo.py', 'a') as f:
+        f.write('\n\ndef bar():\n    return 1\n')
+    assert 'Baseline of 3 runs' in run('--baseline-runs=3')
 
 
 def test_multiprocess_no_surviving_mutants(filesystem):
@@ -72,6 +145,17 @@ def test_multiprocess_no_surviving_mutants(filesystem):
     no_surviving_result_check_helper()
 
 
+@pytest.mark.parametrize('start_method', ['fork', 'forkserver'])
+def test_start_method(filesystem, start_method):
+    if start_method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f'{start_method} is not available on this platform')
+    result = CliRunner().invoke(climain, ['run', '-s', '--paths-to-mutate=foo.py', "--test-time-base=15.0",
+                                          "--test-processes=2", f"--start-method={start_method}"],
+                                catch_exceptions=False)
+    assert result.exit_code == 0
+    no_surviving_result_check_helper()
+
+
 def no_surviving_result_check_helper():
     result = CliRunner().invoke(climain, ['results'], catch_exceptions=False)
     assert result.exit_code == 0
@@ -311,6 +395,36 @@ def test_simple_output(filesystem):
     assert '14/14  KILLED 14  TIMEOUT 0  SUSPICIOUS 0  SURVIVED 0  SKIPPED 0' in repr(result.output)
 
 
+def test_detect_equivalent(equivalent_mutant_filesystem):
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output", "--detect-equivalent"],
+                                catch_exceptions=False)
+    print(repr(result.output))
+    assert result.exit_code == 0
+    assert '3/3  KILLED 2  TIMEOUT 0  SUSPICIOUS 0  SURVIVED 0  SKIPPED 0  EQUIVALENT 1' in repr(result.output)
+    assert CliRunner().invoke(climain, ['result-ids', 'equivalent'], catch_exceptions=False).output.strip() == '2'
+
+
+def test_deduplicate_mutants(duplicate_mutants_filesystem):
+    # count the runs of the tests, for the baseline and for each mutant
+    with open(os.path.join('tests', 'test_foo.py'), 'w') as f:
+        f.write("from foo import *\n"
+                "def test_foo():\n"
+                "    with open('test_runs.txt', 'a') as f:\n"
+                "        f.write('run\\n')\n"
+                "    assert x == 1\n")
+
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output",
+                                          "--deduplicate-mutants"], catch_exceptions=False)
+    print(repr(result.output))
+    assert result.exit_code == 0
+    assert '4/4  KILLED 4  TIMEOUT 0  SUSPICIOUS 0  SURVIVED 0  SKIPPED 0' in repr(result.output)
+    # two of the mutants compile to the same code, only one of them is tested
+    with open('test_runs.txt') as f:
+        assert f.read().count('run') == 1 + 3
+    killed_list = " ".join(str(num) for num in range(1, 5))
+    assert CliRunner().invoke(climain, ['result-ids', "killed"], catch_exceptions=False).output.strip() == killed_list
+
+
 def test_output_result_ids(filesystem):
     # Generate the results
     CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output"], catch_exceptions=False)
@@ -493,3 +607,118 @@ def test_html_custom_output(surviving_mutants_filesystem):
             '<table><thead><tr><th>File</th><th>Total</th><th>Skipped</th><th>Killed</th><th>% killed</th><th>Survived</th></thead>'
             '<tr><td><a href="foo.py.html">foo.py</a></td><td>2</td><td>0</td><td>0</td><td>0.00</td><td>2</td>'
             '</table></body></html>')
+
+
+def test_sample(filesystem):
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output", "--sample=5"],
+                                catch_exceptions=False)
+    print(repr(result.output))
+    assert result.exit_code == 0
+    assert '5/5  KILLED 5  TIMEOUT 0  SUSPICIOUS 0  SURVIVED 0  SKIPPED 0' in repr(result.output)
+    assert 'Estimated mutation score: 100.0% ± 0.0%' in result.output
+    assert '5 of 14 mutants sampled' in result.output
+    assert len(CliRunner().invoke(climain, ['result-ids', "killed"], catch_exceptions=False).output.split()) == 5
+
+
+def test_sample_and_sample_fraction(filesystem):
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', '--sample=5', '--sample-fraction=0.5'])
+    assert result.exit_code == 2
+    assert "You can't combine --sample and --sample-fraction" in result.output
+
+
+def test_time_budget(filesystem):
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output",
+                                          "--time-budget=0.001"], catch_exceptions=False)
+    print(repr(result.output))
+    assert result.exit_code == 0
+    assert 'The time budget of 0.001 seconds is spent, 14 mutants were not tested.' in result.output
+
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output",
+                                          "--time-budget=600"], catch_exceptions=False)
+    print(repr(result.output))
+    assert result.exit_code == 0
+    assert '14/14  KILLED 14  TIMEOUT 0  SUSPICIOUS 0  SURVIVED 0  SKIPPED 0' in repr(result.output)
+    assert 'time budget' not in result.output
+
+
+def test_group_mutants(group_mutants_filesystem):
+    subprocess.run([sys.executable, "-m", "pytest", "--cov=.", "--cov-context=test", "tests"])
+    assert os.path.isfile('.coverage')
+
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output", "--use-coverage",
+                                          "--runner=python -m pytest -x", "--group-mutants=2"],
+                                catch_exceptions=False)
+    print(repr(result.output))
+    assert result.exit_code == 0
+    assert '4/4  KILLED 4  TIMEOUT 0  SUSPICIOUS 0  SURVIVED 0  SKIPPED 0' in repr(result.output)
+    assert not os.path.exists('foo.py.bak')
+
+
+def test_group_mutants_without_coverage(group_mutants_filesystem):
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--group-mutants=2"])
+    assert result.exit_code == 2
+    assert "--group-mutants needs the coverage contexts of --use-coverage" in result.output
+
+
+def test_select_tests(group_mutants_filesystem):
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output", "--collect-coverage",
+                                          "--runner=python -m pytest -x", "--select-tests",
+                                          "--first-stage-budget=0.001"], catch_exceptions=False)
+    print(repr(result.output))
+    assert result.exit_code == 0
+    assert '4/4  KILLED 4  TIMEOUT 0  SUSPICIOUS 0  SURVIVED 0  SKIPPED 0' in repr(result.output)
+
+    from mutmut.cache import get_test_kill_counts
+    assert get_test_kill_counts() == {'tests/test_foo.py::test_inc': [2, 2], 'tests/test_foo.py::test_dec': [2, 2]}
+
+
+def test_first_stage_budget_without_select_tests(group_mutants_filesystem):
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--first-stage-budget=1"])
+    assert result.exit_code == 2
+    assert "--first-stage-budget only works with --select-tests" in result.output
+
+
+def test_use_import_graph(group_mutants_filesystem):
+    with open(os.path.join('tests', 'test_unrelated.py'), 'w') as f:
+        f.write('def test_unrelated():\n    with open("unrelated.txt", "a") as f:\n        f.write("ran\\n")\n')
+
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output",
+                                          "--runner=python -m pytest -x", "--use-import-graph"],
+                                catch_exceptions=False)
+    print(repr(result.output))
+    assert '4/4  KILLED 4  TIMEOUT 0  SUSPICIOUS 0  SURVIVED 0  SKIPPED 0' in repr(result.output)
+    # the test that doesn't import foo only ran in the baseline run
+    with open('unrelated.txt') as f:
+        assert f.read() == 'ran\n'
+
+
+def test_collect_coverage(group_mutants_filesystem):
+    with open('foo.py', 'a') as f:
+        f.write('\n\ndef not_covered(x):\n    return x + 2\n')
+
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output", "--collect-coverage",
+                                          "--runner=python -m pytest -x"], catch_exceptions=False)
+    print(repr(result.output))
+    assert result.exit_code == 0
+    assert 'measuring the coverage and duration of each test' in result.output
+    # the mutants of the function that no test calls are left out
+    assert '4/4  KILLED 4  TIMEOUT 0  SUSPICIOUS 0  SURVIVED 0  SKIPPED 0' in repr(result.output)
+
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output", "--collect-coverage",
+                                          "--runner=python -m pytest -x", "--group-mutants=2"],
+                                catch_exceptions=False)
+    assert result.exit_code == 0
+    assert 'Using cached time for baseline tests' in result.output
+
+
+def test_collect_coverage_without_mutmut_importable(group_mutants_filesystem, monkeypatch):
+    monkeypatch.delenv('PYTHONPATH', raising=False)
+    if subprocess.run([sys.executable, '-c', 'import mutmut'], stderr=subprocess.DEVNULL).returncode == 0:
+        pytest.skip('mutmut is installed into this environment')
+
+    result = CliRunner().invoke(climain, ['run', '--paths-to-mutate=foo.py', "--simple-output", "--collect-coverage",
+                                          "--runner=python -m pytest -x"], catch_exceptions=False)
+    print(repr(result.output))
+    assert result.exit_code == 0
+    assert '4/4  KILLED 4  TIMEOUT 0  SUSPICIOUS 0  SURVIVED 0  SKIPPED 0' in repr(result.output)
+    assert 'PYTHONPATH' not in os.environ
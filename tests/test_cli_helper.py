@@ -6,6 +6,7 @@ import pytest
 
 from tests.filesystem_fixture_setup import filesystem
 from mutmut.helpers.progress import Progress
+from mutmut.cli.helper.test_suite_timer import percentile
 from mutmut.cli.helper.utils import python_source_files, read_coverage_data
 
 
@@ -102,3 +103,10 @@ def test_python_source_files__with_paths_to_exclude(tmpdir):
         os.path.join(project_dir, 'services', 'main.py'),
         os.path.join(project_dir, 'services', 'utils.py'),
     }
+
+
+def test_percentile():
+    assert percentile([3.0], 90) == 3.0
+    assert percentile([4.0, 1.0, 3.0, 2.0, 5.0], 50) == 3.0
+    assert percentile([4.0, 1.0, 3.0, 2.0, 5.0], 90) == pytest.approx(4.6)
+    assert percentile([1.0, 2.0], 100) == 2.0
@@ -0,0 +1,26 @@
+import os
+
+from mutmut.cli.helper.coverage_collector import CoverageCollector
+
+
+def test_include_patterns(tmpdir):
+    tmpdir.mkdir('package')
+    tmpdir.join('foo.py').write('')
+    with tmpdir.as_cwd():
+        collector = CoverageCollector(['package', 'foo.py'], ['tests/'])
+        assert collector.include_patterns() == [os.path.join(str(tmpdir), 'package', '*'), str(tmpdir.join('foo.py'))]
+
+
+def test_key_changes_with_sources_and_tests(tmpdir):
+    tmpdir.join('foo.py').write('x = 1\n')
+    with tmpdir.as_cwd():
+        collector = CoverageCollector(['foo.py'], ['tests/'])
+        key = collector.key('hash of tests')
+        assert collector.key('hash of tests') == key
+        assert collector.key('other hash of tests') != key
+        tmpdir.join('foo.py').write('x = 2\n')
+        assert collector.key('hash of tests') != key
+
+
+def test_test_command():
+    assert CoverageCollector.test_command('python -m pytest -x') == 'python -m pytest -x -p mutmut.tester.pytest_plugin'
@@ -0,0 +1,80 @@
+import pickle
+
+import pytest
+from coverage import CoverageData
+
+from mutmut.helpers.coverage_index import CoverageIndex, iter_bits
+
+
+def test_iter_bits():
+    assert list(iter_bits(0)) == []
+    assert list(iter_bits(0b101001)) == [0, 3, 5]
+    assert list(iter_bits(1 << 1000)) == [1000]
+
+
+@pytest.fixture
+def coverage_file(tmpdir):
+    data = CoverageData(basename=str(tmpdir.join('.coverage')))
+    data.set_context('')
+    data.add_lines({'/src/foo.py': [1, 4], '/src/bar.py': [1]})
+    data.set_context('tests/test_foo.py::test_a|run')
+    data.add_lines({'/src/foo.py': [2, 3, 200]})
+    data.set_context('tests/test_foo.py::test_b|run')
+    data.add_lines({'/src/foo.py': [3]})
+    data.write()
+    return str(tmpdir.join('.coverage'))
+
+
+def test_coverage_index(coverage_file):
+    index = CoverageIndex(coverage_file)
+    assert sorted(index) == ['/src/bar.py', '/src/foo.py']
+    assert '/src/foo.py' in index
+    assert '/src/baz.py' not in index
+    assert index.get('/src/baz.py') is None
+
+    foo = index['/src/foo.py']
+    assert sorted(foo) == [1, 2, 3, 4, 200]
+    assert len(foo) == 5
+    assert 3 in foo
+    assert 5 not in foo
+    assert foo.get(5) is None
+    assert sorted(foo[3]) == ['tests/test_foo.py::test_a|run', 'tests/test_foo.py::test_b|run']
+    assert foo[1] == ['']
+
+
+def test_coverage_index_is_like_contexts_by_lineno(coverage_file):
+    data = CoverageData(basename=coverage_file)
+    data.read()
+    index = CoverageIndex(coverage_file)
+    for filename in data.measured_files():
+        expected = {line: sorted(contexts) for line, contexts in data.contexts_by_lineno(filename).items()}
+        assert {line: sorted(contexts) for line, contexts in index[filename].items()} == expected
+
+
+def test_coverage_index_with_arcs(tmpdir):
+    data = CoverageData(basename=str(tmpdir.join('.coverage')))
+    data.set_context('test_a')
+    data.add_arcs({'/src/foo.py': [(-1, 1), (1, 2), (2, -1)]})
+    data.write()
+    index = CoverageIndex(str(tmpdir.join('.coverage')))
+    assert dict(index['/src/foo.py']) == {1: ['test_a'], 2: ['test_a']}
+
+
+def test_coverage_index_missing_file(tmpdir):
+    assert CoverageIndex(str(tmpdir.join('.coverage'))) == {}
+
+
+def test_coverage_index_can_be_pickled(coverage_file):
+    index = CoverageIndex(coverage_file)
+    assert index['/src/bar.py'][1] == ['']
+    copy = pickle.loads(pickle.dumps(index))
+    assert copy['/src/foo.py'][2] == ['tests/test_foo.py::test_a|run']
+
+
+def test_coverage_index_reconnects_after_fork(coverage_file, monkeypatch):
+    index = CoverageIndex(coverage_file)
+    connection = index.connection()
+    assert index.connection() is connection
+    monkeypatch.setattr('os.getpid', lambda: -1)
+    assert index.connection() is not connection
+    assert index['/src/foo.py'][2] == ['tests/test_foo.py::test_a|run']
@@ -0,0 +1,29 @@
+from mutmut.helpers.coverage_matrix import CoverageMatrix, count_bits
+
+
+def test_coverage_matrix():
+    matrix = CoverageMatrix()
+    matrix.add('foo.py', 1, ['test_a', 'test_b'])
+    matrix.add('foo.py', 2, ['test_b'])
+    matrix.add('foo.py', 2, ['test_c'])
+
+    assert matrix.test_ids == ['test_a', 'test_b', 'test_c']
+    assert matrix.test_ids_in(matrix.tests_covering('foo.py', 1)) == ['test_a', 'test_b']
+    assert matrix.test_ids_in(matrix.tests_covering('foo.py', 2)) == ['test_b', 'test_c']
+    assert matrix.tests_covering('foo.py', 3) == 0
+    assert matrix.tests_covering('bar.py', 1) == 0
+    assert matrix.tests_covering('foo.py', 1) & matrix.tests_covering('foo.py', 2) == matrix.bits(['test_b'])
+    assert count_bits(matrix.tests_covering_lines('foo.py', [1, 2, 3])) == 3
+
+
+def test_coverage_matrix_from_coverage_data():
+    coverage_data = {
+        '/foo.py': {1: ['', 'test_a|run'], 2: ['test_b|run', 'test_a|setup']},
+        '/bar.py': {1: ['test_c|run']},
+    }
+    matrix = CoverageMatrix.from_coverage_data(coverage_data, ['/foo.py', '/baz.py'],
+                                               lambda x: x.partition('|')[0] or None)
+    assert matrix.test_ids == ['test_a', 'test_b']
+    assert matrix.test_ids_in(matrix.tests_covering('/foo.py', 1)) == ['test_a']
+    assert matrix.test_ids_in(matrix.tests_covering('/foo.py', 2)) == ['test_a', 'test_b']
+    assert matrix.tests_covering('/bar.py', 1) == 0
@@ -0,0 +1,33 @@
+import pytest
+
+from mutmut.mutator.equivalence import is_equivalent_mutant
+
+
+@pytest.mark.parametrize(
+    'source, mutated_source', [
+        ('def foo():\n    if False:\n        return 1\n    return 2\n',
+         'def foo():\n    if False:\n        return 2\n    return 2\n'),
+        ('x = 1\n', 'x = 1  # a comment\n'),
+        ('def foo():\n    return 3\n', '\n\ndef foo():\n    return 3\n'),
+    ]
+)
+def test_equivalent_mutant(source, mutated_source):
+    assert is_equivalent_mutant(source, mutated_source, 'foo.py')
+
+
+@pytest.mark.parametrize(
+    'source, mutated_source', [
+        ('x = 1\n', 'x = 2\n'),
+        ('x = 1\n', 'x = 1.0\n'),
+        ('x = 1\n', 'x = True\n'),
+        ('x = 0.0\n', 'x = -0.0\n'),
+        ('def foo(a, b):\n    return a < b\n', 'def foo(a, b):\n    return a <= b\n'),
+        ('def foo():\n    "doc"\n', 'def foo():\n    "XXdocXX"\n'),
+        ('def foo():\n    def bar():\n        return 1\n', 'def foo():\n    def bar():\n        return 2\n'),
+        ('x = {1, 2}\nx in {1, 2}\n', 'x = {1, 2}\nx in {1, 3}\n'),
+        ('x = 1\n', 'x = (\n'),
+        ('x = dict(a=1)\n', 'x = dict(aXX=1)\n'),
+    ]
+)
+def test_not_equivalent_mutant(source, mutated_source):
+    assert not is_equivalent_mutant(source, mutated_source, 'foo.py')
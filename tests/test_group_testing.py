@@ -0,0 +1,55 @@
+from mutmut.helpers.relativemutationid import RelativeMutationID
+from mutmut.tester.group_testing import node_id_from_context, function_starts_by_line, form_groups, \
+    group_test_command
+
+
+class ConfigStub:
+    tests_dirs = ['tests/']
+    group_mutants = 2
+    _default_test_command = 'python -m pytest -x'
+
+    def __init__(self, coverage_data):
+        self.coverage_data = coverage_data
+
+
+def mutant(filename, line_number):
+    return filename, RelativeMutationID(line=f'line {line_number}', index=0, line_number=line_number)
+
+
+def test_node_id_from_context(tmpdir):
+    tmpdir.mkdir('tests').join('test_foo.py').write('')
+    with tmpdir.as_cwd():
+        assert node_id_from_context('tests/test_foo.py::test_bar|run', []) == 'tests/test_foo.py::test_bar'
+        assert node_id_from_context('tests.test_foo.test_bar', []) == 'tests/test_foo.py::test_bar'
+        assert node_id_from_context('test_foo.TestBar.test_baz', ['tests/']) == 'tests/test_foo.py::TestBar::test_baz'
+        assert node_id_from_context('', ['tests/']) is None
+        assert node_id_from_context('test_unknown.test_bar', ['tests/']) is None
+
+
+def test_function_starts_by_line():
+    source = 'x = 1\n\ndef foo():\n    def bar():\n        return 1\n    return bar\n'
+    assert function_starts_by_line(source) == {2: 2, 3: 3, 4: 3, 5: 2}
+
+
+def test_form_groups(tmpdir):
+    source = 'def foo():\n    return 1\n\n\ndef bar():\n    return 2\n    return 3\n\nx = 4\n'
+    foo, bar, other_bar, module_level, uncovered = (mutant('foo.py', 1), mutant('foo.py', 5), mutant('foo.py', 6),
+                                                    mutant('foo.py', 8), mutant('baz.py', 1))
+    with tmpdir.as_cwd():
+        config = ConfigStub({
+            str(tmpdir.join('foo.py')): {
+                2: ['tests/test_foo.py::test_foo|run'],
+                6: ['tests/test_foo.py::test_bar|run'],
+                7: ['tests/test_foo.py::test_bar|run'],
+                9: [''],
+            },
+        })
+        groups = form_groups(config, [foo, bar, other_bar, module_level, uncovered],
+                             {'foo.py': source, 'baz.py': source})
+    assert groups == [[foo, bar], [other_bar], [module_level], [uncovered]]
+
+
+def test_group_test_command():
+    command = group_test_command(ConfigStub(None), frozenset(['tests/test_foo.py::test_b[1 2]', 'tests/test_foo.py::a']))
+    assert command == ("python -m pytest -x -p mutmut.tester.pytest_plugin --maxfail=0 "
+                       "tests/test_foo.py::a 'tests/test_foo.py::test_b[1 2]'")
@@ -0,0 +1,85 @@
+import sys
+
+from mutmut.tester.hot_patch import HotPatch, enclosing_function_path
+
+SOURCE = '''import functools
+
+
+def decorator(f):
+    @functools.wraps(f)
+    def wrapper(*args):
+        return f(*args)
+    return wrapper
+
+
+def add(a, b=1):
+    return a + b
+
+
+class Calculator:
+    factor = 2
+
+    @decorator
+    def double(self, x):
+        def inner():
+            return x * self.factor
+        return inner()
+
+    @staticmethod
+    def zero():
+        return 0
+
+
+def one(): return 1
+'''
+
+
+def test_enclosing_function_path():
+    assert enclosing_function_path(SOURCE, 12) == ['add']
+    assert enclosing_function_path(SOURCE, 21) == ['Calculator', 'double']
+    assert enclosing_function_path(SOURCE, 26) == ['Calculator', 'zero']
+    # default arguments, class attributes, decorators and module level code
+    assert enclosing_function_path(SOURCE, 11) is None
+    assert enclosing_function_path(SOURCE, 16) is None
+    assert enclosing_function_path(SOURCE, 18) is None
+    assert enclosing_function_path(SOURCE, 1) is None
+    # the body is on the line of the signature
+    assert enclosing_function_path(SOURCE, 29) is None
+
+
+def test_hot_patch(tmpdir, monkeypatch):
+    tmpdir.join('hot_patch_example.py').write(SOURCE)
+    monkeypatch.syspath_prepend(str(tmpdir))
+    filename = str(tmpdir.join('hot_patch_example.py'))
+
+    def hot_patch(line_number, before, after):
+        return HotPatch(filename, SOURCE, SOURCE.replace(before, after), line_number)
+
+    try:
+        # the module isn't imported yet, so it is imported from the source without the mutant
+        patch = hot_patch(12, 'a + b', 'a - b')
+        assert patch.apply()
+        import hot_patch_example
+        assert hot_patch_example.add(3) == 2
+        patch.revert()
+        assert hot_patch_example.add(3) == 4
+
+        patch = hot_patch(21, 'x * self', 'x / self')
+        assert patch.apply()
+        assert hot_patch_example.Calculator().double(3) == 1.5
+        patch.revert()
+        assert hot_patch_example.Calculator().double(3) == 6
+
+        patch = hot_patch(26, 'return 0', 'return 1')
+        assert patch.apply()
+        assert hot_patch_example.Calculator.zero() == 1
+        patch.revert()
+
+        assert not hot_patch(11, 'b=1', 'b=2').apply()
+        assert not hot_patch(16, 'factor = 2', 'factor = 3').apply()
+
+        patch = hot_patch(12, 'a + b', 'a - b')
+        patch.enabled = False
+        assert not patch.apply()
+    finally:
+        sys.modules.pop('hot_patch_example', None)
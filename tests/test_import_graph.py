@@ -0,0 +1,68 @@
+import os
+
+from mutmut.cli.helper.import_graph_selector import ImportGraphSelector
+from mutmut.helpers.import_graph import ImportGraph, imported_modules, module_names
+
+
+def test_module_names():
+    assert module_names(os.path.join('src', 'foo', 'bar.py')) == ['src.foo.bar', 'foo.bar', 'bar']
+    assert module_names(os.path.join('.', 'foo', '__init__.py')) == ['foo']
+
+
+def test_imported_modules():
+    source = (
+        'import os, foo.bar\n'
+        'from baz import qux\n'
+        'from star import *\n'
+        'from . import sibling\n'
+        'from ..parent import thing\n'
+        'def f():\n'
+        '    import late\n'
+    )
+    assert imported_modules(source, os.path.join('pkg', 'sub', 'mod.py')) == [
+        'baz', 'baz.qux', 'foo.bar', 'late', 'os', 'pkg.parent', 'pkg.parent.thing', 'pkg.sub', 'pkg.sub.sibling', 'star',
+    ]
+    assert imported_modules('from . import x\n', os.path.join('pkg', '__init__.py')) == ['pkg', 'pkg.x']
+    assert imported_modules('def (', 'broken.py') == []
+
+
+def test_import_graph():
+    graph = ImportGraph({
+        'foo/__init__.py': [],
+        'foo/bar.py': ['foo.baz'],
+        'foo/baz.py': [],
+        'tests/test_bar.py': ['foo.bar'],
+        'tests/test_other.py': ['os'],
+    })
+    assert graph.importers(['foo/baz.py']) == {'foo/baz.py', 'foo/bar.py', 'tests/test_bar.py'}
+    # importing foo.bar runs foo/__init__.py first
+    assert graph.importers(['foo/__init__.py']) == {'foo/__init__.py', 'foo/bar.py', 'tests/test_bar.py'}
+    assert graph.importers(['tests/test_other.py']) == {'tests/test_other.py'}
+
+
+def test_import_graph_selector(tmpdir, monkeypatch):
+    tmpdir.join('foo.py').write('import bar\n')
+    tmpdir.join('bar.py').write('')
+    tmpdir.join('baz.py').write('')
+    tests = tmpdir.mkdir('tests')
+    tests.join('test_foo.py').write('from foo import *\n')
+    tests.join('test_other.py').write('')
+    tests.mkdir('sub').join('conftest.py').write('import baz\n')
+    tests.join('sub').join('test_sub.py').write('')
+
+    cached = {}
+    monkeypatch.setattr('mutmut.cli.helper.import_graph_selector.cached_import_graph', lambda: dict(cached))
+    monkeypatch.setattr('mutmut.cli.helper.import_graph_selector.set_cached_import_graph', cached.update)
+    with tmpdir.as_cwd():
+        selector = ImportGraphSelector(['foo.py', 'bar.py', 'baz.py'], ['tests'])
+        assert selector.test_files_by_filename() == {
+            'foo.py': [os.path.join('tests', 'test_foo.py')],
+            'bar.py': [os.path.join('tests', 'test_foo.py')],
+            'baz.py': [os.path.join('tests', 'sub', 'test_sub.py')],
+        }
+        assert cached['foo.py'][1] == ['bar']
+
+        # files that didn't change are not parsed again
+        cached['foo.py'][1] = ['baz']
+        assert selector.test_files_by_filename()['baz.py'] == [
+            os.path.join('tests', 'sub', 'test_sub.py'), os.path.join('tests', 'test_foo.py')]
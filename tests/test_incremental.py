@@ -0,0 +1,98 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+import pytest
+
+from mutmut.cli.helper.run_argument_parser import RunArgumentParser
+from mutmut.helpers.context import Context
+from mutmut.mutator.incremental import IncrementalMutator, top_level_chunks
+from mutmut.mutator.mutator import Mutator
+from mutmut.mutator.mutator_helper import MutatorHelper
+
+source = '''\
+import os
+
+# a comment
+x = 1 + 2
+
+
+@property
+def foo(a, b):
+    return a + b  # pragma: no mutate
+
+
+class Bar:
+    def baz(self):
+        return 'baz' * 2
+'''
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cached = {}
+    monkeypatch.setattr('mutmut.mutator.incremental.cached_mutations_by_chunk', lambda filename: cached.get(filename, {}))
+    monkeypatch.setattr('mutmut.mutator.incremental.set_cached_mutations_by_chunk', cached.__setitem__)
+    return cached
+
+
+def test_top_level_chunks():
+    chunks = top_level_chunks(source)
+    assert [start for start, _ in chunks] == [0, 3, 6, 11]
+    assert ''.join(chunk for _, chunk in chunks) == source
+    assert chunks[2][1].startswith('@property\n')
+    assert top_level_chunks('def (') is None
+    assert top_level_chunks('x = 1\ry = 2\n') is None
+
+
+@pytest.mark.parametrize('filename', ['cache.py', os.path.join('helpers', 'sampling.py'), os.path.join('tester', 'hot_patch.py')])
+def test_same_mutations_as_mutator(filename, cache):
+    filename = os.path.join(os.path.dirname(__file__), '..', 'mutmut', filename)
+    with open(filename) as f:
+        file_source = f.read()
+
+    expected = Mutator(Context(source=file_source, filename=filename)).list_mutations_with_source_hashes()
+    mutations = IncrementalMutator(Context(source=file_source, filename=filename)).list_mutations_with_source_hashes()
+    # the mutations of each top level statement come in the same order, the statements in the order of the file
+    starts = [start for start, _ in top_level_chunks(file_source)] + [float('inf')]
+    for start, end in zip(starts, starts[1:]):
+        def in_chunk(x):
+            return [(mutation_id, mutation_id.mutation_type) for mutation_id, _ in x if start <= mutation_id.line_number < end]
+
+        assert in_chunk(mutations) == in_chunk(expected)
+    assert len(mutations) == len(expected)
+    assert RunArgumentParser.find_duplicates(mutations) == RunArgumentParser.find_duplicates(expected)
+
+
+def test_only_changed_statements_are_mutated_again(cache, monkeypatch):
+    assert IncrementalMutator(Context(source=source, filename='foo.py')).list_mutations()
+
+    mutated = []
+    list_mutations = Mutator.list_mutations
+
+    def spy(self):
+        mutated.append(self.context.source)
+        return list_mutations(self)
+
+    monkeypatch.setattr(Mutator, 'list_mutations', spy)
+    changed_source = 'import sys\n\n' + source.replace("'baz' * 2", "'baz' * 3")
+    mutations = IncrementalMutator(Context(source=changed_source, filename='foo.py')).list_mutations()
+    assert mutated == ['import sys\n\n', "class Bar:\n    def baz(self):\n        return 'baz' * 3\n"]
+    assert mutations == Mutator(Context(source=changed_source, filename='foo.py')).list_mutations()
+
+
+def test_coverage_is_applied_to_cached_mutations(cache):
+    @dataclass
+    class Config:
+        covered_lines_by_filename: Optional[Dict[str, Set[int]]]
+        mutation_types_to_apply: Set[str] = field(default_factory=lambda: set(MutatorHelper().mutations_by_type))
+        coverage_data: None = None
+
+    def list_mutations(config):
+        return IncrementalMutator(Context(source=source, filename='foo.py', config=config)).list_mutations()
+
+    all_mutations = list_mutations(Config(covered_lines_by_filename=None))
+    assert {x.line_number for x in all_mutations} == {3, 6, 13}
+    covered = list_mutations(Config(covered_lines_by_filename={'foo.py': {4}}))
+    assert covered == [x for x in all_mutations if x.line_number == 3]
+    assert list_mutations(Config(covered_lines_by_filename={})) == []
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
+
 import pytest
 from pytest import raises
 from parso import parse
@@ -334,6 +336,19 @@ def test_performed_mutation_ids():
     assert mutator.context.performed_mutation_ids == [RelativeMutationID(source, 0, 0), RelativeMutationID(source, 1, 0)]
 
 
+def test_list_mutations_with_source_hashes():
+    source = "x = ~~1\ny = a + b\n"
+    mutations = Mutator(Context(source=source)).list_mutations_with_source_hashes()
+    assert [mutation_id for mutation_id, _ in mutations] == Mutator(Context(source=source)).list_mutations()
+    for mutation_id, source_hash in mutations:
+        mutated_source, _ = Mutator(Context(source=source, mutation_id=mutation_id)).mutate()
+        assert hashlib.sha256(mutated_source.encode('utf-8')).hexdigest() == source_hash
+
+    # removing either of the ~ operators results in the same code
+    assert mutations[0][1] == mutations[1][1]
+    assert len({source_hash for _, source_hash in mutations}) == len(mutations) - 1
+
+
 def test_syntax_error():
     with pytest.raises(Exception):
         Mutator(Context(source=':!')).mutate()
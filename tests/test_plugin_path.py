@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mutmut.cli.helper.plugin_path import PluginPath, PYTHONPATH_VARIABLE
+from mutmut.tester.group_testing import PYTEST_PLUGIN
+
+
+def imports_plugin(cwd):
+    return subprocess.run([sys.executable, '-c', f'import {PYTEST_PLUGIN}'], cwd=str(cwd),
+                          stderr=subprocess.DEVNULL).returncode == 0
+
+
+def test_plugin_path(tmpdir, monkeypatch):
+    monkeypatch.setenv(PYTHONPATH_VARIABLE, str(tmpdir.join('elsewhere')))
+    if imports_plugin(tmpdir):
+        pytest.skip('mutmut is installed into this environment')
+
+    plugin_path = PluginPath()
+    plugin_path.enable()
+    assert os.environ[PYTHONPATH_VARIABLE] == os.pathsep.join([plugin_path.directory, str(tmpdir.join('elsewhere'))])
+    assert os.listdir(plugin_path.directory) == ['mutmut']
+    assert imports_plugin(tmpdir)
+
+    directory = plugin_path.directory
+    plugin_path.cleanup()
+    assert os.environ[PYTHONPATH_VARIABLE] == str(tmpdir.join('elsewhere'))
+    assert not os.path.exists(directory)
+    assert not imports_plugin(tmpdir)
@@ -0,0 +1,77 @@
+import pytest
+
+from mutmut.constants import OK_KILLED, BAD_SURVIVED, SKIPPED, UNTESTED
+from mutmut.helpers.relativemutationid import RelativeMutationID
+from mutmut.helpers.sampling import (allocate_sample, stratified_sample, restrict_duplicates,
+                                     estimate_mutation_score)
+
+
+def mutation_ids(filename, mutation_type, count):
+    return [
+        RelativeMutationID(line=f'{mutation_type} {i}', index=0, line_number=i, filename=filename,
+                           mutation_type=mutation_type)
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def mutations_by_file():
+    return {
+        'a.py': mutation_ids('a.py', 'number', 10) + mutation_ids('a.py', 'operator', 30),
+        'b.py': mutation_ids('b.py', 'string', 60),
+    }
+
+
+def test_allocate_sample():
+    assert allocate_sample({'a': 10, 'b': 30, 'c': 60}, 10) == {'a': 1, 'b': 3, 'c': 6}
+    assert allocate_sample({'a': 1, 'b': 1, 'c': 1}, 2) == {'a': 1, 'b': 1, 'c': 0}
+    assert allocate_sample({'a': 1, 'b': 2}, 10) == {'a': 1, 'b': 2}
+
+
+def test_stratified_sample(mutations_by_file):
+    sample = stratified_sample(mutations_by_file, 10, seed=0)
+    assert [x.mutation_type for x in sample['a.py']].count('number') == 1
+    assert [x.mutation_type for x in sample['a.py']].count('operator') == 3
+    assert len(sample['b.py']) == 6
+    # the order within the file is kept
+    assert sample['b.py'] == sorted(sample['b.py'], key=lambda x: x.line_number)
+
+
+def test_stratified_sample_is_reproducible(mutations_by_file):
+    assert stratified_sample(mutations_by_file, 10, seed=3) == stratified_sample(mutations_by_file, 10, seed=3)
+    assert stratified_sample(mutations_by_file, 10, seed=3) != stratified_sample(mutations_by_file, 10, seed=4)
+
+
+def test_restrict_duplicates(mutations_by_file):
+    a, b, c = mutations_by_file['b.py'][:3]
+    duplicates_by_file = {'b.py': {a: [b, c]}}
+    assert restrict_duplicates(duplicates_by_file, {'b.py': [a, b, c]}) == {'b.py': {a: [b, c]}}
+    assert restrict_duplicates(duplicates_by_file, {'b.py': [b, c]}) == {'b.py': {b: [c]}}
+    assert restrict_duplicates(duplicates_by_file, {'b.py': [c]}) == {}
+
+
+def test_estimate_mutation_score():
+    estimate = estimate_mutation_score(
+        population_sizes={'a': 100, 'b': 300},
+        statuses_by_stratum={
+            'a': [OK_KILLED] * 10,
+            'b': [OK_KILLED] * 15 + [BAD_SURVIVED] * 15 + [SKIPPED, UNTESTED],
+        },
+    )
+    assert estimate.score == pytest.approx(0.25 * 1 + 0.75 * 0.5)
+    assert estimate.sampled == 40
+    assert estimate.population == 400
+    assert 0 < estimate.margin < 0.2
+    assert estimate.lower < estimate.score < estimate.upper
+
+
+def test_estimate_mutation_score_whole_population():
+    estimate = estimate_mutation_score({'a': 4}, {'a': [OK_KILLED, OK_KILLED, OK_KILLED, BAD_SURVIVED]})
+    assert estimate.score == 0.75
+    assert estimate.margin == 0.0
+
+
+def test_estimate_mutation_score_nothing_tested():
+    estimate = estimate_mutation_score({'a': 4}, {'a': [UNTESTED]})
+    assert estimate.sampled == 0
+    assert estimate.margin == 1.0
@@ -0,0 +1,61 @@
+import pytest
+
+from mutmut.constants import UNTESTED, BAD_SURVIVED, OK_SUSPICIOUS
+from mutmut.helpers.relativemutationid import RelativeMutationID
+from mutmut.helpers.scheduler import Scheduler, entropy, survival_probability
+
+
+def mutant(filename, line_number, mutation_type='number'):
+    return filename, RelativeMutationID(line=f'line {line_number}', index=0, line_number=line_number,
+                                        filename=filename, mutation_type=mutation_type)
+
+
+def test_survival_probability():
+    assert survival_probability(None) == 0.5
+    assert survival_probability([0, 8]) == 0.1
+    assert survival_probability([8, 8]) == 0.9
+
+
+def test_entropy():
+    assert entropy(0.5) == 1.0
+    assert entropy(0.0) == entropy(1.0) == 0.0
+    assert entropy(0.1) == pytest.approx(entropy(0.9))
+
+
+def test_order_by_cost():
+    fast, slow, unknown = mutant('a.py', 1), mutant('a.py', 2), mutant('b.py', 3)
+    history = {
+        fast: (UNTESTED, None, 0.5),
+        slow: (UNTESTED, None, 2.0),
+    }
+    scheduler = Scheduler(baseline_time_elapsed=10.0, counts_by_type={}, counts_by_filename={})
+    assert scheduler.order([unknown, slow, fast], history) == [fast, slow, unknown]
+
+
+def test_order_uses_file_average_for_unknown_cost():
+    known, unknown, other_file = mutant('a.py', 1), mutant('a.py', 2), mutant('b.py', 3)
+    history = {known: (UNTESTED, None, 0.1)}
+    scheduler = Scheduler(baseline_time_elapsed=10.0, counts_by_type={}, counts_by_filename={})
+    assert scheduler.order([other_file, unknown], history) == [unknown, other_file]
+
+
+def test_order_by_uncertainty():
+    # mutants of a type that is always killed tell us less than mutants of a type we know nothing about
+    always_killed, unknown = mutant('a.py', 1, 'operator'), mutant('a.py', 2, 'string')
+    scheduler = Scheduler(baseline_time_elapsed=1.0, counts_by_type={'operator': [0, 50]}, counts_by_filename={})
+    assert scheduler.order([always_killed, unknown], {}) == [unknown, always_killed]
+
+
+def test_order_stale_results_last():
+    stale, new = mutant('a.py', 1), mutant('a.py', 2)
+    history = {stale: (OK_SUSPICIOUS, 'old hash', None)}
+    scheduler = Scheduler(baseline_time_elapsed=1.0, counts_by_type={}, counts_by_filename={})
+    assert scheduler.order([stale, new], history) == [new, stale]
+
+
+def test_stale_survivor_is_likely_to_survive_again():
+    survived = mutant('a.py', 1)
+    scheduler = Scheduler(baseline_time_elapsed=1.0, counts_by_type={}, counts_by_filename={})
+    history = (BAD_SURVIVED, 'old hash', None)
+    assert scheduler.expected_information('a.py', survived[1], history) < \
+        scheduler.expected_information('a.py', survived[1], (UNTESTED, None, None))
@@ -0,0 +1,48 @@
+from mutmut.tester.test_selection import kill_probability, order_tests, stages_of_tests, selected_tests_command
+
+
+class ConfigStub:
+    _default_test_command = 'python -m pytest -x'
+
+    def __init__(self, test_durations=None, test_kill_counts=None, first_stage_budget=None):
+        self.test_durations = test_durations
+        self.test_kill_counts = test_kill_counts
+        self.first_stage_budget = first_stage_budget
+
+
+def test_kill_probability():
+    assert kill_probability(None) == 0.5
+    assert kill_probability([3, 3]) == 0.8
+    assert kill_probability([0, 8]) == 0.1
+
+
+def test_order_tests():
+    config = ConfigStub(test_durations={'fast': 0.1, 'slow': 1.0, 'killer': 1.0},
+                        test_kill_counts={'killer': [18, 18], 'fast': [0, 18]})
+    # fast: 0.05 / 0.1, killer: 0.95 / 1.0, slow: 0.5 / 1.0, unknown: 0.5 / 0.7 (the average duration)
+    assert order_tests(config, ['slow', 'fast', 'killer', 'unknown']) == ['killer', 'unknown', 'fast', 'slow']
+
+
+def test_order_tests_without_durations():
+    assert order_tests(ConfigStub(), ['b', 'a']) == ['a', 'b']
+
+
+def test_stages_of_tests():
+    config = ConfigStub(test_durations={'a': 1.0, 'b': 2.0, 'c': 3.0})
+    assert stages_of_tests(config, ['c', 'b', 'a']) == [['a', 'b', 'c']]
+
+    config.first_stage_budget = 3.5
+    assert stages_of_tests(config, ['c', 'b', 'a']) == [['a', 'b'], ['c']]
+
+    # the first stage always has a test
+    config.first_stage_budget = 0.5
+    assert stages_of_tests(config, ['c', 'b', 'a']) == [['a'], ['b', 'c']]
+
+    config.first_stage_budget = 10
+    assert stages_of_tests(config, ['c', 'b', 'a']) == [['a', 'b', 'c']]
+
+
+def test_selected_tests_command():
+    command = selected_tests_command(ConfigStub(), ['tests/test_foo.py::test_b[1 2]', 'tests/test_foo.py::a'])
+    assert command == ("python -m pytest -x -p mutmut.tester.pytest_plugin --maxfail=1 "
+                       "'tests/test_foo.py::test_b[1 2]' tests/test_foo.py::a")
@@ -1,12 +1,20 @@
+import multiprocessing
 import os
+import queue
+import signal
 import sys
+import tempfile
 from time import sleep, time
 import pytest
 from unittest.mock import MagicMock, patch, call
 
+from mutmut.constants import BAD_SURVIVED, OK_SUSPICIOUS, UNTESTED
+from mutmut.tester.queue_manager import QueueManager
 from mutmut.tester.tester import Tester
-from mutmut.helpers.progress import OK_KILLED
+from mutmut.tester import tester_helper
+from mutmut.helpers.progress import OK_KILLED, Progress
 from mutmut.helpers.context import Context
+from mutmut.helpers.relativemutationid import RelativeMutationID
 
 PYTHON = '"{}"'.format(sys.executable)
 
@@ -18,12 +26,24 @@ def check_mutants_stub(**kwargs):
 
     tester = Tester()
     check_mutants_original = tester.check_mutants
-    with patch('mutmut.tester.tester.Tester.run_mutation', run_mutation_stub):
+    with patch('mutmut.tester.tester.Tester.run_mutation', run_mutation_stub), \
+            patch('mutmut.tester.tester.Tester.context_of', lambda *_: Context(config=config_stub)):
         check_mutants_original(**kwargs)
 
 
 class ConfigStub:
     hash_of_tests = None
+    deadline = None
+    dict_synonyms = []
+    start_method = 'spawn'
+    max_worker_mutants = None
+    max_worker_memory = None
+    max_worker_age = None
+    automatic_test_processes = False
+    max_test_memory = None
+    max_test_cpu_time = None
+    use_cpu_time = False
+    baseline_cpu_time = None
 
 
 config_stub = ConfigStub()
@@ -38,7 +58,7 @@ def test_run_mutation_tests_thread_synchronization(monkeypatch):
 
     def queue_mutants_stub(**kwargs):
         for _ in range(total_mutants):
-            kwargs['mutants_queue'].put(('mutant', Context(config=config_stub)))
+            kwargs['mutants_queue'].put(('mutant', ('foo.py', RelativeMutationID('x = 1', 0, 0))))
         kwargs['mutants_queue'].put(('end', None))
 
     monkeypatch.setattr(tester.queue_manager, 'queue_mutants', queue_mutants_stub)
@@ -67,6 +87,225 @@ def test_run_mutation_tests_thread_synchronization(monkeypatch):
     tester.queue_manager.close_active_queues()
 
 
+def test_handle_result_of_any_worker(monkeypatch):
+    monkeypatch.setattr('mutmut.cache.update_mutant_status', lambda **_: None)
+    tester = Tester()
+    new_worker = MagicMock(pid=3)
+    worker_ids = []
+    monkeypatch.setattr(tester, 'create_worker', lambda *args: worker_ids.append(args[-1]) or new_worker)
+    busy_worker, worker = MagicMock(pid=1, worker_id=0), MagicMock(pid=2, worker_id=1)
+    workers = {1: busy_worker, 2: worker}
+    retired_workers = []
+    results_queue = queue.Queue()
+    results_queue.put(('status', OK_KILLED, 'foo.py', RelativeMutationID('x = 1', 0, 0), 0.1))
+    results_queue.put(('cycle', 2, None, None, None))
+    results_queue.put(('end', 3, None, None, None))
+    progress = Progress(total=1, output_legend={}, no_progress=True)
+
+    def handle_result():
+        tester.handle_result(None, None, None, results_queue, workers, retired_workers, config_stub, progress)
+
+    # the worker with the slow mutant doesn't hold up the results of the others
+    handle_result()
+    assert progress.killed_mutants == 1
+    handle_result()
+    assert workers == {1: busy_worker, 3: new_worker}
+    assert retired_workers == [worker]
+    # the new worker takes the number of the one it replaces
+    assert worker_ids == [1]
+    handle_result()
+    assert workers == {1: busy_worker}
+    new_worker.join.assert_called_once()
+
+
+def test_worker_retires_when_asked(monkeypatch):
+    monkeypatch.setattr(tester_helper.TesterHelper, 'use_private_bytecode_cache', staticmethod(lambda: None))
+    monkeypatch.setattr(tester_helper.TesterHelper, 'isolate_worker', staticmethod(lambda _: '/nonexistent'))
+    mutants_queue, results_queue = queue.Queue(), queue.Queue()
+    for _ in range(2):
+        mutants_queue.put(('mutant', ('foo.py', RelativeMutationID('x = 1', 0, 0))))
+    retirements = multiprocessing.get_context('spawn').Value('i', 1)
+
+    check_mutants_stub(mutants_queue=mutants_queue, results_queue=results_queue, test_lock=None,
+                       cycle_process_after=0, config=config_stub, retirements=retirements)
+
+    assert [results_queue.get()[0] for _ in range(results_queue.qsize())] == ['status', 'end']
+    assert mutants_queue.qsize() == 1
+    assert retirements.value == 0
+
+
+def test_duplicates_get_the_status_of_their_representative(monkeypatch):
+    representative = RelativeMutationID('x = ~~1', 0, 0)
+    duplicate = RelativeMutationID('x = ~~1', 1, 0)
+    other = RelativeMutationID('x = ~~1', 2, 0)
+    duplicates = {representative: [duplicate]}
+    cached_statuses = {representative: OK_KILLED, duplicate: UNTESTED, other: UNTESTED}
+    monkeypatch.setattr('mutmut.cache.get_cached_mutation_statuses', lambda *_: cached_statuses)
+    updates = []
+    monkeypatch.setattr('mutmut.cache.update_mutant_status',
+                        lambda mutation_id, status, **_: updates.append((mutation_id, status)))
+    progress = Progress(total=3, output_legend={}, no_progress=True)
+    pending_duplicates = {}
+
+    def untested_mutants():
+        return QueueManager.untested_mutants(progress, config_stub, 'foo.py', [representative, duplicate, other],
+                                             duplicates, pending_duplicates)
+
+    # the representative is tested already
+    assert untested_mutants() == [('foo.py', other)]
+    assert updates == [(duplicate, OK_KILLED)]
+    assert pending_duplicates == {}
+    assert progress.killed_mutants == 2
+
+    # the representative is still to be tested, the duplicate waits for it
+    cached_statuses[representative] = UNTESTED
+    updates.clear()
+    assert untested_mutants() == [('foo.py', representative), ('foo.py', other)]
+    assert updates == []
+    assert pending_duplicates == {('foo.py', representative): [duplicate]}
+
+    results_queue = queue.Queue()
+    results_queue.put(('status', BAD_SURVIVED, 'foo.py', representative, 0.1))
+    Tester().handle_result(None, None, None, results_queue, {}, [], config_stub, progress, pending_duplicates)
+    assert updates == [(representative, BAD_SURVIVED), (duplicate, BAD_SURVIVED)]
+    assert pending_duplicates == {}
+    assert progress.surviving_mutants == 2
+
+
+def test_queue_streamed_mutations(monkeypatch):
+    a = RelativeMutationID('a = 1', 0, 0)
+    b = RelativeMutationID('b = 2', 0, 0)
+    monkeypatch.setattr('mutmut.cache.get_cached_mutation_statuses', lambda filename, mutations, _: {
+        x: UNTESTED if filename == 'a.py' else OK_KILLED for x in mutations
+    })
+
+    progress = Progress(total=0, output_legend={}, no_progress=True)
+    queued = []
+    mutants_queue = MagicMock()
+    mutants_queue.put = queued.append
+
+    def streamed_mutations():
+        yield 'a.py', [a], {}
+        # the mutant of a.py is queued before b.py is listed
+        assert queued == [('mutant', ('a.py', a))]
+        assert progress.total == 1
+        yield 'b.py', [b], {}
+
+    QueueManager.queue_mutants(progress=progress, config=config_stub, mutants_queue=mutants_queue, mutations_by_file={},
+                               streamed_mutations=streamed_mutations())
+
+    assert queued[-1] == ('end', None)
+    assert len(queued) == 2
+    assert (progress.total, progress.currently_tested, progress.killed_mutants) == (2, 1, 1)
+
+
+def test_context_of_mutant_descriptor(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    tmpdir.join('foo.py').write('x = 1\n')
+    mutation_id = RelativeMutationID('x = 1', 0, 0)
+    source_by_filename = {}
+    test_lock = MagicMock()
+
+    context = Tester.context_of(config_stub, 'foo.py', mutation_id, source_by_filename, test_lock)
+    assert (context.filename, context.mutation_id, context.source) == ('foo.py', mutation_id, 'x = 1\n')
+    assert context.config is not config_stub
+    test_lock.__enter__.assert_called_once()
+
+    # the source is read once per worker
+    tmpdir.join('foo.py').write('x = 2\n')
+    assert Tester.context_of(config_stub, 'foo.py', mutation_id, source_by_filename, test_lock).source == 'x = 1\n'
+    test_lock.__enter__.assert_called_once()
+
+
+def test_run_mutation_does_not_open_the_cache(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    tmpdir.join('foo.py').write('x = 1\n')
+    for entity in ('SourceFile', 'Line', 'Mutant', 'MiscData'):
+        monkeypatch.setattr('mutmut.cache.' + entity, None)
+    config = MagicMock(
+        detect_equivalent=False, pre_mutation=None, post_mutation=None, select_tests=False,
+        test_files_by_filename=None, test_command=PYTHON + ' -c "pass"', using_testmon=False, swallow_output=True,
+        rerun_all=False, test_time_base=10.0, test_time_multiplier=2.0, baseline_time_elapsed=1.0,
+    )
+    config._default_test_command = config.test_command
+    context = Context(source='x = 1\n', filename='foo.py', mutation_id=RelativeMutationID('x = 1', 0, 0), config=config)
+
+    assert Tester().run_mutation(context, lambda line: None, multiprocessing.Lock()) == BAD_SURVIVED
+    assert tmpdir.join('foo.py').read() == 'x = 1\n'
+
+
+@pytest.mark.parametrize('rerun_all, selected_tests_pass, expected_runs, expected_survived', [
+    (False, True, ['selected'], True),
+    # the whole test suite kills the mutant
+    (True, True, ['selected', 'all'], False),
+    (True, False, ['selected'], False),
+])
+def test_rerun_all_after_selected_tests(monkeypatch, rerun_all, selected_tests_pass, expected_runs, expected_survived):
+    runs = []
+    tester = Tester()
+
+    def run_selected_tests(*_):
+        runs.append('selected')
+        return selected_tests_pass
+
+    def tests_pass(**_):
+        runs.append('all')
+        return False
+
+    monkeypatch.setattr(tester, 'selected_tests_pass', run_selected_tests)
+    monkeypatch.setattr(tester, 'tests_pass', tests_pass)
+    monkeypatch.setattr(tester.tester_helper, 'determine_tests_result', lambda config, start, survived, _: survived)
+    config = MagicMock(test_command='pytest', _default_test_command='pytest', rerun_all=rerun_all)
+
+    assert tester.execute_tests_on_mutation(config, lambda line: None, tests=['test_a']) == expected_survived
+    assert runs == expected_runs
+
+
+def test_should_recycle_worker(monkeypatch):
+    config = ConfigStub()
+    should_recycle_worker = tester_helper.TesterHelper.should_recycle_worker
+    assert not should_recycle_worker(config, 99, 100, time())
+    assert should_recycle_worker(config, 100, 100, time())
+    assert not should_recycle_worker(config, 1000, 0, time())
+
+    config.max_worker_age = 60
+    assert not should_recycle_worker(config, 1, 0, time() - 30)
+    assert should_recycle_worker(config, 1, 0, time() - 60)
+
+    config.max_worker_age = None
+    config.max_worker_memory = 100
+    monkeypatch.setattr(tester_helper.TesterHelper, 'resident_set_size', staticmethod(lambda: 99 * 1024 * 1024))
+    assert not should_recycle_worker(config, 1, 0, time())
+    monkeypatch.setattr(tester_helper.TesterHelper, 'resident_set_size', staticmethod(lambda: 101 * 1024 * 1024))
+    assert should_recycle_worker(config, 1, 0, time())
+
+
+def test_isolate_worker(monkeypatch):
+    for name in ['MUTMUT_WORKER_ID', 'TMPDIR', 'MUTMUT_PORT_RANGE']:
+        monkeypatch.setenv(name, '')
+        monkeypatch.delenv(name)
+    monkeypatch.setattr(tempfile, 'tempdir', None)
+
+    directory = tester_helper.TesterHelper.isolate_worker(1)
+    try:
+        assert os.path.isdir(directory)
+        assert os.environ['TMPDIR'] == tempfile.gettempdir() == directory
+        assert os.environ['MUTMUT_WORKER_ID'] == '1'
+        assert os.environ['MUTMUT_PORT_RANGE'] == '20100-20199'
+    finally:
+        os.rmdir(directory)
+
+    monkeypatch.delenv('TMPDIR')
+    tempfile.tempdir = None
+    directory = tester_helper.TesterHelper.isolate_worker(tester_helper.MAX_WORKERS - 1)
+    os.rmdir(directory)
+    assert os.environ['MUTMUT_PORT_RANGE'] == '32600-32699'
+
+
+def test_resident_set_size():
+    assert tester_helper.TesterHelper.resident_set_size() > 1024 * 1024
+
+
 def test_popen_streaming_output_timeout():
     start = time()
     tester = Tester()
@@ -79,6 +318,123 @@ def test_popen_streaming_output_timeout():
     assert (time() - start) < 3
 
 
+@pytest.mark.skipif(os.name == 'nt', reason='no process groups on Windows')
+def test_popen_streaming_output_timeout_kills_child_processes():
+    child_pids = []
+    start = time()
+    with pytest.raises(TimeoutError):
+        Tester().popen_streaming_output(
+            PYTHON + ' -c "import subprocess, sys, time; '
+                     'child = subprocess.Popen([sys.executable, \'-c\', \'import time; time.sleep(30)\']); '
+                     'print(child.pid, flush=True); time.sleep(30)"',
+            lambda line: child_pids.append(int(line)), timeout=1,
+        )
+
+    # the child process doesn't keep the output open
+    assert (time() - start) < 10
+    for _ in range(50):
+        if not is_running(child_pids[0]):
+            break
+        sleep(0.1)
+    assert not is_running(child_pids[0])
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='no process groups on Windows')
+def test_interrupted_popen_streaming_output_kills_child_processes():
+    pids = []
+
+    def callback(line):
+        pids.extend(int(x) for x in line.split())
+        raise KeyboardInterrupt()
+
+    with pytest.raises(KeyboardInterrupt):
+        Tester().popen_streaming_output(
+            PYTHON + ' -c "import os, subprocess, sys, time; '
+                     'child = subprocess.Popen([sys.executable, \'-c\', \'import time; time.sleep(60)\']); '
+                     'print(os.getpid(), child.pid, flush=True); time.sleep(60)"',
+            callback, timeout=30,
+        )
+
+    assert len(pids) == 2
+    for pid in pids:
+        for _ in range(50):
+            if not is_running(pid):
+                break
+            sleep(0.1)
+        assert not is_running(pid)
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            # a zombie is killed, but not waited for by its parent yet
+            return f.read().rpartition(') ')[2][:1] != 'Z'
+    except FileNotFoundError:
+        return True
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='no resource limits on Windows')
+def test_popen_streaming_output_resource_limits():
+    start = time()
+    with pytest.raises(TimeoutError):
+        Tester().popen_streaming_output(PYTHON + ' -c "while True: pass"', lambda line: line, timeout=30,
+                                        max_cpu_time=0.5)
+    assert (time() - start) < 10
+
+    returncode = Tester().popen_streaming_output(PYTHON + ' -c "x = bytearray(2 * 1024 ** 3)"', lambda line: line,
+                                                 timeout=30, max_memory=500)
+    assert returncode == 1
+
+    # only SIGXCPU means the CPU time ran out, a SIGKILL from elsewhere is a failing test run
+    returncode = Tester().popen_streaming_output(
+        PYTHON + ' -c "import os, signal; os.kill(os.getpid(), signal.SIGKILL)"', lambda line: line,
+        timeout=30, max_cpu_time=10)
+    assert returncode == -signal.SIGKILL
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc'), reason='needs /proc to measure the CPU time of running processes')
+def test_popen_streaming_output_cpu_timeout():
+    # waiting longer than the timeout without using the CPU time is fine
+    assert Tester().popen_streaming_output(PYTHON + ' -c "import time; time.sleep(1)"', lambda line: line,
+                                           timeout=0.5, cpu_timeout=10) == 0
+
+    start = time()
+    with pytest.raises(TimeoutError):
+        Tester().popen_streaming_output(PYTHON + ' -c "while True: pass"', lambda line: line, timeout=0.5,
+                                        cpu_timeout=1)
+    assert (time() - start) < 1.9
+
+    # but not longer than MAX_WALL_TIME_FACTOR times the timeout
+    start = time()
+    with pytest.raises(TimeoutError):
+        Tester().popen_streaming_output(PYTHON + ' -c "import time; time.sleep(30)"', lambda line: line,
+                                        timeout=0.5, cpu_timeout=10)
+    assert 1.9 < (time() - start) < 10
+
+
+def test_determine_tests_result_by_cpu_time(monkeypatch):
+    config = ConfigStub()
+    config.test_time_base = 0.0
+    config.test_time_multiplier = 2.0
+    config.baseline_time_elapsed = 1.0
+    config.baseline_cpu_time = 1.0
+    cpu_time = 100.0
+    monkeypatch.setattr(tester_helper.TesterHelper, 'cpu_time', staticmethod(lambda: cpu_time))
+    determine_tests_result = tester_helper.TesterHelper.determine_tests_result
+
+    assert determine_tests_result(config, time() - 5, False, 99.0) == OK_SUSPICIOUS
+    config.use_cpu_time = True
+    # the tests were waiting for a CPU
+    assert determine_tests_result(config, time() - 5, False, 99.0) == OK_KILLED
+    assert determine_tests_result(config, time() - 5, False, 97.0) == OK_SUSPICIOUS
+    assert determine_tests_result(config, time(), False, 97.0) == OK_KILLED
+    assert determine_tests_result(config, time() - 5, True, 97.0) == BAD_SURVIVED
+
+
 def test_popen_streaming_output_stream():
     mock = MagicMock()
     tester = Tester()
@@ -108,3 +464,31 @@ def test_popen_streaming_output_stream():
         PYTHON + ' -c "exit(0);"',
         callback=mock)
     mock.assert_not_called()
+
+
+def test_unload_modules_depending_on_mutated_file(tmpdir, monkeypatch):
+    package = tmpdir.mkdir('unload_pkg')
+    package.join('__init__.py').write('')
+    package.join('base.py').write('X = 1\n')
+    package.join('user.py').write('from .base import X\n')
+    package.join('other.py').write('Y = 2\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    class UnloadConfigStub:
+        paths_to_mutate = ['unload_pkg']
+
+    modules_before = set(sys.modules)
+    import unload_pkg.user  # noqa: F401
+    import unload_pkg.other  # noqa: F401
+    try:
+        tester = Tester()
+        tester.tester_helper.unload_modules(modules_before, UnloadConfigStub(), str(package.join('base.py')))
+        assert 'unload_pkg.base' not in sys.modules
+        assert 'unload_pkg.user' not in sys.modules
+        assert 'unload_pkg.other' in sys.modules
+
+        tester.tester_helper.unload_modules(modules_before, UnloadConfigStub())
+        assert not [x for x in sys.modules if x.startswith('unload_pkg')]
+    finally:
+        for module_name in [x for x in sys.modules if x.startswith('unload_pkg')]:
+            del sys.modules[module_name]
@@ -0,0 +1,66 @@
+import multiprocessing
+
+import pytest
+
+from mutmut.tester import worker_count
+from mutmut.tester.worker_count import WorkerCount, automatic_worker_count, processes_per_test_run
+
+MB = 1024 * 1024
+
+
+@pytest.mark.parametrize('test_command, expected', [
+    ('python -m pytest -x', 1),
+    ('python -m pytest -n 4', 4),
+    ('python -m pytest -n4 -x', 4),
+    ('python -m pytest --numprocesses=2', 2),
+    ('python -m pytest -n auto', 8),
+    ('python -m pytest -n', 1),
+])
+def test_processes_per_test_run(test_command, expected):
+    assert processes_per_test_run(test_command, cores=8) == expected
+
+
+@pytest.fixture
+def machine(monkeypatch):
+    machine = dict(cores=8, memory=None)
+    monkeypatch.setattr(worker_count, 'available_cores', lambda: machine['cores'])
+    monkeypatch.setattr(worker_count, 'available_memory', lambda: machine['memory'])
+    monkeypatch.setattr(worker_count.TesterHelper, 'resident_set_size', staticmethod(lambda: 50 * MB))
+    return machine
+
+
+def test_automatic_worker_count(machine):
+    # the test runs take turns, so a second worker only prepares the next mutant meanwhile
+    assert automatic_worker_count('python -m pytest', None) == 2
+    assert automatic_worker_count('python -m pytest -n 3', None) == 2
+    assert automatic_worker_count('python -m pytest -n auto', None) == 1
+    machine['cores'] = 1
+    assert automatic_worker_count('python -m pytest', None) == 1
+    machine['cores'] = 8
+
+    # a test run takes 100 MB per test process next to 50 MB for each worker, 80% of the memory is used
+    machine['memory'] = 1000 * MB
+    assert automatic_worker_count('python -m pytest', 100 * MB) == 2
+    assert automatic_worker_count('python -m pytest -n 5', 150 * MB) == 1
+    machine['memory'] = 10 * MB
+    assert automatic_worker_count('python -m pytest', 100 * MB) == 1
+
+
+def test_worker_count_shrinks_on_low_memory(monkeypatch):
+    memory = dict(low=False)
+    monkeypatch.setattr(worker_count, 'memory_is_low', lambda: memory['low'])
+    count = WorkerCount(multiprocessing.get_context('spawn'), 2)
+    count.register()
+    assert count.target == 2
+
+    memory['low'] = True
+    count.register()
+    assert count.target == 1
+    assert count.retirements.value == 1
+
+    # one worker stops, and at least one keeps running
+    count.register()
+    assert count.target == 1
+    assert WorkerCount.should_retire(count.retirements)
+    assert not WorkerCount.should_retire(count.retirements)
+    assert not WorkerCount.should_retire(None)